@@ -0,0 +1,393 @@
+###########################################################################################
+#                                                                                        #
+#                                  MÉTRICAS (PROMETHEUS)                                 #
+#                                                                                        #
+#   Registro de métricas en proceso, sin servicios externos:                             #
+#                                                                                        #
+#   - Contadores e histogramas con etiquetas (`Counter`, `Histogram`).                   #
+#   - Multiproceso: cada proceso (workers de gunicorn, `run_worker`) vuelca sus valores  #
+#     como mucho una vez por segundo a `METRICS_DIR/<pid>-<token>.json`; `/metrics`       #
+#     suma todos los archivos. Los de procesos terminados se compactan en                #
+#     `archive.json` para que los contadores no retrocedan al reciclar workers.          #
+#   - Instrumentación:                                                                   #
+#       · `MetricsMiddleware`   -> peticiones, latencia y consultas SQL por vista.       #
+#       · envoltorio de ejecución SQL (toda conexión) -> consultas y su duración.        #
+#       · `MeteredLocMemCache`  -> aciertos y fallos de la caché de Django.              #
+#       · `PIPELINE_SECONDS`    -> portadas, imágenes, PDFs y tareas en segundo plano.   #
+#   - `metrics_view` expone todo en el formato de texto de Prometheus.                   #
+#                                                                                        #
+###########################################################################################
+
+import atexit
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin compactación de archivos de procesos terminados
+    fcntl = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+ARCHIVE_NAME = "archive.json"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# -------------------
+# Registro
+# -------------------
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels):
+        return json.dumps([self.name, [str(labels.get(label, "")) for label in self.labelnames]])
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.registry.values[key] = self.registry.values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            # [cuenta por cubeta..., cuenta +Inf, suma]
+            data = self.registry.values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                position = len(self.buckets)
+            data[position] += 1
+            data[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.values = {}
+        self.lock = threading.Lock()
+        self.token = secrets.token_hex(4)
+        self.last_flush = 0.0
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.metrics.setdefault(name, Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(self, name, documentation, labelnames, buckets))
+
+    # --- Archivos por proceso ---
+
+    def _directory(self):
+        return Path(settings.METRICS_DIR)
+
+    def _own_file(self):
+        return self._directory() / f"{os.getpid()}-{self.token}.json"
+
+    def flush(self):
+        """Escribe los valores de este proceso (reemplazo atómico del archivo)."""
+        with self.lock:
+            data = json.dumps(self.values)
+        path = self._own_file()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_text(data)
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"Error guardando métricas en {path}: {e}")
+        self.last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def _compact(self, directory):
+        """Suma al archivo de archivo los de procesos que ya no existen y los borra."""
+        if fcntl is None:
+            return
+        with open(directory / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive_path = directory / ARCHIVE_NAME
+            archive = _read(archive_path)
+            dead = [path for path in directory.glob("*-*.json") if not _alive(path)]
+            if not dead:
+                return
+            for path in dead:
+                _merge(archive, _read(path))
+            temporary = archive_path.with_suffix(".tmp")
+            temporary.write_text(json.dumps(archive))
+            os.replace(temporary, archive_path)
+            for path in dead:
+                path.unlink(missing_ok=True)
+
+    def collect(self):
+        """Valores sumados de todos los procesos (los de este proceso, en vivo)."""
+        directory = self._directory()
+        own = self._own_file()
+        try:
+            self._compact(directory)
+        except OSError as e:
+            print(f"Error compactando métricas en {directory}: {e}")
+
+        totals = {}
+        for path in directory.glob("*.json"):
+            if path != own:
+                _merge(totals, _read(path))
+        with self.lock:
+            _merge(totals, self.values)
+        return totals
+
+    # --- Exposición ---
+
+    def exposition(self):
+        """Texto en el formato de exposición de Prometheus (versión 0.0.4)."""
+        by_metric = {}
+        for key, value in self.collect().items():
+            name, label_values = json.loads(key)
+            by_metric.setdefault(name, []).append((label_values, value))
+
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for label_values, value in sorted(by_metric.get(name, [])):
+                labels = list(zip(metric.labelnames, label_values))
+                if metric.kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip([*metric.buckets, "+Inf"], value[:-1]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _read(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _alive(path):
+    try:
+        os.kill(int(path.name.split("-", 1)[0]), 0)
+    except ProcessLookupError:
+        return False
+    except (ValueError, PermissionError):
+        return True
+    return True
+
+
+def _merge(totals, values):
+    for key, value in values.items():
+        if key not in totals:
+            totals[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            totals[key] = [first + second for first, second in zip(totals[key], value)]
+        else:
+            totals[key] += value
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+REQUESTS = REGISTRY.counter(
+    "babelius_http_requests_total", "Peticiones HTTP atendidas.", ["view", "method", "status"]
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "babelius_http_request_duration_seconds", "Duración de las peticiones HTTP.", ["view"]
+)
+REQUEST_QUERIES = REGISTRY.histogram(
+    "babelius_http_request_db_queries", "Consultas SQL por petición.", ["view"], buckets=QUERY_COUNT_BUCKETS
+)
+DB_QUERIES = REGISTRY.counter(
+    "babelius_db_queries_total", "Consultas SQL ejecutadas.", ["alias", "operation"]
+)
+DB_SECONDS = REGISTRY.histogram(
+    "babelius_db_query_duration_seconds", "Duración de las consultas SQL.", ["operation"]
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "babelius_cache_requests_total", "Lecturas de caché (hit/miss).", ["cache", "result"]
+)
+PIPELINE_SECONDS = REGISTRY.histogram(
+    "babelius_pipeline_duration_seconds", "Duración de etapas lentas (portadas, imágenes, PDFs).", ["stage"]
+)
+PDF_BYTES_SENT = REGISTRY.counter(
+    "babelius_pdf_bytes_sent_total", "Bytes de PDF enviados por stream_pdf."
+)
+JOBS = REGISTRY.counter(
+    "babelius_jobs_total", "Tareas en segundo plano ejecutadas.", ["task", "result"]
+)
+
+
+# -------------------
+# Base de datos
+# -------------------
+
+_request_queries = ContextVar("metrics_request_queries", default=None)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    operation = (sql.lstrip().split(None, 1) or ["?"])[0].upper()
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_SECONDS.observe(time.perf_counter() - started, operation=operation)
+        DB_QUERIES.inc(alias=context["connection"].alias, operation=operation)
+
+
+def _install_db_wrapper(sender, connection, **kwargs):
+    # La lista de envoltorios es del DatabaseWrapper (uno por hilo y alias) y
+    # sobrevive a las reconexiones: solo se añade una vez
+    if settings.METRICS_ENABLED and _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+connection_created.connect(_install_db_wrapper, dispatch_uid="metrics_db_wrapper")
+
+
+# -------------------
+# Caché
+# -------------------
+
+_MISSING = object()
+
+
+class MeteredLocMemCache(LocMemCache):
+    """LocMemCache que cuenta aciertos y fallos (`get_many` pasa por `get`)."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        CACHE_REQUESTS.inc(cache="default", result="miss" if value is _MISSING else "hit")
+        return default if value is _MISSING else value
+
+
+# -------------------
+# Peticiones
+# -------------------
+
+class MetricsMiddleware:
+    """Cuenta peticiones por vista, su latencia y sus consultas SQL (síncrono y ASGI)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started, token = time.perf_counter(), _request_queries.set([0])
+        try:
+            response = self.get_response(request)
+        finally:
+            queries = _request_queries.get()[0]
+            _request_queries.reset(token)
+        self._record(request, response, started, queries)
+        return response
+
+    async def __acall__(self, request):
+        started, token = time.perf_counter(), _request_queries.set([0])
+        try:
+            response = await self.get_response(request)
+        finally:
+            queries = _request_queries.get()[0]
+            _request_queries.reset(token)
+        self._record(request, response, started, queries)
+        return response
+
+    def _record(self, request, response, started, queries):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else "") or "sin_ruta"
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, view=view)
+        REQUEST_QUERIES.observe(queries, view=view)
+        REGISTRY.maybe_flush()
+
+
+# -------------------
+# Endpoint
+# -------------------
+
+def metrics_view(request):
+    """
+    `/metrics` en formato de texto de Prometheus; con `METRICS_TOKEN` exige `Bearer <token>`.
+
+    Sin token solo responde en desarrollo (DEBUG): en producción no se publican
+    el tráfico por vista ni los nombres de las tareas.
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        raise Http404
+    if token and not secrets.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    return HttpResponse(REGISTRY.exposition(), content_type=CONTENT_TYPE)
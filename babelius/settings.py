@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'babelius.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,6 +92,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Caché en memoria por proceso (fragmentos de tarjetas de libros, etc.).
+
+CACHES = {
+    'default': {
+        # LocMemCache que además cuenta aciertos/fallos para /metrics (babelius/metrics.py)
+        'BACKEND': 'babelius.metrics.MeteredLocMemCache',
+        'LOCATION': 'babelius',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,6 +152,45 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Subidas reanudables por partes (catalog/uploads.py)
+UPLOAD_MAX_SIZE = 1024 * 1024 * 1024        # 1 GB por archivo
+UPLOAD_CHUNK_MAX_SIZE = 8 * 1024 * 1024     # 8 MB por parte
+
+# Imágenes subidas (portadas y autores, catalog/images.py): se normalizan en segundo plano
+IMAGE_MAX_DIMENSION = 600    # px del lado mayor (se muestran a ~200px; 3x para pantallas densas)
+IMAGE_QUALITY = 80           # calidad WebP
+IMAGE_AUTO_NORMALIZE = True
+
+# Portadas por defecto generadas bajo demanda (catalog/covers.py): caché LRU en disco
+DEFAULT_COVER_CACHE_DIR = BASE_DIR / 'covers_cache'
+DEFAULT_COVER_CACHE_MAX_BYTES = 100 * 1024 * 1024    # 100 MB
+
+# Índices de texto completo de los PDFs (SQLite FTS5, un archivo por usuario)
+FULLTEXT_INDEX_DIR = BASE_DIR / 'search_index'
+# Indexar automáticamente en segundo plano al subir o reemplazar un PDF
+FULLTEXT_AUTO_INDEX = True
+
+# Cola de tareas en segundo plano (catalog/jobs.py), atendida por `manage.py run_worker`.
+# Solo se activa con JOB_QUEUE=on, cuando hay un proceso worker desplegado junto al web;
+# sin él (runserver, despliegue de un solo proceso) las tareas corren en un hilo del proceso web.
+JOB_QUEUE_ENABLED = os.environ.get('JOB_QUEUE', 'off') == 'on'
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_SECONDS = 10     # 10 s, 20 s, 40 s... (máximo 1 h)
+JOB_LOCK_TIMEOUT = 30 * 60      # segundos antes de dar por muerto al worker de una tarea en curso
+JOB_POLL_INTERVAL = 1.0         # segundos de espera con la cola vacía
+
+# Métricas en formato Prometheus (babelius/metrics.py), expuestas en /metrics.
+# Cada proceso vuelca sus valores en METRICS_DIR (compartido por los workers de gunicorn).
+METRICS_ENABLED = True
+METRICS_DIR = Path(os.environ.get('METRICS_DIR', BASE_DIR / 'metrics_data'))
+# /metrics exige "Bearer <token>"; sin token solo se sirve con DEBUG (404 en producción)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_FLUSH_INTERVAL = 1.0    # segundos entre volcados de cada proceso
+
+# Volcado bibliográfico local (ISBN -> metadatos) para autocompletar libros sin red
+# (se construye con `manage.py load_metadata_dump`)
+METADATA_DUMP_PATH = BASE_DIR / 'metadata' / 'bibliographic.sqlite3'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -11,4 +11,10 @@ python manage.py collectstatic --noinput
 echo "🗃️ Aplicando migraciones..."
 python manage.py migrate
 
+echo "🔢 Reconstruyendo contadores de biblioteca..."
+python manage.py recompute_counters
+
+echo "🔖 Normalizando ISBN/DOI..."
+python manage.py backfill_identifiers
+
 echo "✅ Build completado!"
\ No newline at end of file
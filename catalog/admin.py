@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Shelf, Drawer, Classification, Gender, Author, Book
+from .models import Shelf, Drawer, Classification, Gender, Author, Book, Job
 
 # Register your models here.
 @admin.register(Shelf)
@@ -42,4 +42,11 @@ class BookAdmin(admin.ModelAdmin):
     )
     list_filter = ("genre", "drawer", "cover")
     search_fields = ("title", "subtitle", "editorial", "author__first_name", "author__last_name")
-    ordering = ("title",)
\ No newline at end of file
+    ordering = ("title",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task", "status", "attempts", "run_at", "locked_by")
+    list_filter = ("status",)
+    search_fields = ("task",)
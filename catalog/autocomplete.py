@@ -0,0 +1,205 @@
+###########################################################################################
+#                                                                                        #
+#                                    AUTOCOMPLETADO                                      #
+#                                                                                        #
+#   Índice de prefijos por usuario en memoria del proceso: una lista ordenada de         #
+#   claves normalizadas (minúsculas, sin acentos) recorrida con `bisect`.                #
+#                                                                                        #
+#   - Cada título, nombre de autor ("nombre apellido" y "apellido nombre") y serie       #
+#     aporta una clave por cada palabra significativa en la que empieza, así "sol"       #
+#     encuentra "Cien años de soledad".                                                  #
+#   - Las altas, cambios y bajas de `Book`/`Author` en este proceso actualizan el        #
+#     índice en el sitio (ver catalog/signals.py); los demás procesos lo reconstruyen    #
+#     al ver una versión de biblioteca distinta (`LibraryVersion`).                      #
+#                                                                                        #
+###########################################################################################
+
+import threading
+from bisect import bisect_left, insort
+
+from django.urls import reverse
+
+from .identifiers import STOP_WORDS, WORD_RE, strip_accents
+from .models import Author, Book, LibraryVersion
+
+BOOK = "book"
+AUTHOR = "author"
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Índices cargados en este proceso: user_id -> _UserIndex
+_indexes = {}
+_lock = threading.Lock()
+
+
+def normalize(text):
+    """Clave de búsqueda: palabras en minúsculas sin acentos separadas por un espacio."""
+    return " ".join(WORD_RE.findall(strip_accents(text)))
+
+
+def _keys_for(*texts):
+    """Claves que empiezan en cada palabra significativa de los textos."""
+    keys = set()
+    for text in texts:
+        words = normalize(text).split()
+        for position, word in enumerate(words):
+            if position == 0 or word not in STOP_WORDS:
+                keys.add(" ".join(words[position:]))
+    keys.discard("")
+    return keys
+
+
+def _book_entry(pk, title, series):
+    label = f"{title} ({series})" if series else title
+    return label, _keys_for(title, series or "")
+
+
+def _author_entry(pk, first_name, last_name):
+    return f"{first_name} {last_name}", _keys_for(f"{first_name} {last_name}", f"{last_name} {first_name}")
+
+
+class _UserIndex:
+    """Claves ordenadas (clave, tipo, id) y etiqueta de cada objeto."""
+
+    def __init__(self, version):
+        self.version = version
+        self.entries = []
+        self.objects = {}  # (tipo, id) -> (etiqueta, claves)
+
+    def put(self, kind, pk, label, keys):
+        self.remove(kind, pk)
+        self.objects[(kind, pk)] = (label, keys)
+        for key in keys:
+            insort(self.entries, (key, kind, pk))
+
+    def remove(self, kind, pk):
+        previous = self.objects.pop((kind, pk), None)
+        if previous is None:
+            return
+        for key in previous[1]:
+            position = bisect_left(self.entries, (key, kind, pk))
+            if position < len(self.entries) and self.entries[position] == (key, kind, pk):
+                del self.entries[position]
+
+    def search(self, prefix, kinds, limit):
+        results = []
+        seen = set()
+        position = bisect_left(self.entries, (prefix,))
+        while position < len(self.entries) and len(results) < limit:
+            key, kind, pk = self.entries[position]
+            if not key.startswith(prefix):
+                break
+            position += 1
+            if kind in kinds and (kind, pk) not in seen:
+                seen.add((kind, pk))
+                results.append((kind, pk, self.objects[(kind, pk)][0]))
+        return results
+
+
+def _library_version(user_id):
+    return LibraryVersion.objects.filter(user_id=user_id).values_list("last_modified", flat=True).first()
+
+
+def _build(user_id, version):
+    index = _UserIndex(version)
+    objects = {}
+    for pk, title, series in Book.objects.filter(user_id=user_id).values_list("pk", "title", "series").iterator():
+        objects[(BOOK, pk)] = _book_entry(pk, title, series)
+    for pk, first_name, last_name in Author.objects.filter(user_id=user_id).values_list(
+        "pk", "first_name", "last_name"
+    ).iterator():
+        objects[(AUTHOR, pk)] = _author_entry(pk, first_name, last_name)
+
+    # Construcción en bloque: un solo sort en lugar de inserciones ordenadas
+    index.objects = objects
+    index.entries = sorted(
+        (key, kind, pk) for (kind, pk), (_, keys) in objects.items() for key in keys
+    )
+    return index
+
+
+def get_index(user_id):
+    """Índice del usuario, reconstruido si la biblioteca cambió en otro proceso."""
+    version = _library_version(user_id)
+    index = _indexes.get(user_id)
+    if index is None or index.version != version:
+        index = _build(user_id, version)
+        with _lock:
+            _indexes[user_id] = index
+    return index
+
+
+# -------------------
+# Actualización incremental (señales)
+# -------------------
+
+def version_before_change(user_id):
+    """
+    Versión de la biblioteca antes de un alta/cambio/baja (señales pre_*).
+
+    Solo se consulta si este proceso tiene el índice del usuario cargado.
+    """
+    if user_id not in _indexes:
+        return None
+    return _library_version(user_id)
+
+
+def _loaded_index(user_id, previous_version):
+    index = _indexes.get(user_id)
+    if index is None:
+        return None
+    if index.version != previous_version:
+        # Otro proceso cambió antes la biblioteca: el índice ya estaba desfasado y
+        # adoptar la versión nueva ocultaría esos cambios; se reconstruye al consultar
+        with _lock:
+            _indexes.pop(user_id, None)
+        return None
+    # La señal de versión ya se emitió: se adopta para no reconstruir
+    index.version = _library_version(user_id)
+    return index
+
+
+def book_saved(book, previous_version):
+    index = _loaded_index(book.user_id, previous_version)
+    if index is not None:
+        with _lock:
+            index.put(BOOK, book.pk, *_book_entry(book.pk, book.title, book.series))
+
+
+def author_saved(author, previous_version):
+    index = _loaded_index(author.user_id, previous_version)
+    if index is not None:
+        with _lock:
+            index.put(AUTHOR, author.pk, *_author_entry(author.pk, author.first_name, author.last_name))
+
+
+def removed(kind, user_id, pk, previous_version):
+    index = _loaded_index(user_id, previous_version)
+    if index is not None:
+        with _lock:
+            index.remove(kind, pk)
+
+
+# -------------------
+# Consulta
+# -------------------
+
+def suggest(user_id, query, kinds=(BOOK, AUTHOR), limit=DEFAULT_LIMIT):
+    """Hasta `limit` sugerencias [{kind, id, label, url}] cuyo texto empieza por `query`."""
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    # Un espacio final significa que la última palabra ya está completa
+    if query.endswith(" "):
+        prefix += " "
+
+    index = get_index(user_id)
+    with _lock:
+        matches = index.search(prefix, set(kinds), min(limit, MAX_LIMIT))
+
+    url_names = {BOOK: "detail_book", AUTHOR: "detail_author"}
+    return [
+        {"kind": kind, "id": pk, "label": label, "url": reverse(url_names[kind], args=[pk])}
+        for kind, pk, label in matches
+    ]
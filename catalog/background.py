@@ -0,0 +1,40 @@
+"""
+Ejecución de tareas en segundo plano.
+
+Por defecto se lanza en un hilo daemon del propio proceso web después de
+confirmar la transacción. Con `JOB_QUEUE_ENABLED` (JOB_QUEUE=on) la tarea se
+encola en la base de datos (`catalog.jobs`) y la ejecuta un proceso de
+`manage.py run_worker`: sobrevive a reinicios y se reintenta si falla.
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from . import jobs
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception as e:
+        print(f"Error en tarea en segundo plano {func.__name__}: {e}")
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Programa `func(*args, **kwargs)` al confirmar la transacción.
+
+    Con la cola activa los argumentos deben ser serializables en JSON.
+    """
+    if settings.JOB_QUEUE_ENABLED:
+        jobs.enqueue(func, *args, **kwargs)
+        return
+
+    def start():
+        threading.Thread(target=_run, args=(func, args, kwargs), daemon=True).start()
+
+    transaction.on_commit(start)
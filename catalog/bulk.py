@@ -0,0 +1,186 @@
+###########################################################################################
+#                                                                                        #
+#                                 ACCIONES EN LOTE                                       #
+#                                                                                        #
+#   Mover, recategorizar, añadir a un Babel o eliminar muchos libros a la vez (la        #
+#   selección del listado o todo el resultado del filtro actual).                        #
+#                                                                                        #
+#   - Los ids se procesan por bloques de `CHUNK_SIZE` con UPDATE/DELETE por conjunto,    #
+#     todo dentro de una transacción: o se aplica la acción completa o nada.             #
+#   - No se guardan libros uno a uno (sin señales): al confirmar se reconstruyen los     #
+#     contadores del usuario y se marca la biblioteca como modificada.                   #
+#   - Al eliminar, los archivos (PDF, imagen) y el índice de texto completo se limpian   #
+#     en segundo plano después de confirmar.                                             #
+#                                                                                        #
+###########################################################################################
+
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import counters, fulltext
+from .background import run_in_background
+from .conditional import touch_library
+from .models import Author, Babel, Book, Classification, Drawer, Gender, Shelf
+
+CHUNK_SIZE = 500
+
+MOVE_SHELF = "estante"
+MOVE_DRAWER = "cajon"
+SET_CLASSIFICATION = "clasificacion"
+SET_GENRE = "genero"
+ADD_TO_BABEL = "babel"
+DELETE = "eliminar"
+
+# acción -> modelo del destino (None si la acción no lleva destino)
+ACTIONS = {
+    MOVE_SHELF: Shelf,
+    MOVE_DRAWER: Drawer,
+    SET_CLASSIFICATION: Classification,
+    SET_GENRE: Gender,
+    ADD_TO_BABEL: Babel,
+    DELETE: None,
+}
+
+ACTION_LABELS = {
+    MOVE_SHELF: "Mover a estante",
+    MOVE_DRAWER: "Mover a cajón",
+    SET_CLASSIFICATION: "Asignar clasificación",
+    SET_GENRE: "Asignar género",
+    ADD_TO_BABEL: "Añadir a Babel",
+    DELETE: "Eliminar",
+}
+
+
+class BulkActionError(Exception):
+    pass
+
+
+def _chunks(ids):
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+# -------------------
+# Cambios por conjunto
+# -------------------
+
+def _location_values(action, target):
+    """Columnas a escribir para mover o recategorizar (incluidas las efectivas)."""
+    if action == MOVE_SHELF:
+        return {"shelf_id": target.pk, "drawer_id": None, "effective_shelf_id": target.pk}
+    if action == MOVE_DRAWER:
+        return {"drawer_id": target.pk, "shelf_id": target.shelf_id, "effective_shelf_id": target.shelf_id}
+    if action == SET_CLASSIFICATION:
+        return {"classification_id": target.pk, "genre_id": None, "effective_classification_id": target.pk}
+    return {
+        "genre_id": target.pk,
+        "classification_id": target.classification_id,
+        "effective_classification_id": target.classification_id,
+    }
+
+
+def _add_to_babel(babel, ids):
+    through = Babel.books.through
+    present = set(through.objects.filter(babel=babel, book_id__in=ids).values_list("book_id", flat=True))
+    through.objects.bulk_create(
+        [through(babel_id=babel.pk, book_id=book_id) for book_id in ids if book_id not in present]
+    )
+    # La tarjeta del Babel lista sus libros: su fecha cambia igual que al editarlo
+    Babel.objects.filter(pk=babel.pk).update(updated_at=timezone.now())
+
+
+def _delete_rows(queryset):
+    # DELETE directo, sin cargar instancias ni enviar señales
+    return queryset._raw_delete(queryset.db)
+
+
+def _delete_books(ids):
+    """
+    Elimina libros y sus filas dependientes con un DELETE por tabla.
+
+    Las relaciones se leen del modelo (progreso, Babels, vecinos similares...), así
+    una tabla nueva que apunte a `Book` no queda con filas huérfanas.
+    """
+    for relation in Book._meta.get_fields(include_hidden=True):
+        if not relation.auto_created or relation.concrete or relation.many_to_many:
+            continue
+        related = relation.related_model.objects.filter(**{f"{relation.field.name}__in": ids})
+        if relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+        else:
+            _delete_rows(related)
+    return _delete_rows(Book.objects.filter(pk__in=ids))
+
+
+# -------------------
+# Limpieza diferida
+# -------------------
+
+def _is_referenced(name):
+    return (
+        Book.objects.filter(Q(pdf_file=name) | Q(image=name)).exists()
+        or Author.objects.filter(image=name).exists()
+    )
+
+
+def cleanup_deleted(user_id, book_ids, file_names):
+    """Borra del índice de texto los libros eliminados y los archivos que ya nadie usa."""
+    for book_id in book_ids:
+        fulltext.remove_book(user_id, book_id)
+    for name in file_names:
+        if _is_referenced(name):
+            continue
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            print(f"Error eliminando archivo {name}: {e}")
+
+
+# -------------------
+# Punto de entrada
+# -------------------
+
+def resolve_target(user, action, target_id):
+    """Destino de la acción, siempre del mismo usuario (None para eliminar)."""
+    if action not in ACTIONS:
+        raise BulkActionError("Acción no válida")
+    model = ACTIONS[action]
+    if model is None:
+        return None
+    target = model.objects.filter(pk=target_id, user=user).first() if str(target_id).isdigit() else None
+    if target is None:
+        raise BulkActionError("Destino no válido")
+    return target
+
+
+def apply(user, books, action, target=None):
+    """
+    Aplica `action` a los libros del queryset `books` (del usuario).
+
+    Devuelve el número de libros afectados.
+    """
+    ids = list(books.filter(user=user).order_by("pk").values_list("pk", flat=True))
+    if not ids:
+        return 0
+
+    file_names = []
+    with transaction.atomic():
+        for chunk in _chunks(ids):
+            if action == ADD_TO_BABEL:
+                _add_to_babel(target, chunk)
+            elif action == DELETE:
+                for pdf_name, image_name in Book.objects.filter(pk__in=chunk).values_list("pdf_file", "image"):
+                    file_names.extend(name for name in (pdf_name, image_name) if name)
+                _delete_books(chunk)
+            else:
+                Book.objects.filter(pk__in=chunk).update(
+                    updated_at=timezone.now(), **_location_values(action, target)
+                )
+
+        counters.schedule_recompute(user.pk)
+        transaction.on_commit(lambda: touch_library(user.pk))
+        if action == DELETE:
+            run_in_background(cleanup_deleted, user.pk, ids, file_names)
+    return len(ids)
@@ -0,0 +1,102 @@
+###########################################################################################
+#                                                                                        #
+#                                  GET CONDICIONAL (304)                                 #
+#                                                                                        #
+#   Cada usuario tiene una marca `LibraryVersion.last_modified` que se actualiza con     #
+#   cualquier cambio de su catálogo (ver `catalog.signals`). Los listados y detalles     #
+#   la usan con el decorador `condition()` de Django: si nada cambió, el navegador       #
+#   recibe un 304 sin ejecutar la vista ni el motor de plantillas.                       #
+#                                                                                        #
+#   El ETag combina la marca (con microsegundos), el usuario, la URL completa y el       #
+#   token CSRF, porque las páginas incluyen formularios con ese token.                   #
+#   Incrementar PAGE_VERSION al cambiar plantillas para invalidar las copias de los      #
+#   navegadores.                                                                         #
+#                                                                                        #
+###########################################################################################
+
+import hashlib
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import LibraryVersion
+
+PAGE_VERSION = "1"
+
+
+def touch_library(user_id):
+    """Marca la biblioteca del usuario como modificada ahora."""
+    if not user_id:
+        return
+    now = timezone.now()
+    if not LibraryVersion.objects.filter(user_id=user_id).update(last_modified=now):
+        LibraryVersion.objects.get_or_create(user_id=user_id, defaults={"last_modified": now})
+
+
+def _memoized(request, key, compute):
+    # Con mensajes pendientes (p. ej. el resultado de una acción en lote) la página
+    # debe renderizarse para mostrarlos: sin versión no hay 304
+    if len(getattr(request, "_messages", ())):
+        return None
+    # condition() llama por separado a etag_func y last_modified_func
+    memo = request.__dict__.setdefault("_library_version_memo", {})
+    if key not in memo:
+        memo[key] = compute()
+    return memo[key]
+
+
+def library_last_modified(request, *args, **kwargs):
+    """Última modificación de la biblioteca del usuario autenticado."""
+    return _memoized(request, "library", lambda: (
+        LibraryVersion.objects.filter(user=request.user)
+        .values_list("last_modified", flat=True)
+        .first()
+    ))
+
+
+def owner_last_modified(model):
+    """Última modificación de la biblioteca del dueño del objeto `model(pk)`."""
+    lookup = f"user__{model._meta.model_name}__pk"
+
+    def last_modified(request, pk, *args, **kwargs):
+        return _memoized(request, (model._meta.model_name, pk), lambda: (
+            LibraryVersion.objects.filter(**{lookup: pk})
+            .values_list("last_modified", flat=True)
+            .first()
+        ))
+
+    return last_modified
+
+
+def _etag_for(last_modified_func):
+    def etag(request, *args, **kwargs):
+        last_modified = last_modified_func(request, *args, **kwargs)
+        if last_modified is None:
+            return None
+        raw = "|".join([
+            PAGE_VERSION,
+            str(request.user.pk),
+            last_modified.isoformat(),
+            request.get_full_path(),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+        ])
+        return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+    return etag
+
+
+def library_conditions():
+    """Argumentos de `condition()` para listados del usuario."""
+    return {
+        "etag_func": _etag_for(library_last_modified),
+        "last_modified_func": library_last_modified,
+    }
+
+
+def owner_conditions(model):
+    """Argumentos de `condition()` para vistas de detalle `vista(request, pk)`."""
+    last_modified = owner_last_modified(model)
+    return {
+        "etag_func": _etag_for(last_modified),
+        "last_modified_func": last_modified,
+    }
@@ -0,0 +1,214 @@
+###########################################################################################
+#                                                                                        #
+#                                 CONTADORES DE BIBLIOTECA                               #
+#                                                                                        #
+#   Mantiene la tabla `LibraryCounter` (libros, páginas leídas y libros terminados por   #
+#   usuario y entidad) sin recalcular COUNT(*) en cada vista.                            #
+#                                                                                        #
+#   - `catalog.signals` aplica deltas incrementales al guardar/eliminar libros,          #
+#     progresos de lectura y miembros de Babels.                                         #
+#   - `recompute_user_counters` reconstruye los contadores de un usuario completo        #
+#     (lo usa `manage.py recompute_counters` y los cambios de taxonomía poco frecuentes). #
+#   - `counters_for` / `counter_for` son las lecturas usadas por las vistas.             #
+#                                                                                        #
+###########################################################################################
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Babel, Book, LibraryCounter, ReadingProgress
+
+
+# Columnas necesarias para ubicar un libro en todas sus entidades (sin JOIN)
+BOOK_ROW_FIELDS = (
+    "id", "user_id", "page_count",
+    "effective_shelf_id", "drawer_id",
+    "genre_id", "effective_classification_id",
+    "author_id",
+)
+
+
+# -------------------
+# Cálculo de contribuciones
+# -------------------
+
+def entity_keys(row, babel_ids=()):
+    """
+    Devuelve el conjunto de claves (entity_type, entity_id) a las que suma un libro.
+
+    Estante y clasificación son las columnas efectivas del libro (ver
+    catalog/taxonomy.py), las mismas que usan los filtros de las vistas.
+    """
+    keys = {(LibraryCounter.LIBRARY, 0)}
+
+    if row["effective_shelf_id"]:
+        keys.add((LibraryCounter.SHELF, row["effective_shelf_id"]))
+    if row["drawer_id"]:
+        keys.add((LibraryCounter.DRAWER, row["drawer_id"]))
+    if row["genre_id"]:
+        keys.add((LibraryCounter.GENRE, row["genre_id"]))
+    if row["effective_classification_id"]:
+        keys.add((LibraryCounter.CLASSIFICATION, row["effective_classification_id"]))
+    if row["author_id"]:
+        keys.add((LibraryCounter.AUTHOR, row["author_id"]))
+    for babel_id in babel_ids:
+        keys.add((LibraryCounter.BABEL, babel_id))
+
+    return keys
+
+
+def is_finished(last_page, page_count):
+    """Un libro está terminado cuando la última página alcanza el total."""
+    return bool(page_count) and (last_page or 0) >= page_count
+
+
+def book_snapshot(book_id):
+    """
+    Lee de la base de datos la contribución actual de un libro.
+
+    Devuelve un diccionario con `user_id`, `keys`, `page_count` y `last_page`
+    (progreso del dueño), o None si el libro no existe o no tiene dueño.
+    """
+    row = Book.objects.filter(pk=book_id).values(*BOOK_ROW_FIELDS).first()
+    if not row or not row["user_id"]:
+        return None
+
+    babel_ids = Babel.books.through.objects.filter(book_id=book_id).values_list("babel_id", flat=True)
+    last_page = (
+        ReadingProgress.objects.filter(user_id=row["user_id"], book_id=book_id)
+        .values_list("last_page", flat=True)
+        .first()
+    )
+    return {
+        "user_id": row["user_id"],
+        "keys": entity_keys(row, babel_ids),
+        "page_count": row["page_count"],
+        "last_page": last_page or 0,
+    }
+
+
+# -------------------
+# Aplicación de deltas
+# -------------------
+
+def add_snapshot(deltas, snapshot, sign=1, books=1, keys=None):
+    """
+    Acumula en `deltas` la contribución de un snapshot (con signo).
+
+    `books` permite sumar solo páginas/terminados (books=0) y `keys` restringir
+    las entidades afectadas (p. ej. un solo Babel).
+    """
+    if not snapshot:
+        return deltas
+    pages = snapshot["last_page"]
+    finished = 1 if is_finished(pages, snapshot["page_count"]) else 0
+    for key in (snapshot["keys"] if keys is None else keys):
+        delta = deltas[(snapshot["user_id"],) + tuple(key)]
+        delta[0] += sign * books
+        delta[1] += sign * pages
+        delta[2] += sign * finished
+    return deltas
+
+
+def new_deltas():
+    return defaultdict(lambda: [0, 0, 0])
+
+
+def apply_deltas(deltas):
+    """
+    Aplica los deltas acumulados con UPDATE ... SET col = col + n.
+
+    Si la fila del contador no existe se crea; en caso de carrera en la
+    creación se reintenta el UPDATE.
+    """
+    for (user_id, entity_type, entity_id), (books, pages, finished) in deltas.items():
+        if not (books or pages or finished):
+            continue
+
+        lookup = {"user_id": user_id, "entity_type": entity_type, "entity_id": entity_id}
+        changes = {
+            "book_count": F("book_count") + books,
+            "pages_read": F("pages_read") + pages,
+            "finished_count": F("finished_count") + finished,
+        }
+        if LibraryCounter.objects.filter(**lookup).update(**changes):
+            continue
+
+        try:
+            with transaction.atomic():
+                LibraryCounter.objects.create(
+                    book_count=books, pages_read=pages, finished_count=finished, **lookup
+                )
+        except IntegrityError:
+            LibraryCounter.objects.filter(**lookup).update(**changes)
+
+
+# -------------------
+# Reconstrucción completa
+# -------------------
+
+def recompute_user_counters(user_id):
+    """
+    Reconstruye todos los contadores de un usuario desde cero.
+
+    Usa una consulta para los libros, una para el progreso y una para los
+    miembros de Babels; el resto se agrega en memoria.
+    """
+    progress = dict(
+        ReadingProgress.objects.filter(user_id=user_id).values_list("book_id", "last_page")
+    )
+    babels_by_book = defaultdict(list)
+    memberships = Babel.books.through.objects.filter(book__user_id=user_id).values_list("book_id", "babel_id")
+    for book_id, babel_id in memberships:
+        babels_by_book[book_id].append(babel_id)
+
+    totals = new_deltas()
+    for row in Book.objects.filter(user_id=user_id).values(*BOOK_ROW_FIELDS).iterator():
+        add_snapshot(totals, {
+            "user_id": user_id,
+            "keys": entity_keys(row, babels_by_book.get(row["id"], ())),
+            "page_count": row["page_count"],
+            "last_page": progress.get(row["id"], 0),
+        })
+
+    with transaction.atomic():
+        LibraryCounter.objects.filter(user_id=user_id).delete()
+        LibraryCounter.objects.bulk_create([
+            LibraryCounter(
+                user_id=user_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                book_count=books,
+                pages_read=pages,
+                finished_count=finished,
+            )
+            for (_, entity_type, entity_id), (books, pages, finished) in totals.items()
+        ])
+
+
+def schedule_recompute(user_id):
+    """Programa la reconstrucción de un usuario al confirmar la transacción actual."""
+    if user_id:
+        transaction.on_commit(lambda: recompute_user_counters(user_id))
+
+
+# -------------------
+# Lecturas
+# -------------------
+
+def counters_for(user, entity_type):
+    """Mapa entity_id -> LibraryCounter de un tipo de entidad (una sola consulta indexada)."""
+    return {
+        counter.entity_id: counter
+        for counter in LibraryCounter.objects.filter(user=user, entity_type=entity_type)
+    }
+
+
+def counter_for(user, entity_type, entity_id=0):
+    """Contador de una entidad concreta; devuelve uno vacío (sin guardar) si no existe."""
+    counter = LibraryCounter.objects.filter(
+        user=user, entity_type=entity_type, entity_id=entity_id
+    ).first()
+    return counter or LibraryCounter(entity_type=entity_type, entity_id=entity_id)
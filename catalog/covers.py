@@ -0,0 +1,176 @@
+###########################################################################################
+#                                                                                        #
+#                                 PORTADAS POR DEFECTO                                   #
+#                                                                                        #
+#   Los libros sin imagen ya no guardan un PNG al crearse: la portada se dibuja bajo     #
+#   demanda en `/portadas/<tema>/<ancho>x<alto>/?titulo=...` con                         #
+#   `generate_default_book_image`.                                                       #
+#                                                                                        #
+#   - La clave es un hash de (versión, tema, tamaño, título): la misma URL siempre       #
+#     produce la misma imagen, así que se sirve con `Cache-Control: immutable`.          #
+#   - Las imágenes generadas se guardan en `DEFAULT_COVER_CACHE_DIR`, un LRU en disco    #
+#     limitado a `DEFAULT_COVER_CACHE_MAX_BYTES` (cada acierto renueva la fecha del      #
+#     archivo; al superar el límite se borran los menos usados).                         #
+#                                                                                        #
+###########################################################################################
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlencode
+
+from babelius import metrics
+from django.conf import settings
+from django.urls import reverse
+
+from .utils import generate_default_book_image
+
+# Cambiar al modificar el dibujo: invalida las URLs (y cachés de navegador) anteriores
+COVER_VERSION = 1
+
+# tema -> (fondo, texto)
+THEMES = {
+    "oscuro": ("#1F2937", "#FFD700"),
+    "claro": ("#F3F4F6", "#1F2937"),
+    "sepia": ("#F4ECD8", "#5B4636"),
+}
+DEFAULT_THEME = "oscuro"
+
+# Solo se dibujan tamaños conocidos (evita generar imágenes arbitrariamente grandes)
+SIZES = {(400, 600), (200, 300)}
+DEFAULT_SIZE = (400, 600)
+
+# El título se recorta: más texto no cabe en la portada
+MAX_TITLE_LENGTH = 200
+
+# Cada cuántas escrituras se revisa el tamaño total de la caché
+PRUNE_EVERY = 50
+
+_writes = {"count": 0}
+_prune_lock = threading.Lock()
+
+
+def cover_key(title, width, height, theme):
+    raw = f"{COVER_VERSION}|{theme}|{width}x{height}|{title}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cover_url(title, size=DEFAULT_SIZE, theme=DEFAULT_THEME):
+    """URL de la portada por defecto de un título."""
+    width, height = size
+    path = reverse("default_cover", kwargs={"theme": theme, "width": width, "height": height})
+    return f"{path}?{urlencode({'titulo': (title or '')[:MAX_TITLE_LENGTH], 'v': COVER_VERSION})}"
+
+
+# -------------------
+# Caché en disco (LRU)
+# -------------------
+
+def _cache_dir():
+    return Path(settings.DEFAULT_COVER_CACHE_DIR)
+
+
+def _cache_path(key):
+    return _cache_dir() / key[:2] / f"{key}.png"
+
+
+def draw_cover(title, width, height, theme):
+    """Bytes PNG de la portada (sin caché)."""
+    bg_color, text_color = THEMES[theme]
+    image_file = generate_default_book_image(
+        title, width=width, height=height, bg_color=bg_color, text_color=text_color
+    )
+    if image_file is None:
+        raise ValueError("No se pudo generar la portada")
+    return image_file.read()
+
+
+def write_cover(path, data):
+    """Escritura atómica: otro proceso puede estar sirviendo la misma clave."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def _validate(title, width, height, theme):
+    if theme not in THEMES or (width, height) not in SIZES:
+        raise ValueError("Tema o tamaño de portada no válido")
+    return (title or "").strip()[:MAX_TITLE_LENGTH]
+
+
+def render_cover(title, width, height, theme):
+    """
+    Devuelve (clave, bytes PNG) de la portada, desde la caché en disco si existe.
+
+    Lanza ValueError si el tema o el tamaño no están permitidos.
+    """
+    title = _validate(title, width, height, theme)
+    key = cover_key(title, width, height, theme)
+    path = _cache_path(key)
+
+    try:
+        data = path.read_bytes()
+        os.utime(path)  # acierto: pasa a ser el más reciente
+        metrics.CACHE_REQUESTS.inc(cache="covers", result="hit")
+        return key, data
+    except FileNotFoundError:
+        metrics.CACHE_REQUESTS.inc(cache="covers", result="miss")
+
+    with metrics.PIPELINE_SECONDS.time(stage="cover_render"):
+        data = draw_cover(title, width, height, theme)
+    write_cover(path, data)
+
+    _writes["count"] += 1
+    if _writes["count"] % PRUNE_EVERY == 0:
+        prune_cache()
+    return key, data
+
+
+def render_to_cache(title, width, height, theme, force=False):
+    """
+    Dibuja la portada en la caché si no estaba (o siempre con `force`).
+
+    Pensada para procesos de un pool (`manage.py regenerate_covers`): no poda la
+    caché. Devuelve los bytes escritos (0 si ya existía).
+    """
+    title = _validate(title, width, height, theme)
+    path = _cache_path(cover_key(title, width, height, theme))
+    if not force and path.exists():
+        return 0
+    data = draw_cover(title, width, height, theme)
+    write_cover(path, data)
+    return len(data)
+
+
+def prune_cache(max_bytes=None):
+    """Borra las portadas menos usadas hasta dejar la caché por debajo del límite."""
+    max_bytes = settings.DEFAULT_COVER_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not _prune_lock.acquire(blocking=False):
+        return 0  # ya hay una limpieza en curso en este proceso
+    try:
+        entries = []
+        total = 0
+        for path in _cache_dir().glob("*/*.png"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+    finally:
+        _prune_lock.release()
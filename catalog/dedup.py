@@ -0,0 +1,233 @@
+###########################################################################################
+#                                                                                        #
+#                                DETECCIÓN DE DUPLICADOS                                 #
+#                                                                                        #
+#   Usa las claves normalizadas de `Book` (isbn_key, doi_key, title_key; ver             #
+#   catalog/identifiers.py):                                                             #
+#                                                                                        #
+#   - `find_duplicates(...)`  -> consulta indexada al crear/editar un libro.             #
+#   - `identifier_errors(...)`-> ISBN/DOI que impiden guardar: no válidos o ya usados    #
+#                                (son únicos por usuario; el título solo avisa).         #
+#   - `duplicate_groups(...)` -> informe por lotes con "blocking": solo se comparan      #
+#                                libros que comparten un bloque (misma clave o mismo     #
+#                                apellido + palabra del título), nunca todos los pares.  #
+#   - `merge_books(...)`      -> fusiona un duplicado en otro libro (progreso de         #
+#                                lectura y Babels incluidos).                            #
+#                                                                                        #
+###########################################################################################
+
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from .identifiers import normalize_doi, normalize_isbn, title_fingerprint, validate_doi, validate_isbn
+from .models import Author, Book, ReadingProgress
+
+# Similitud mínima (Jaccard de palabras del título) dentro de un bloque aproximado
+TITLE_SIMILARITY = 0.8
+
+# Los bloques aproximados más grandes se descartan: son palabras demasiado comunes
+# y compararlos entero volvería cuadrático el informe
+MAX_BLOCK_SIZE = 200
+
+# Campos que el libro conservado toma del duplicado si los tiene vacíos
+MERGE_FILL_FIELDS = (
+    "subtitle", "isbn", "doi", "publication_date", "place_of_publication", "edition",
+    "volume", "page_count", "translator", "editor", "pdf_file", "url", "language",
+    "series", "synopsis",
+)
+
+
+# -------------------
+# Consulta al crear
+# -------------------
+
+def keys_for(title="", author_id=None, isbn="", doi=""):
+    """Claves normalizadas para datos de formulario (antes de crear el libro)."""
+    last_name = ""
+    if author_id:
+        last_name = Author.objects.filter(pk=author_id).values_list("last_name", flat=True).first() or ""
+    return {
+        "isbn_key": normalize_isbn(isbn),
+        "doi_key": normalize_doi(doi),
+        "title_key": title_fingerprint(title, last_name),
+    }
+
+
+def find_duplicates(user, isbn_key="", doi_key="", title_key="", exclude_pk=None):
+    """
+    Libros del usuario que comparten alguna clave no vacía.
+
+    Cada condición usa su índice (user, clave). Devuelve una lista de
+    (libro, motivos) con motivos en {"isbn", "doi", "title"}.
+    """
+    keys = {"isbn_key": isbn_key, "doi_key": doi_key, "title_key": title_key}
+    condition = Q()
+    for field, value in keys.items():
+        if value:
+            condition |= Q(**{field: value})
+    if not condition:
+        return []
+
+    books = Book.objects.filter(condition, user=user).select_related("author")
+    if exclude_pk:
+        books = books.exclude(pk=exclude_pk)
+
+    return [
+        (book, [field.split("_")[0] for field, value in keys.items() if value and getattr(book, field) == value])
+        for book in books[:20]
+    ]
+
+
+def identifier_errors(user, isbn="", doi="", exclude_pk=None):
+    """
+    Errores de ISBN/DOI que impiden guardar un libro (lista de textos).
+
+    A diferencia del título (un posible duplicado solo se avisa), ISBN y DOI
+    son únicos por usuario: uno ya usado por otro libro se rechaza.
+    """
+    errors = []
+    checks = (
+        ("ISBN", isbn, validate_isbn, "isbn_key", normalize_isbn),
+        ("DOI", doi, validate_doi, "doi_key", normalize_doi),
+    )
+    for label, value, validator, field, normalize in checks:
+        if not value:
+            continue
+        try:
+            validator(value)
+        except ValidationError as e:
+            errors.extend(e.messages)
+            continue
+        existing = Book.objects.filter(user=user, **{field: normalize(value)}).exclude(pk=exclude_pk).first()
+        if existing:
+            errors.append(f"Ya existe un libro con ese {label}: «{existing.title}» (edítalo o fusiona los libros).")
+    return errors
+
+
+# -------------------
+# Informe por bloques
+# -------------------
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, first, second):
+        root_first, root_second = self.find(first), self.find(second)
+        if root_first != root_second:
+            self.parent[max(root_first, root_second)] = min(root_first, root_second)
+
+
+def _similarity(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def duplicate_groups(user_id):
+    """
+    Grupos de posibles duplicados de un usuario (listas de ids, el más antiguo primero).
+
+    1. Bloques exactos: mismo isbn_key, doi_key o title_key -> duplicados directos.
+    2. Bloques aproximados: mismo apellido + una palabra del título; dentro del
+       bloque se comparan pares por similitud de palabras del título.
+
+    Cada libro cae en pocos bloques, así el coste es casi lineal en el tamaño
+    del catálogo.
+    """
+    rows = Book.objects.filter(user_id=user_id).values_list("id", "isbn_key", "doi_key", "title_key")
+
+    exact_blocks = defaultdict(list)
+    fuzzy_blocks = defaultdict(list)
+    tokens_by_book = {}
+    for book_id, isbn_key, doi_key, title_key in rows.iterator():
+        for kind, value in (("isbn", isbn_key), ("doi", doi_key), ("title", title_key)):
+            if value:
+                exact_blocks[(kind, value)].append(book_id)
+        if title_key:
+            author, _, words = title_key.partition(":")
+            tokens = set(words.split())
+            tokens_by_book[book_id] = tokens
+            for token in tokens:
+                fuzzy_blocks[(author, token)].append(book_id)
+
+    groups = _UnionFind()
+    for members in exact_blocks.values():
+        for other in members[1:]:
+            groups.union(members[0], other)
+
+    for members in fuzzy_blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for position, first in enumerate(members):
+            for second in members[position + 1:]:
+                if groups.find(first) == groups.find(second):
+                    continue
+                if _similarity(tokens_by_book[first], tokens_by_book[second]) >= TITLE_SIMILARITY:
+                    groups.union(first, second)
+
+    clusters = defaultdict(list)
+    for book_id in list(groups.parent):
+        clusters[groups.find(book_id)].append(book_id)
+    return sorted(
+        (sorted(members) for members in clusters.values() if len(members) > 1),
+        key=lambda members: members[0],
+    )
+
+
+# -------------------
+# Fusión
+# -------------------
+
+def merge_books(keep, duplicate):
+    """
+    Fusiona `duplicate` en `keep` y elimina el duplicado.
+
+    - El progreso de lectura se mueve al libro conservado (si el usuario ya
+      tenía progreso en ambos se queda la página más avanzada).
+    - Las membresías de Babels se pasan al libro conservado.
+    - Los campos vacíos de `keep` se completan con los del duplicado.
+
+    Se hace mediante altas y bajas normales para que las señales mantengan los
+    contadores y la versión de la biblioteca.
+    """
+    if keep.pk == duplicate.pk or keep.user_id != duplicate.user_id:
+        raise ValueError("Solo se pueden fusionar libros distintos del mismo usuario")
+
+    with transaction.atomic():
+        for progress in ReadingProgress.objects.filter(book=duplicate):
+            existing = ReadingProgress.objects.filter(user_id=progress.user_id, book=keep).first()
+            if existing is None:
+                ReadingProgress.objects.create(user_id=progress.user_id, book=keep, last_page=progress.last_page)
+            elif progress.last_page > existing.last_page:
+                existing.last_page = progress.last_page
+                existing.save()
+            progress.delete()
+
+        for babel in duplicate.babels.all():
+            babel.books.add(keep)
+        duplicate.babels.clear()
+
+        fill = {
+            field: getattr(duplicate, field)
+            for field in MERGE_FILL_FIELDS
+            if not getattr(keep, field) and getattr(duplicate, field)
+        }
+
+        # Primero se elimina el duplicado: ISBN y DOI son únicos por usuario
+        duplicate.delete()
+        if fill:
+            for field, value in fill.items():
+                setattr(keep, field, value)
+            keep.save()
+    return keep
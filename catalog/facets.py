@@ -0,0 +1,167 @@
+###########################################################################################
+#                                                                                        #
+#                                  FACETAS DEL LISTADO                                   #
+#                                                                                        #
+#   Conteos por opción de cada filtro de `read_books` (clasificación, género, idioma,    #
+#   tipo de portada, autor, estante y estado de lectura) para saber cuántos libros       #
+#   devolvería cada opción antes de elegirla.                                            #
+#                                                                                        #
+#   - Una sola consulta agrupada (GROUP BY sobre todas las dimensiones) con los          #
+#     filtros que no son facetas (búsqueda); el resto se suma en memoria.                #
+#   - El conteo de cada faceta respeta los demás filtros activos, pero no el suyo        #
+#     (así se ven las alternativas a la opción elegida).                                 #
+#   - El resultado se cachea por usuario, versión de la biblioteca y filtros.            #
+#                                                                                        #
+###########################################################################################
+
+import hashlib
+import json
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import CharField, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Author, Book, Classification, Gender, LibraryVersion, ReadingProgress, Shelf
+from .utils import LANGUAGES_ES
+
+# Estados de lectura (columna `ReadingProgress.status`; sin progreso = sin empezar)
+UNREAD = ReadingProgress.UNREAD
+READING = ReadingProgress.READING
+FINISHED = ReadingProgress.FINISHED
+STATUS_LABELS = dict(ReadingProgress.STATUSES)
+
+# faceta -> (parámetro GET, columna agrupada, etiqueta, ¿id numérico?)
+FACETS = {
+    "classification": ("classification", "effective_classification_id", "Clasificación", True),
+    "genre": ("genre", "genre_id", "Género", True),
+    "language": ("language", "language", "Idioma", False),
+    "cover": ("cover", "cover", "Portada", False),
+    "author": ("author", "author_id", "Autor", True),
+    "shelf": ("shelf", "effective_shelf_id", "Estante", True),
+    "status": ("status", "reading_status", "Estado", False),
+}
+
+FACET_CACHE_TIMEOUT = 60 * 10
+
+
+# -------------------
+# Filtros
+# -------------------
+
+def with_reading_status(books, user):
+    """Anota `reading_status` (sin empezar, leyendo, terminado) según el progreso del usuario."""
+    status = ReadingProgress.objects.filter(user=user, book=OuterRef("pk")).values("status")[:1]
+    return books.annotate(
+        reading_status=Coalesce(Subquery(status, output_field=CharField()), Value(UNREAD)),
+    )
+
+
+def parse_filters(params):
+    """Filtros de facetas válidos de un QueryDict: {faceta: valor en texto}."""
+    filters = {}
+    for facet, (param, _, _, numeric) in FACETS.items():
+        value = (params.get(param) or "").strip()
+        if value and (not numeric or value.isdigit()):
+            filters[facet] = value
+    if filters.get("status") not in STATUS_LABELS:
+        filters.pop("status", None)
+    return filters
+
+
+def apply_filters(books, filters):
+    """Aplica los filtros de facetas (cada uno es una igualdad sobre una columna)."""
+    return books.filter(**{FACETS[facet][1]: value for facet, value in filters.items()})
+
+
+# -------------------
+# Conteos
+# -------------------
+
+def _cache_key(user, signature):
+    version = LibraryVersion.objects.filter(user=user).values_list("last_modified", flat=True).first()
+    digest = hashlib.sha1(json.dumps(signature, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"facets:{user.pk}:{version.timestamp() if version else 0}:{digest}"
+
+
+def _count(base_books, filters):
+    """Una consulta agrupada; devuelve {faceta: {valor: conteo}}."""
+    columns = [column for _, column, _, _ in FACETS.values()]
+    rows = base_books.values(*columns).annotate(total=Count("id")).order_by()
+
+    counts = {facet: defaultdict(int) for facet in FACETS}
+    for row in rows:
+        # Facetas cuyo filtro activo no cumple esta combinación
+        failing = [
+            facet for facet, value in filters.items()
+            if str(row[FACETS[facet][1]]) != value
+        ]
+        if len(failing) > 1:
+            continue
+        for facet, (_, column, _, _) in FACETS.items():
+            if failing and failing[0] != facet:
+                continue
+            if row[column] not in (None, ""):
+                counts[facet][str(row[column])] += row["total"]
+    return counts
+
+
+def _labels(user, counts):
+    """Etiqueta de cada valor (solo se consultan los ids presentes)."""
+    def names(queryset, facet):
+        ids = [int(value) for value in counts[facet]]
+        return {str(pk): name for pk, name in queryset.filter(pk__in=ids).values_list("pk", "name")}
+
+    authors = {
+        str(pk): f"{last_name}, {first_name}"
+        for pk, first_name, last_name in Author.objects.filter(
+            pk__in=[int(value) for value in counts["author"]]
+        ).values_list("pk", "first_name", "last_name")
+    }
+    return {
+        "classification": names(Classification.objects.filter(user=user), "classification"),
+        "genre": names(Gender.objects.filter(user=user), "genre"),
+        "language": dict(LANGUAGES_ES),
+        "cover": dict(Book.COVERS),
+        "author": authors,
+        "shelf": names(Shelf.objects.filter(user=user), "shelf"),
+        "status": STATUS_LABELS,
+    }
+
+
+def facet_counts(user, base_books, filters, signature):
+    """
+    Facetas listas para la plantilla.
+
+    `base_books` son los libros del usuario con los filtros que no son facetas
+    (p. ej. la búsqueda) y `signature` los identifica para la caché.
+    Devuelve una lista de {name, param, label, options: [{value, label, count, selected}]}.
+    """
+    key = _cache_key(user, {"base": signature, "filters": filters})
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    counts = _count(with_reading_status(base_books, user), filters)
+    labels = _labels(user, counts)
+
+    result = []
+    for facet, (param, _, label, _) in FACETS.items():
+        options = [
+            {
+                "value": value,
+                "label": labels[facet].get(value, value),
+                "count": count,
+                "selected": filters.get(facet) == value,
+            }
+            for value, count in counts[facet].items()
+        ]
+        # La opción elegida se muestra aunque ya no tenga libros
+        if facet in filters and not any(option["selected"] for option in options):
+            value = filters[facet]
+            options.append({"value": value, "label": labels[facet].get(value, value), "count": 0, "selected": True})
+        options.sort(key=lambda option: option["label"].lower())
+        result.append({"name": facet, "param": param, "label": label, "options": options})
+
+    cache.set(key, result, FACET_CACHE_TIMEOUT)
+    return result
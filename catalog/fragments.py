@@ -0,0 +1,79 @@
+###########################################################################################
+#                                                                                        #
+#                               FRAGMENTOS DE TARJETAS EN CACHÉ                          #
+#                                                                                        #
+#   Las tarjetas de libros de `read_books` y `detail_babel` repiten el mismo HTML en     #
+#   cada visita (imagen, autor, ubicación, APA, barra de progreso). Aquí se cachea el    #
+#   cuerpo de cada tarjeta por libro:                                                    #
+#                                                                                        #
+#     - Clave: (plantilla, book.pk, book.updated_at, progreso, huella de relaciones).    #
+#     - Se leen todas las tarjetas con un único `cache.get_many` y solo se renderizan    #
+#       las que faltan, que se guardan con `cache.set_many`.                             #
+#                                                                                        #
+#   La huella de relaciones cubre nombres de autor, estante y cajón, que pueden          #
+#   cambiar sin tocar `Book.updated_at`.                                                 #
+#                                                                                        #
+###########################################################################################
+
+import hashlib
+
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+# Incrementar al cambiar las plantillas de tarjetas para invalidar lo cacheado
+CARD_FRAGMENT_VERSION = 1
+CARD_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+BOOK_CARD_TEMPLATE = "read/cards/book_card_body.html"
+BABEL_BOOK_CARD_TEMPLATE = "read/cards/babel_book_card_body.html"
+
+
+def _related_fingerprint(book):
+    """Huella corta de los datos relacionados que se muestran en la tarjeta."""
+    author = book.author
+    drawer = book.drawer
+    parts = [
+        f"{author.first_name}|{author.last_name}" if author else "",
+        f"{drawer.name}|{drawer.shelf.name}" if drawer else "",
+        book.shelf.name if book.shelf else "",
+    ]
+    return hashlib.md5("\x1f".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def card_cache_key(template_name, obj):
+    book = obj["instance"]
+    updated = book.updated_at.timestamp() if book.updated_at else 0
+    return ":".join([
+        "book_card",
+        str(CARD_FRAGMENT_VERSION),
+        template_name.rsplit("/", 1)[-1].split(".")[0],
+        str(book.pk),
+        f"{updated:.6f}",
+        str(obj.get("last_page", "")),
+        _related_fingerprint(book),
+    ])
+
+
+def attach_card_html(objects, template_name=BOOK_CARD_TEMPLATE):
+    """
+    Añade `card_html` a cada objeto ({'instance': book, ...}) usando la caché.
+
+    Los libros deben venir con `select_related('author', 'drawer__shelf', 'shelf')`
+    para que calcular las claves no dispare consultas adicionales.
+    """
+    keyed = {card_cache_key(template_name, obj): obj for obj in objects}
+    cached = cache.get_many(list(keyed))
+
+    template = None
+    rendered = {}
+    for key, obj in keyed.items():
+        html = cached.get(key)
+        if html is None:
+            template = template or get_template(template_name)
+            html = rendered[key] = template.render({"obj": obj})
+        obj["card_html"] = mark_safe(html)
+
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+    return objects
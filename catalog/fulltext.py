@@ -0,0 +1,263 @@
+###########################################################################################
+#                                                                                        #
+#                              BÚSQUEDA DE TEXTO COMPLETO EN PDFs                        #
+#                                                                                        #
+#   El texto de cada página se extrae una sola vez con PyPDF2 y se guarda en un índice   #
+#   invertido SQLite FTS5 por usuario (`FULLTEXT_INDEX_DIR/user_<id>.sqlite3`).           #
+#   Las búsquedas consultan solo ese índice: nunca se vuelven a abrir los PDFs.          #
+#                                                                                        #
+#   - `index_book(book_id)`     -> (re)indexa un libro si su PDF cambió.                 #
+#   - `remove_book(...)`        -> elimina un libro del índice.                          #
+#   - `count_pages(book_id)`    -> guarda el total de páginas de un PDF (tarea).         #
+#   - `search(user_id, query)`  -> aciertos por libro y página con fragmento resaltado.  #
+#   - `text_layer(...)`         -> capa de texto por página, comprimida y en caché, que  #
+#                                  usa el buscador del lector de PDF.                    #
+#                                                                                        #
+#   El indexado se lanza en segundo plano al subir/cambiar un PDF (ver signals) y se     #
+#   puede completar o reparar con `manage.py index_pdfs`.                                #
+#                                                                                        #
+###########################################################################################
+
+import gzip
+import json
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from babelius import metrics
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.html import escape
+from PyPDF2 import PdfReader
+
+from .models import Book
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+    text,
+    book_id UNINDEXED,
+    page UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS books (
+    book_id INTEGER PRIMARY KEY,
+    pdf_name TEXT NOT NULL,
+    page_count INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+"""
+
+# La capa de texto solo cambia al reindexar (la clave incluye `indexed_at`)
+TEXT_LAYER_TIMEOUT = 60 * 60 * 24 * 7
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+MARK_START, MARK_END = "\x02", "\x03"
+
+
+# -------------------
+# Conexión al índice
+# -------------------
+
+def index_path(user_id):
+    return Path(settings.FULLTEXT_INDEX_DIR) / f"user_{user_id}.sqlite3"
+
+
+def connect(user_id, create=True):
+    """Abre el índice de un usuario (o None si no existe y `create` es False)."""
+    path = index_path(user_id)
+    if not create and not path.exists():
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+# -------------------
+# Extracción e indexado
+# -------------------
+
+def extract_pages(path):
+    """Devuelve el texto de cada página del PDF (lista, una entrada por página)."""
+    reader = PdfReader(path)
+    pages = []
+    for page in reader.pages:
+        try:
+            pages.append(page.extract_text() or "")
+        except Exception:
+            pages.append("")  # página ilegible: se indexa vacía
+    return pages
+
+
+def count_pages(book_id):
+    """
+    Guarda el total de páginas de un libro con PDF que aún no lo tiene.
+
+    Se encola desde `read_pdf`: abrir el PDF con PyPDF2 no retrasa la respuesta.
+    Se guarda con `save()` para que las señales ajusten contadores y estado de lectura.
+    """
+    book = Book.objects.filter(pk=book_id).first()
+    if not book or not book.pdf_file or book.page_count:
+        return None
+    with metrics.PIPELINE_SECONDS.time(stage="pdf_page_count"):
+        book.page_count = len(PdfReader(book.pdf_file.path).pages)
+    book.save(update_fields=["page_count", "updated_at"])
+    return book.page_count
+
+
+def index_book(book_id, force=False):
+    """
+    Extrae e indexa el texto del PDF de un libro.
+
+    No hace nada si el índice ya corresponde al archivo actual (salvo `force`).
+    Devuelve el número de páginas indexadas o None si no se indexó.
+    """
+    book = Book.objects.filter(pk=book_id).only("id", "user_id", "pdf_file").first()
+    if not book or not book.user_id:
+        return None
+    if not book.pdf_file:
+        remove_book(book.user_id, book.pk)
+        return None
+
+    with closing(connect(book.user_id)) as connection:
+        row = connection.execute("SELECT pdf_name FROM books WHERE book_id = ?", (book.pk,)).fetchone()
+        if row and row[0] == book.pdf_file.name and not force:
+            return None
+
+    # La extracción es lenta: se hace fuera de la transacción del índice
+    with metrics.PIPELINE_SECONDS.time(stage="pdf_extract"):
+        pages = extract_pages(book.pdf_file.path)
+
+    with closing(connect(book.user_id)) as connection, connection:
+        connection.execute("DELETE FROM pages WHERE book_id = ?", (book.pk,))
+        connection.executemany(
+            "INSERT INTO pages (text, book_id, page) VALUES (?, ?, ?)",
+            [(text, book.pk, number) for number, text in enumerate(pages, start=1) if text.strip()],
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO books (book_id, pdf_name, page_count, indexed_at) VALUES (?, ?, ?, ?)",
+            (book.pk, book.pdf_file.name, len(pages), time.time()),
+        )
+    return len(pages)
+
+
+def remove_book(user_id, book_id):
+    """Elimina un libro del índice del usuario (si el índice existe)."""
+    connection = connect(user_id, create=False)
+    if connection is None:
+        return
+    with closing(connection), connection:
+        connection.execute("DELETE FROM pages WHERE book_id = ?", (book_id,))
+        connection.execute("DELETE FROM books WHERE book_id = ?", (book_id,))
+
+
+def indexed_books(user_id):
+    """Mapa book_id -> nombre del PDF indexado."""
+    connection = connect(user_id, create=False)
+    if connection is None:
+        return {}
+    with closing(connection):
+        return dict(connection.execute("SELECT book_id, pdf_name FROM books"))
+
+
+def book_index_info(user_id, book_id):
+    """Datos del indexado de un libro ({pdf_name, page_count, indexed_at}) o None."""
+    connection = connect(user_id, create=False)
+    if connection is None:
+        return None
+    with closing(connection):
+        row = connection.execute(
+            "SELECT pdf_name, page_count, indexed_at FROM books WHERE book_id = ?", (book_id,)
+        ).fetchone()
+    if not row:
+        return None
+    return {"pdf_name": row[0], "page_count": row[1], "indexed_at": row[2]}
+
+
+def page_texts(user_id, book_id, page=None):
+    """Texto indexado de un libro como {página: texto} (o solo de `page`)."""
+    connection = connect(user_id, create=False)
+    if connection is None:
+        return {}
+    sql = "SELECT page, text FROM pages WHERE book_id = ?"
+    params = [book_id]
+    if page is not None:
+        sql += " AND page = ?"
+        params.append(page)
+    with closing(connection):
+        return {int(number): text for number, text in connection.execute(sql, params)}
+
+
+def text_layer(user_id, book_id):
+    """
+    Capa de texto de un libro: JSON {page_count, pages: {página: texto}} comprimido
+    con gzip, junto con los datos del indexado.
+
+    Se cachea por (libro, indexed_at), así se sirve sin tocar el índice ni
+    recomprimir hasta que el PDF se reindexa. Devuelve (None, None) si el libro
+    aún no está indexado.
+    """
+    info = book_index_info(user_id, book_id)
+    if info is None:
+        return None, None
+
+    key = f"text_layer:{book_id}:{info['indexed_at']:.6f}"
+    payload = cache.get(key)
+    if payload is None:
+        data = {"page_count": info["page_count"], "pages": page_texts(user_id, book_id)}
+        payload = gzip.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), compresslevel=6)
+        cache.set(key, payload, TEXT_LAYER_TIMEOUT)
+    return payload, info
+
+
+# -------------------
+# Búsqueda
+# -------------------
+
+def build_match(query):
+    """
+    Convierte el texto del usuario en una expresión FTS5 segura: cada palabra
+    se busca como prefijo y todas deben aparecer en la página.
+    """
+    words = WORD_RE.findall(query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _highlight(snippet):
+    return escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def search(user_id, query, limit=50, book_id=None):
+    """
+    Busca en el índice del usuario.
+
+    Devuelve una lista de aciertos {book_id, page, snippet} ordenada por
+    relevancia (bm25); `snippet` es HTML escapado con las coincidencias en <mark>.
+    """
+    match = build_match(query)
+    if not match:
+        return []
+    connection = connect(user_id, create=False)
+    if connection is None:
+        return []
+
+    sql = (
+        "SELECT book_id, page, snippet(pages, 0, ?, ?, '…', 16) FROM pages "
+        "WHERE pages MATCH ?"
+    )
+    params = [MARK_START, MARK_END, match]
+    if book_id is not None:
+        sql += " AND book_id = ?"
+        params.append(book_id)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+
+    with closing(connection):
+        rows = connection.execute(sql, params).fetchall()
+    return [
+        {"book_id": int(row[0]), "page": int(row[1]), "snippet": _highlight(row[2])}
+        for row in rows
+    ]
@@ -0,0 +1,112 @@
+###########################################################################################
+#                                                                                        #
+#                              NORMALIZACIÓN DE IDENTIFICADORES                          #
+#                                                                                        #
+#   Funciones puras (sin modelos) que convierten los datos libres de un libro en         #
+#   claves comparables. `Book.save()` las guarda en columnas indexadas (ISBN-13 y DOI    #
+#   canónicos son únicos por usuario) y las usan la detección de duplicados (ver         #
+#   catalog/dedup.py) y la búsqueda por código de barras.                                #
+#                                                                                        #
+#   - ISBN  -> ISBN-13 solo con dígitos (los ISBN-10 se convierten a 978...), solo si    #
+#              el dígito de control es correcto.                                         #
+#   - DOI   -> en minúsculas y sin prefijos ("https://doi.org/", "doi:").                #
+#   - Título/autor -> huella: apellido del autor + palabras significativas del título    #
+#     sin acentos, en minúsculas y ordenadas.                                            #
+#                                                                                        #
+###########################################################################################
+
+import re
+import unicodedata
+
+from django.core.exceptions import ValidationError
+
+ISBN_CHARS_RE = re.compile(r"[^0-9X]")
+DOI_PREFIX_RE = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+DOI_RE = re.compile(r"^10\.\d{4,9}/\S+$")
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Palabras que no distinguen títulos ("El Quijote" == "Quijote")
+STOP_WORDS = {
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "de", "del", "y", "e", "o",
+    "a", "al", "en", "por", "para", "con", "the", "an", "of", "and", "or", "in", "on",
+}
+
+TITLE_KEY_MAX_LENGTH = 255
+
+
+def strip_accents(value):
+    """Texto en minúsculas y sin acentos ("Órbita" -> "orbita")."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def _isbn13_check_digit(first12):
+    total = sum(int(digit) * (3 if position % 2 else 1) for position, digit in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def _isbn10_is_valid(digits):
+    if not (digits[:9].isdigit() and (digits[9].isdigit() or digits[9] == "X")):
+        return False
+    check = 10 if digits[9] == "X" else int(digits[9])
+    total = sum(int(digit) * (10 - position) for position, digit in enumerate(digits[:9])) + check
+    return total % 11 == 0
+
+
+def normalize_isbn(value):
+    """
+    Devuelve el ISBN como ISBN-13 de solo dígitos, o "" si no es un ISBN válido.
+
+    Se comprueba el dígito de control; los ISBN-10 se convierten añadiendo el
+    prefijo 978 y recalculando el dígito de control.
+    """
+    digits = ISBN_CHARS_RE.sub("", (value or "").upper())
+    if len(digits) == 10 and _isbn10_is_valid(digits):
+        first12 = "978" + digits[:9]
+        return first12 + _isbn13_check_digit(first12)
+    if len(digits) == 13 and digits.isdigit() and digits[:3] in ("978", "979"):
+        if _isbn13_check_digit(digits[:12]) == digits[12]:
+            return digits
+    return ""
+
+
+def normalize_doi(value):
+    """DOI en minúsculas y sin prefijo de resolución; "" si no tiene forma de DOI."""
+    doi = DOI_PREFIX_RE.sub("", (value or "").strip()).strip().lower()
+    return doi if DOI_RE.match(doi) else ""
+
+
+def validate_isbn(value):
+    """Validador de campo: el ISBN (10 o 13) debe tener un dígito de control correcto."""
+    if value and not normalize_isbn(value):
+        raise ValidationError("ISBN no válido (revisa el dígito de control).")
+
+
+def validate_doi(value):
+    """Validador de campo: el DOI debe tener la forma 10.<registrante>/<sufijo>."""
+    if value and not normalize_doi(value):
+        raise ValidationError("DOI no válido (ej: 10.1000/xyz123).")
+
+
+def title_tokens(title):
+    """Palabras significativas de un título (sin acentos ni palabras vacías)."""
+    return [word for word in WORD_RE.findall(strip_accents(title)) if word not in STOP_WORDS]
+
+
+def author_token(last_name):
+    """Primer apellido normalizado del autor (bloque de comparación)."""
+    words = WORD_RE.findall(strip_accents(last_name))
+    return words[0] if words else ""
+
+
+def title_fingerprint(title, author_last_name=""):
+    """
+    Huella título/autor: "apellido:palabra1 palabra2 ...".
+
+    Las palabras se ordenan y deduplican, así el orden o los artículos del título
+    no producen claves distintas.
+    """
+    tokens = sorted(set(title_tokens(title)))
+    if not tokens:
+        return ""
+    return f"{author_token(author_last_name)}:{' '.join(tokens)}"[:TITLE_KEY_MAX_LENGTH]
@@ -0,0 +1,119 @@
+###########################################################################################
+#                                                                                        #
+#                                NORMALIZACIÓN DE IMÁGENES                               #
+#                                                                                        #
+#   Las portadas y fotos de autores se muestran a ~200px, pero se suben tal cual         #
+#   (PNG de varios MB, fotos de móvil giradas con EXIF). Tras cada subida se lanza en    #
+#   segundo plano `normalize_image(...)`, que:                                           #
+#                                                                                        #
+#     1. Decodifica los JPEG en modo "draft" (el decodificador ya reduce la escala).     #
+#     2. Aplica la orientación EXIF y descarta el resto de metadatos.                    #
+#     3. Reduce el lado mayor a `IMAGE_MAX_DIMENSION`.                                   #
+#     4. Recodifica a WebP (`IMAGE_QUALITY`) y sustituye el archivo original.            #
+#                                                                                        #
+###########################################################################################
+
+from io import BytesIO
+from pathlib import Path
+
+from babelius import metrics
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .conditional import touch_library
+from .models import Author, Book
+
+OUTPUT_FORMAT = "WEBP"
+OUTPUT_SUFFIX = ".webp"
+
+# Etiqueta EXIF de orientación
+ORIENTATION_TAG = 0x0112
+
+
+# -------------------
+# Archivo
+# -------------------
+
+def normalize_file(name):
+    """
+    Normaliza la imagen `name` (relativa a MEDIA_ROOT) en un archivo nuevo.
+
+    Devuelve el nombre del archivo nuevo, o None si la imagen ya estaba
+    normalizada o recodificarla no la haría más pequeña.
+    """
+    max_size = settings.IMAGE_MAX_DIMENSION
+    path = default_storage.path(name)
+    original_size = default_storage.size(name)
+
+    with Image.open(path) as image:
+        has_exif = bool(image.getexif())
+        oversized = max(image.size) > max_size
+        if image.format == OUTPUT_FORMAT and not has_exif and not oversized:
+            return None
+
+        if image.format == "JPEG":
+            # Decodifica directamente a 1/2, 1/4 u 1/8 sin bajar del tamaño pedido
+            image.draft("RGB", (max_size, max_size))
+
+        result = ImageOps.exif_transpose(image)
+        result.thumbnail((max_size, max_size), Image.LANCZOS)
+
+        has_alpha = result.mode in ("RGBA", "LA") or (result.mode == "P" and "transparency" in result.info)
+        result = result.convert("RGBA" if has_alpha else "RGB")
+
+        buffer = BytesIO()
+        result.save(buffer, OUTPUT_FORMAT, quality=settings.IMAGE_QUALITY, method=6)
+
+    if not has_exif and not oversized and buffer.tell() >= original_size:
+        return None
+
+    target = str(Path(name).with_suffix(OUTPUT_SUFFIX))
+    return default_storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def _is_referenced(name):
+    return Book.objects.filter(image=name).exists() or Author.objects.filter(image=name).exists()
+
+
+# -------------------
+# Instancias
+# -------------------
+
+def normalize_image(model, pk):
+    """
+    Normaliza la imagen de un `Book` o `Author` y actualiza la referencia.
+
+    `model` es la clase o su etiqueta ("catalog.Book", para la cola de tareas).
+    Pensado para `run_in_background`: guarda con `update()` (sin señales) y
+    solo si la imagen no cambió mientras tanto. Devuelve el nombre nuevo o None.
+    """
+    if isinstance(model, str):
+        model = apps.get_model(model)
+    instance = model.objects.filter(pk=pk).only("image", "user_id").first()
+    if instance is None or not instance.image:
+        return None
+
+    old_name = instance.image.name
+    try:
+        with metrics.PIPELINE_SECONDS.time(stage="image_normalize"):
+            new_name = normalize_file(old_name)
+    except (OSError, Image.DecompressionBombError) as e:
+        print(f"Error normalizando imagen {old_name}: {e}")
+        return None
+    if new_name is None:
+        return None
+
+    # `updated_at` cambia: las tarjetas cacheadas (fragments.card_cache_key) dependen de él
+    if not model.objects.filter(pk=pk, image=old_name).update(image=new_name, updated_at=timezone.now()):
+        default_storage.delete(new_name)
+        return None
+
+    if not _is_referenced(old_name):
+        default_storage.delete(old_name)
+    # Las páginas cacheadas (ETag) apuntan a la imagen anterior
+    touch_library(instance.user_id)
+    return new_name
@@ -0,0 +1,214 @@
+###########################################################################################
+#                                                                                        #
+#                           COLA DE TAREAS EN BASE DE DATOS                              #
+#                                                                                        #
+#   Trabajo lento (indexar PDFs, contar páginas, normalizar imágenes, limpiar archivos)  #
+#   fuera de los workers de gunicorn y sin broker externo:                               #
+#                                                                                        #
+#   - `enqueue(func, *args, **kwargs)` inserta una fila `Job` en la transacción actual:  #
+#     los workers solo la ven al confirmar y desaparece si se revierte.                  #
+#   - Solo con JOB_QUEUE=on; si no, `run_in_background` usa un hilo del proceso web.     #
+#   - `manage.py run_worker --workers N` lanza N procesos que reclaman tareas:           #
+#       · PostgreSQL: `SELECT ... FOR UPDATE SKIP LOCKED` (cada worker salta las filas   #
+#         que otro ya bloqueó).                                                          #
+#       · SQLite: UPDATE condicional `status=pending -> running` (gana un solo worker).  #
+#   - Si la tarea falla se reintenta con espera exponencial (con jitter) hasta           #
+#     `max_attempts`. Las tareas de un worker caído vuelven a la cola cuando caduca      #
+#     su bloqueo (`JOB_LOCK_TIMEOUT`); mientras la tarea corre un latido lo renueva.     #
+#                                                                                        #
+###########################################################################################
+
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from babelius import metrics
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+# Candidatas que se intentan reclamar por vuelta en SQLite
+CLAIM_CANDIDATES = 10
+
+# Espera máxima entre reintentos
+MAX_BACKOFF_SECONDS = 60 * 60
+
+
+def task_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, *args, run_at=None, max_attempts=None, **kwargs):
+    """
+    Encola `func(*args, **kwargs)`; los argumentos deben ser serializables en JSON.
+
+    Devuelve el `Job` creado.
+    """
+    return Job.objects.create(
+        task=task_name(func),
+        args=list(args),
+        kwargs=kwargs,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def backoff(attempts):
+    """Segundos hasta el siguiente intento: base * 2^(intentos-1), ±20 % de jitter."""
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+# -------------------
+# Reclamar
+# -------------------
+
+def _pending(now):
+    return Job.objects.filter(status=Job.PENDING, run_at__lte=now).order_by("run_at", "id")
+
+
+def claim(worker_id):
+    """Reclama la siguiente tarea pendiente para `worker_id` (o None si no hay)."""
+    now = timezone.now()
+    claimed = {"status": Job.RUNNING, "locked_by": worker_id, "locked_at": now, "attempts": F("attempts") + 1}
+
+    if connections[Job.objects.db].features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job_id = _pending(now).select_for_update(skip_locked=True).values_list("id", flat=True).first()
+            if job_id is None:
+                return None
+            Job.objects.filter(pk=job_id).update(**claimed)
+        return Job.objects.get(pk=job_id)
+
+    # Sin bloqueo por fila: la primera actualización condicional que acierta gana
+    for job_id in _pending(now).values_list("id", flat=True)[:CLAIM_CANDIDATES]:
+        if Job.objects.filter(pk=job_id, status=Job.PENDING).update(**claimed):
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def recover_stale():
+    """Devuelve a pendientes las tareas de workers que murieron a mitad (bloqueo caducado)."""
+    expired = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=expired).update(
+        status=Job.PENDING, locked_by="", locked_at=None
+    )
+
+
+# -------------------
+# Ejecutar
+# -------------------
+
+def _owned(job):
+    """La fila de la tarea mientras siga siendo de este worker (no recuperada por otro)."""
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by)
+
+
+class Heartbeat(threading.Thread):
+    """
+    Renueva `locked_at` cada tercio de `JOB_LOCK_TIMEOUT` mientras la tarea corre,
+    así `recover_stale()` solo devuelve a la cola tareas de workers muertos.
+    """
+
+    def __init__(self, job):
+        super().__init__(name=f"heartbeat-{job.pk}", daemon=True)
+        self.job = job
+        self.finished = threading.Event()
+
+    def run(self):
+        try:
+            while not self.finished.wait(settings.JOB_LOCK_TIMEOUT / 3):
+                try:
+                    if not _owned(self.job).update(locked_at=timezone.now()):
+                        print(f"Tarea {self.job.task} ({self.job.pk}) ya no es de este worker")
+                        return
+                except Exception as e:
+                    print(f"Error renovando el bloqueo de la tarea {self.job.pk}: {e}")
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.finished.set()
+        self.join()
+
+
+def run(job):
+    """Ejecuta una tarea reclamada; la elimina si termina o programa el reintento."""
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        with metrics.PIPELINE_SECONDS.time(stage=job.task):
+            import_string(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        heartbeat.stop()
+        metrics.JOBS.inc(task=job.task, result="error")
+        error = traceback.format_exc()
+        print(f"Error en tarea {job.task} (intento {job.attempts}/{job.max_attempts}):\n{error}")
+        if job.attempts >= job.max_attempts:
+            _owned(job).update(status=Job.FAILED, locked_by="", locked_at=None, last_error=error)
+        else:
+            _owned(job).update(
+                status=Job.PENDING, locked_by="", locked_at=None, last_error=error,
+                run_at=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+            )
+        return False
+    heartbeat.stop()
+    metrics.JOBS.inc(task=job.task, result="ok")
+    # Si otro worker la recuperó entretanto, la fila es suya y no se toca
+    _owned(job).delete()
+    return True
+
+
+class Worker:
+    """
+    Bucle de un proceso worker.
+
+    SIGTERM/SIGINT piden parar: la tarea en curso termina antes de salir.
+    Con `burst=True` sale en cuanto no quedan tareas pendientes.
+    """
+
+    def __init__(self, name=None, burst=False):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.burst = burst
+        self.stopping = False
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def run(self):
+        """Atiende tareas hasta que se pida parar; devuelve (completadas, fallidas)."""
+        done = failed = 0
+        last_recovery = 0.0
+        while not self.stopping:
+            close_old_connections()
+            if time.monotonic() - last_recovery > settings.JOB_LOCK_TIMEOUT / 2:
+                recover_stale()
+                last_recovery = time.monotonic()
+
+            job = claim(self.name)
+            if job is None:
+                if self.burst:
+                    break
+                time.sleep(settings.JOB_POLL_INTERVAL)
+                continue
+
+            if run(job):
+                done += 1
+            else:
+                failed += 1
+            metrics.REGISTRY.maybe_flush()
+        close_old_connections()
+        return done, failed
@@ -0,0 +1,53 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from catalog import counters, taxonomy
+from catalog.models import Book
+
+
+class Command(BaseCommand):
+    help = "Recalcula por lotes el estante y la clasificación efectivos de los libros."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a convertir (se puede repetir). Por defecto, todos.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Libros por lote (por defecto 1000).",
+        )
+
+    def handle(self, *args, **options):
+        books = Book.objects.all()
+        if options["usernames"]:
+            books = books.filter(user__in=User.objects.filter(username__in=options["usernames"]))
+
+        started = time.perf_counter()
+        last_pk = updated = 0
+
+        # Paginación por clave: cada lote es un único UPDATE con subconsultas
+        while True:
+            pks = list(books.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:options["batch_size"]])
+            if not pks:
+                break
+            updated += taxonomy.refresh_books(Book.objects.filter(pk__in=pks))
+            last_pk = pks[-1]
+            self.stdout.write(f"{updated} libros actualizados...")
+
+        # Los contadores por estante y clasificación se basan en las columnas efectivas
+        user_ids = books.values_list("user_id", flat=True).distinct()
+        for user_id in user_ids.iterator():
+            if user_id:
+                counters.recompute_user_counters(user_id)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated} libro(s) actualizados en {elapsed:.1f}s."
+        ))
@@ -0,0 +1,103 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+
+from catalog.models import Book
+
+KEY_FIELDS = ["isbn_key", "doi_key", "title_key"]
+
+
+class Command(BaseCommand):
+    help = "Recalcula por lotes el ISBN-13, el DOI canónico y la huella título/autor de los libros."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a convertir (se puede repetir). Por defecto, todos.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Libros por lote (por defecto 500).",
+        )
+
+    def handle(self, *args, **options):
+        books = Book.objects.select_related("author").only(
+            "id", "user_id", "title", "isbn", "doi", "author", "author__last_name", *KEY_FIELDS
+        )
+        if options["usernames"]:
+            users = User.objects.filter(username__in=options["usernames"])
+            books = books.filter(user__in=users)
+
+        started = time.perf_counter()
+        last_pk = scanned = updated = 0
+        conflicts = []
+        invalid = []
+
+        # Paginación por clave (pk > último) para no usar OFFSET en tablas grandes
+        while True:
+            batch = list(books.filter(pk__gt=last_pk).order_by("pk")[:options["batch_size"]])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+
+            changed = []
+            for book in batch:
+                before = [getattr(book, field) for field in KEY_FIELDS]
+                book.refresh_identifier_keys()
+                for label, value, key in (("ISBN", book.isbn, book.isbn_key), ("DOI", book.doi, book.doi_key)):
+                    if value and not key:
+                        invalid.append((book, label))
+                if [getattr(book, field) for field in KEY_FIELDS] != before:
+                    changed.append(book)
+            if not changed:
+                continue
+
+            try:
+                with transaction.atomic():
+                    Book.objects.bulk_update(changed, KEY_FIELDS)
+                updated += len(changed)
+            except IntegrityError:
+                # Algún ISBN/DOI ya pertenece a otro libro del usuario: libro a libro
+                for book in changed:
+                    updated += self.save_keys(book, conflicts)
+
+            self.stdout.write(f"{scanned} libros revisados...")
+
+        for book, field in conflicts:
+            self.stderr.write(
+                f"Libro {book.pk} ({book.title}): {field} repetido en otro libro del usuario; "
+                "revisa `manage.py dedup_report`."
+            )
+
+        for book, label in invalid:
+            self.stderr.write(f"Libro {book.pk} ({book.title}): {label} no válido, no se usa para duplicados.")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated} de {scanned} libro(s) actualizados, {len(conflicts)} conflicto(s), "
+            f"{len(invalid)} identificador(es) no válidos en {elapsed:.1f}s."
+        ))
+
+    def save_keys(self, book, conflicts):
+        """Guarda las claves de un libro; si chocan, deja vacía la clave repetida."""
+        try:
+            with transaction.atomic():
+                Book.objects.filter(pk=book.pk).update(**{field: getattr(book, field) for field in KEY_FIELDS})
+            return 1
+        except IntegrityError:
+            pass
+
+        for field in ("isbn_key", "doi_key"):
+            value = getattr(book, field)
+            if value and Book.objects.filter(user_id=book.user_id, **{field: value}).exclude(pk=book.pk).exists():
+                setattr(book, field, "")
+                conflicts.append((book, field))
+        Book.objects.filter(pk=book.pk).update(**{field: getattr(book, field) for field in KEY_FIELDS})
+        return 1
@@ -0,0 +1,47 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from catalog import recommendations
+
+
+class Command(BaseCommand):
+    help = "Calcula los libros similares (TF-IDF) de cada libro; por defecto solo lo que cambió."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a procesar (se puede repetir). Por defecto, todos.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recalcular todos los libros, no solo los modificados.",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+
+        started = time.perf_counter()
+        tokenized = updated = 0
+
+        for user_id, username in users.values_list("id", "username").iterator():
+            user_started = time.perf_counter()
+            changed, recomputed = recommendations.update_user(user_id, full=options["full"])
+            tokenized += changed
+            updated += recomputed
+            if changed or recomputed:
+                self.stdout.write(
+                    f"{username}: {changed} libro(s) modificados, {recomputed} con vecinos recalculados "
+                    f"({time.perf_counter() - user_started:.1f}s)"
+                )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{tokenized} libro(s) retokenizados y {updated} con vecinos recalculados en {elapsed:.1f}s."
+        ))
@@ -0,0 +1,57 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from catalog import dedup
+from catalog.models import Book
+
+
+class Command(BaseCommand):
+    help = "Informa de libros posiblemente duplicados (y opcionalmente los fusiona)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a revisar (se puede repetir). Por defecto, todos.",
+        )
+        parser.add_argument(
+            "--merge",
+            action="store_true",
+            help="Fusionar cada grupo en su libro más antiguo.",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+
+        started = time.perf_counter()
+        total_groups = merged = 0
+
+        for user_id, username in users.values_list("id", "username").iterator():
+            groups = dedup.duplicate_groups(user_id)
+            if not groups:
+                continue
+            total_groups += len(groups)
+
+            books = Book.objects.in_bulk([book_id for group in groups for book_id in group])
+            self.stdout.write(f"== {username}: {len(groups)} grupo(s)")
+            for group in groups:
+                self.stdout.write("  - " + " | ".join(f"#{pk} {books[pk].title}" for pk in group))
+                if not options["merge"]:
+                    continue
+                keep = books[group[0]]
+                for duplicate_pk in group[1:]:
+                    try:
+                        dedup.merge_books(keep, books[duplicate_pk])
+                        merged += 1
+                    except Exception as e:
+                        self.stderr.write(f"Error fusionando libro {duplicate_pk} en {keep.pk}: {e}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_groups} grupo(s) de duplicados, {merged} libro(s) fusionados en {elapsed:.1f}s."
+        ))
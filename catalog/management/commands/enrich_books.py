@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from catalog import metadata
+from catalog.models import Book
+
+
+class Command(BaseCommand):
+    help = "Completa los campos vacíos de los libros con ISBN usando el volcado bibliográfico local."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a completar (se puede repetir). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        books = Book.objects.exclude(isbn_key="").select_related("author")
+        if options["usernames"]:
+            books = books.filter(user__in=User.objects.filter(username__in=options["usernames"]))
+
+        scanned = enriched = 0
+        for book in books.iterator(chunk_size=500):
+            scanned += 1
+            filled = metadata.enrich_book(book)
+            if not filled:
+                continue
+            try:
+                book.save()
+                enriched += 1
+                self.stdout.write(f"Libro {book.pk} ({book.title}): {', '.join(filled)}")
+            except Exception as e:
+                self.stderr.write(f"Error guardando libro {book.pk}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"{enriched} de {scanned} libro(s) con ISBN completados."))
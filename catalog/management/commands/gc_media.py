@@ -0,0 +1,51 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from catalog import orphans
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina de MEDIA_ROOT los PDFs e imágenes que ya no referencia ningún libro, "
+        "autor ni subida en curso (marcar y barrer)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo informar de los archivos huérfanos, sin borrarlos.",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Solo se tocan archivos (y subidas abandonadas) más antiguos que esto (por defecto 24 h).",
+        )
+
+    def handle(self, *args, **options):
+        if options["grace_hours"] < 0:
+            raise CommandError("--grace-hours no puede ser negativo.")
+        verbose = options["verbosity"] > 1 or options["dry_run"]
+
+        def report(name, size):
+            if verbose:
+                self.stdout.write(f"  {name} ({filesizeformat(size)})")
+
+        started = time.perf_counter()
+        summary = orphans.collect(
+            grace=timedelta(hours=options["grace_hours"]),
+            dry_run=options["dry_run"],
+            on_orphan=report,
+        )
+
+        elapsed = time.perf_counter() - started
+        verb = "se borrarían" if options["dry_run"] else "borrados"
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['scanned']} archivo(s) revisados, {summary['referenced']} referenciados; "
+            f"{summary['orphans']} huérfano(s) {verb} ({filesizeformat(summary['reclaimed'])}), "
+            f"{summary['expired_uploads']} subida(s) abandonada(s) en {elapsed:.1f}s."
+        ))
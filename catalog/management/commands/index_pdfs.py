@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from catalog import fulltext
+from catalog.models import Book
+
+
+class Command(BaseCommand):
+    help = "Extrae el texto de los PDFs y actualiza los índices de búsqueda de texto completo."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a indexar (se puede repetir). Por defecto, todos.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Reindexar aunque el PDF no haya cambiado.",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+
+        started = time.perf_counter()
+        indexed = pages = removed = 0
+
+        for user_id in users.values_list("id", flat=True).iterator():
+            already = fulltext.indexed_books(user_id)
+            books = (
+                Book.objects.filter(user_id=user_id)
+                .exclude(pdf_file="").exclude(pdf_file__isnull=True)
+                .values_list("id", "pdf_file")
+            )
+            current = {}
+            for book_id, pdf_name in books.iterator():
+                current[book_id] = pdf_name
+                if already.get(book_id) == pdf_name and not options["force"]:
+                    continue
+                try:
+                    count = fulltext.index_book(book_id, force=options["force"])
+                except Exception as e:
+                    self.stderr.write(f"Error indexando libro {book_id}: {e}")
+                    continue
+                if count is not None:
+                    indexed += 1
+                    pages += count
+                    self.stdout.write(f"Libro {book_id}: {count} páginas")
+
+            # Libros que ya no existen o ya no tienen PDF
+            for book_id in set(already) - set(current):
+                fulltext.remove_book(user_id, book_id)
+                removed += 1
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{indexed} libro(s) indexados ({pages} páginas), {removed} eliminados del índice en {elapsed:.1f}s."
+        ))
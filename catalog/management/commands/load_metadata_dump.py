@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import metadata
+
+
+class Command(BaseCommand):
+    help = "Carga un volcado bibliográfico local (Open Library JSONL o MARC21) indexado por ISBN."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archivo del volcado (.jsonl/.txt de Open Library o .mrc).")
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "marc"],
+            dest="dump_format",
+            help="Formato del volcado. Por defecto se deduce de la extensión.",
+        )
+        parser.add_argument(
+            "--append",
+            action="store_true",
+            help="Añadir al archivo de metadatos existente en lugar de reemplazarlo.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            total = metadata.load_dump(options["path"], options["dump_format"], replace=not options["append"])
+        except OSError as e:
+            raise CommandError(f"No se pudo leer el volcado: {e}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} ISBN cargados en {metadata.dump_path()} en {elapsed:.1f}s."
+        ))
@@ -0,0 +1,40 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from catalog import images
+from catalog.models import Author, Book
+
+
+class Command(BaseCommand):
+    help = "Normaliza las portadas y fotos de autores ya subidas (EXIF, tamaño máximo y WebP)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a procesar (se puede repetir). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        scanned = normalized = 0
+
+        for model in (Book, Author):
+            objects = model.objects.exclude(image="").exclude(image__isnull=True)
+            if options["usernames"]:
+                objects = objects.filter(user__in=User.objects.filter(username__in=options["usernames"]))
+
+            for pk, name in objects.values_list("pk", "image").iterator():
+                scanned += 1
+                new_name = images.normalize_image(model, pk)
+                if new_name:
+                    normalized += 1
+                    self.stdout.write(f"{name} -> {new_name}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{normalized} de {scanned} imagen(es) normalizadas en {elapsed:.1f}s."
+        ))
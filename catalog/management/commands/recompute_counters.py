@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from catalog.counters import recompute_user_counters
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los contadores desnormalizados de la biblioteca (LibraryCounter)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a reparar (se puede repetir). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+
+        total = 0
+        for user_id in users.values_list("id", flat=True).iterator():
+            recompute_user_counters(user_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Contadores reconstruidos para {total} usuario(s)."))
@@ -0,0 +1,156 @@
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from catalog import covers
+from catalog.models import Book
+
+CHECKPOINT_NAME = ".regenerate_covers.json"
+
+
+def _ignore_interrupt():
+    # Ctrl+C solo lo atiende el proceso principal, que cancela el trabajo pendiente
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class Command(BaseCommand):
+    help = (
+        "Vuelve a dibujar en paralelo las portadas por defecto de los libros sin imagen "
+        "(p. ej. tras cambiar un tema, la fuente o COVER_VERSION)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Nombre de usuario a procesar (se puede repetir). Por defecto, todos.",
+        )
+        parser.add_argument(
+            "--theme",
+            action="append",
+            dest="themes",
+            choices=sorted(covers.THEMES),
+            help=f"Tema a dibujar (se puede repetir). Por defecto, {covers.DEFAULT_THEME}.",
+        )
+        parser.add_argument(
+            "--size",
+            action="append",
+            dest="sizes",
+            help="Tamaño ANCHOxALTO (se puede repetir). Por defecto, %dx%d." % covers.DEFAULT_SIZE,
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Procesos del pool (por defecto, uno por CPU).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Libros por lote entre puntos de control (por defecto 500).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Dibujar también las portadas que ya están en la caché.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignorar el punto de control de una ejecución interrumpida.",
+        )
+
+    def handle(self, *args, **options):
+        themes = options["themes"] or [covers.DEFAULT_THEME]
+        sizes = [self.parse_size(size) for size in options["sizes"] or []] or [covers.DEFAULT_SIZE]
+
+        books = Book.objects.filter(Q(image="") | Q(image__isnull=True))
+        if options["usernames"]:
+            books = books.filter(user__in=User.objects.filter(username__in=options["usernames"]))
+
+        # Punto de control: último pk procesado por una ejecución con los mismos parámetros
+        checkpoint_path = covers._cache_dir() / CHECKPOINT_NAME
+        signature = [covers.COVER_VERSION, themes, [list(size) for size in sizes], options["usernames"], options["force"]]
+        last_pk = 0
+        if not options["restart"] and checkpoint_path.exists():
+            checkpoint = json.loads(checkpoint_path.read_text())
+            if checkpoint.get("signature") == signature:
+                last_pk = checkpoint["last_pk"]
+                self.stdout.write(f"Reanudando después del libro {last_pk}.")
+
+        started = time.perf_counter()
+        scanned = rendered = written = 0
+
+        executor = ProcessPoolExecutor(max_workers=options["workers"], initializer=_ignore_interrupt)
+        try:
+            while True:
+                batch = list(
+                    books.filter(pk__gt=last_pk).order_by("pk").values_list("pk", "title")[:options["batch_size"]]
+                )
+                if not batch:
+                    break
+
+                jobs = [
+                    (title, width, height, theme)
+                    for _, title in batch
+                    for width, height in sizes
+                    for theme in themes
+                ]
+                results = executor.map(
+                    covers.render_to_cache,
+                    *zip(*jobs),
+                    [options["force"]] * len(jobs),
+                    chunksize=max(1, len(jobs) // (4 * options["workers"])),
+                )
+                for size in results:
+                    if size:
+                        rendered += 1
+                        written += size
+
+                scanned += len(batch)
+                last_pk = batch[-1][0]
+                self.save_checkpoint(checkpoint_path, signature, last_pk)
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{scanned} libros revisados, {rendered} portadas dibujadas "
+                    f"({rendered / elapsed:.0f} portadas/s)..."
+                )
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise CommandError(f"Interrumpido: se reanudará después del libro {last_pk}.")
+        executor.shutdown()
+
+        checkpoint_path.unlink(missing_ok=True)
+        pruned = covers.prune_cache()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{rendered} portada(s) dibujadas para {scanned} libro(s) ({written / 1024 / 1024:.1f} MB) "
+            f"en {elapsed:.1f}s ({rendered / elapsed if elapsed else 0:.0f} portadas/s); "
+            f"{pruned} eliminadas de la caché por tamaño."
+        ))
+
+    def parse_size(self, value):
+        try:
+            width, height = (int(part) for part in value.lower().split("x"))
+        except ValueError:
+            raise CommandError(f"Tamaño no válido: {value}")
+        if (width, height) not in covers.SIZES:
+            allowed = ", ".join(f"{w}x{h}" for w, h in sorted(covers.SIZES))
+            raise CommandError(f"Tamaño no permitido: {value} (permitidos: {allowed})")
+        return width, height
+
+    def save_checkpoint(self, path, signature, last_pk):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps({"signature": signature, "last_pk": last_pk}))
+        os.replace(temporary, path)
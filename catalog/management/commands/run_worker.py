@@ -0,0 +1,77 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from catalog import jobs
+
+
+def _worker_process(index, burst):
+    # Proceso hijo: conexiones propias y parada limpia con SIGTERM/SIGINT
+    connections.close_all()
+    worker = jobs.Worker(burst=burst)
+    worker.name = f"{worker.name}#{index}"
+    worker.install_signal_handlers()
+    worker.run()
+
+
+class Command(BaseCommand):
+    help = (
+        "Atiende la cola de tareas en segundo plano (indexado de PDFs, imágenes, limpieza...) "
+        "con uno o varios procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Procesos worker (por defecto 1).",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Salir cuando la cola quede vacía (p. ej. desde cron).",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers debe ser al menos 1.")
+
+        started = time.perf_counter()
+        if options["workers"] == 1:
+            worker = jobs.Worker(burst=options["burst"])
+            worker.install_signal_handlers()
+            self.stdout.write(f"Worker {worker.name} atendiendo la cola...")
+            done, failed = worker.run()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"{done} tarea(s) completadas, {failed} con error en {elapsed:.1f}s."
+            ))
+            return
+
+        # Las conexiones abiertas no deben heredarse entre procesos
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_worker_process, args=(index, options["burst"]))
+            for index in range(options["workers"])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"{len(processes)} worker(s) atendiendo la cola...")
+
+        def forward(signum, frame):
+            # Cada hijo termina su tarea en curso antes de salir
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for process in processes:
+            process.join()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{len(processes)} worker(s) detenidos en {elapsed:.1f}s."))
@@ -0,0 +1,345 @@
+###########################################################################################
+#                                                                                        #
+#                           METADATOS BIBLIOGRÁFICOS SIN CONEXIÓN                        #
+#                                                                                        #
+#   Un volcado bibliográfico local (Open Library JSONL o MARC21) se carga en un archivo  #
+#   SQLite de solo lectura (`METADATA_DUMP_PATH`) con una fila por ISBN-13 como clave    #
+#   primaria (tabla WITHOUT ROWID). Al capturar un libro se consultan ahí editorial,     #
+#   año, lugar, páginas, idioma y serie sin ninguna llamada de red.                      #
+#                                                                                        #
+#   - `load_dump(path)`  -> construye el archivo (`manage.py load_metadata_dump`).       #
+#   - `lookup(isbn)`     -> registro normalizado o None (conexión por hilo + LRU).       #
+#   - `enrich_book(book)`-> completa los campos vacíos de un `Book`.                     #
+#                                                                                        #
+###########################################################################################
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+from .identifiers import normalize_isbn
+from .utils import LANGUAGES_ES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    isbn TEXT PRIMARY KEY,
+    title TEXT,
+    subtitle TEXT,
+    author TEXT,
+    editorial TEXT,
+    year INTEGER,
+    place TEXT,
+    pages INTEGER,
+    language TEXT,
+    series TEXT
+) WITHOUT ROWID;
+"""
+
+FIELDS = ("title", "subtitle", "author", "editorial", "year", "place", "pages", "language", "series")
+
+YEAR_RE = re.compile(r"\b(1[5-9]\d\d|20\d\d)\b")
+PAGES_RE = re.compile(r"(\d+)\s*(?:p\b|pp\b|pages|páginas|pág)", re.IGNORECASE)
+
+# Códigos ISO 639-2 (volcados) -> códigos de LANGUAGES_ES
+LANGUAGE_CODES = {
+    "spa": "es", "eng": "en", "fre": "fr", "fra": "fr", "ger": "de", "deu": "de",
+    "ita": "it", "por": "pt", "lat": "la", "cat": "ca", "glg": "gl", "baq": "eu",
+    "eus": "eu", "rus": "ru", "chi": "zh-hans", "zho": "zh-hans", "jpn": "ja",
+    "ara": "ar", "heb": "he", "dut": "nl", "nld": "nl", "gre": "el", "ell": "el",
+    "pol": "pl", "swe": "sv", "dan": "da", "nor": "no", "fin": "fi", "cze": "cs",
+    "ces": "cs", "hun": "hu", "rum": "ro", "ron": "ro", "tur": "tr", "ukr": "uk",
+    "kor": "ko", "hin": "hi", "per": "fa", "fas": "fa", "epo": "eo",
+}
+VALID_LANGUAGES = {code for code, _ in LANGUAGES_ES}
+
+BATCH_SIZE = 10000
+
+# Cada cuánto (segundos) se comprueba si el archivo de metadatos se reemplazó
+RELOAD_CHECK_INTERVAL = 1.0
+
+
+# -------------------
+# Lectura de volcados
+# -------------------
+
+def _first(value):
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _year(text):
+    match = YEAR_RE.search(text or "")
+    return int(match.group(1)) if match else None
+
+
+def _language(code):
+    code = (code or "").rsplit("/", 1)[-1].strip().lower()
+    language = LANGUAGE_CODES.get(code, code)
+    return language if language in VALID_LANGUAGES else None
+
+
+def parse_openlibrary_line(line):
+    """
+    Convierte una edición de Open Library en (isbns, registro).
+
+    Acepta tanto JSON por línea como el volcado oficial separado por
+    tabuladores (el JSON es la última columna).
+    """
+    if "\t" in line:
+        line = line.rsplit("\t", 1)[-1]
+    data = json.loads(line)
+
+    isbns = [*data.get("isbn_13", []), *data.get("isbn_10", [])]
+    record = {
+        "title": data.get("title"),
+        "subtitle": data.get("subtitle"),
+        "author": data.get("by_statement"),
+        "editorial": _first(data.get("publishers")),
+        "year": _year(data.get("publish_date")),
+        "place": _first(data.get("publish_places")),
+        "pages": data.get("number_of_pages"),
+        "language": _language((_first(data.get("languages")) or {}).get("key")),
+        "series": _first(data.get("series")),
+    }
+    return isbns, record
+
+
+def iter_marc_records(handle):
+    """
+    Lee registros MARC21 binarios (ISO 2709) y devuelve {etiqueta: [campos]}.
+
+    Cada campo de datos es una lista de (subcampo, valor); los de control
+    (001-009) son texto.
+    """
+    buffer = b""
+    while True:
+        chunk = handle.read(1 << 20)
+        if not chunk and not buffer:
+            return
+        buffer += chunk
+        while b"\x1d" in buffer:
+            raw, buffer = buffer.split(b"\x1d", 1)
+            if len(raw) >= 24:
+                yield _parse_marc(raw)
+        if not chunk:
+            return
+
+
+def _parse_marc(raw):
+    base = int(raw[12:17])
+    directory = raw[24:raw.index(b"\x1e")]
+    fields = {}
+    for position in range(0, len(directory) - 11, 12):
+        entry = directory[position:position + 12]
+        tag = entry[:3].decode("ascii", "replace")
+        length, start = int(entry[3:7]), int(entry[7:12])
+        data = raw[base + start:base + start + length].rstrip(b"\x1e").decode("utf-8", "replace")
+        if tag < "010":
+            fields.setdefault(tag, []).append(data)
+            continue
+        subfields = [(part[0], part[1:].strip(" /:;,.")) for part in data.split("\x1f")[1:] if part]
+        fields.setdefault(tag, []).append(subfields)
+    return fields
+
+
+def _subfield(fields, tag, code):
+    for field in fields.get(tag, []):
+        for subfield_code, value in field:
+            if subfield_code == code and value:
+                return value
+    return None
+
+
+def parse_marc_record(fields):
+    """Convierte un registro MARC21 (ver `iter_marc_records`) en (isbns, registro)."""
+    isbns = [
+        value.split()[0]
+        for field in fields.get("020", [])
+        for code, value in field
+        if code == "a" and value
+    ]
+    control = (fields.get("008") or [""])[0]
+    publication = "264" if fields.get("264") else "260"
+    extent = _subfield(fields, "300", "a") or ""
+    pages = PAGES_RE.search(extent)
+
+    record = {
+        "title": _subfield(fields, "245", "a"),
+        "subtitle": _subfield(fields, "245", "b"),
+        "author": _subfield(fields, "100", "a"),
+        "editorial": _subfield(fields, publication, "b"),
+        "year": _year(_subfield(fields, publication, "c")) or _year(control[7:11]),
+        "place": _subfield(fields, publication, "a"),
+        "pages": int(pages.group(1)) if pages else None,
+        "language": _language(_subfield(fields, "041", "a") or control[35:38]),
+        "series": _subfield(fields, "490", "a"),
+    }
+    return isbns, record
+
+
+def iter_dump(path, dump_format=None):
+    """Itera (isbns, registro) de un volcado; el formato se deduce de la extensión."""
+    path = Path(path)
+    dump_format = dump_format or ("marc" if path.suffix.lower() in (".mrc", ".marc") else "jsonl")
+
+    if dump_format == "marc":
+        with open(path, "rb") as handle:
+            for fields in iter_marc_records(handle):
+                yield parse_marc_record(fields)
+        return
+
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield parse_openlibrary_line(line)
+            except (ValueError, AttributeError):
+                continue  # línea corrupta del volcado
+
+
+# -------------------
+# Construcción del archivo
+# -------------------
+
+def dump_path():
+    return Path(settings.METADATA_DUMP_PATH)
+
+
+def load_dump(source, dump_format=None, replace=True):
+    """
+    Carga un volcado en el archivo de metadatos.
+
+    Se escribe en un archivo temporal y se sustituye al final de forma atómica,
+    así los procesos web siguen leyendo el archivo anterior mientras tanto.
+    Con `replace=False` se añade sobre el archivo existente.
+    Devuelve el número de ISBN cargados.
+    """
+    target = dump_path()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    building = target.with_suffix(".building")
+    if building.exists():
+        building.unlink()
+    if not replace and target.exists():
+        building.write_bytes(target.read_bytes())
+
+    connection = sqlite3.connect(building)
+    connection.execute("PRAGMA journal_mode=OFF")
+    connection.execute("PRAGMA synchronous=OFF")
+    connection.executescript(SCHEMA)
+
+    sql = f"INSERT OR REPLACE INTO records (isbn, {', '.join(FIELDS)}) VALUES (?{', ?' * len(FIELDS)})"
+    total = 0
+    rows = []
+    for isbns, record in iter_dump(source, dump_format):
+        values = tuple(record[field] or None for field in FIELDS)
+        for isbn in {normalize_isbn(isbn) for isbn in isbns} - {""}:
+            rows.append((isbn,) + values)
+        if len(rows) >= BATCH_SIZE:
+            with connection:
+                connection.executemany(sql, rows)
+            total += len(rows)
+            rows = []
+    if rows:
+        with connection:
+            connection.executemany(sql, rows)
+        total += len(rows)
+    connection.close()
+
+    os.replace(building, target)
+    _dump_state["checked"] = 0.0  # este proceso ve el archivo nuevo de inmediato
+    return total
+
+
+# -------------------
+# Consultas
+# -------------------
+
+_local = threading.local()
+_dump_state = {"checked": 0.0, "mtime": None}
+
+
+def _dump_mtime():
+    """Fecha del archivo de metadatos (None si no existe), revisada como mucho una vez por segundo."""
+    now = time.monotonic()
+    if now - _dump_state["checked"] > RELOAD_CHECK_INTERVAL:
+        try:
+            mtime = os.stat(dump_path()).st_mtime
+        except OSError:
+            mtime = None
+        _dump_state.update(checked=now, mtime=mtime)
+    return _dump_state["mtime"]
+
+
+def _connection(mtime):
+    """Conexión de solo lectura por hilo; se reabre si el archivo se reemplazó."""
+    if getattr(_local, "mtime", None) != mtime:
+        if getattr(_local, "connection", None) is not None:
+            _local.connection.close()
+        _local.connection = sqlite3.connect(f"file:{dump_path()}?mode=ro", uri=True)
+        _local.mtime = mtime
+    return _local.connection
+
+
+@lru_cache(maxsize=4096)
+def _lookup(isbn, mtime):
+    row = _connection(mtime).execute(
+        f"SELECT {', '.join(FIELDS)} FROM records WHERE isbn = ?", (isbn,)
+    ).fetchone()
+    return dict(zip(FIELDS, row)) if row else None
+
+
+def lookup(isbn):
+    """
+    Registro bibliográfico de un ISBN (10 o 13, con o sin guiones) o None.
+
+    Es una búsqueda por clave primaria en un archivo local; los aciertos
+    recientes se sirven desde memoria.
+    """
+    isbn = normalize_isbn(isbn)
+    if not isbn:
+        return None
+    mtime = _dump_mtime()
+    if mtime is None:
+        return None  # no hay volcado cargado
+    record = _lookup(isbn, mtime)
+    return dict(record) if record else None
+
+
+def enrich_book(book, record=None):
+    """
+    Completa los campos vacíos de un `Book` (sin guardarlo) con el registro de su ISBN.
+
+    Devuelve la lista de campos completados.
+    """
+    record = record or lookup(book.isbn)
+    if not record:
+        return []
+
+    values = {
+        "title": record["title"],
+        "subtitle": record["subtitle"],
+        "editorial": record["editorial"],
+        "place_of_publication": record["place"],
+        "page_count": record["pages"],
+        "language": record["language"],
+        "series": record["series"],
+        "publication_date": date(record["year"], 1, 1) if record["year"] else None,
+    }
+    filled = []
+    for field, value in values.items():
+        if value and not getattr(book, field):
+            max_length = book._meta.get_field(field).max_length
+            setattr(book, field, value[:max_length] if max_length else value)
+            filled.append(field)
+    return filled
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0018_alter_book_page_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibraryCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('library', 'Biblioteca'), ('shelf', 'Estante'), ('drawer', 'Cajón'), ('genre', 'Género'), ('classification', 'Clasificación'), ('author', 'Autor'), ('babel', 'Babel')], max_length=20)),
+                ('entity_id', models.BigIntegerField(default=0)),
+                ('book_count', models.IntegerField(default=0, verbose_name='Libros')),
+                ('pages_read', models.BigIntegerField(default=0, verbose_name='Páginas leídas')),
+                ('finished_count', models.IntegerField(default=0, verbose_name='Libros terminados')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'entity_type', 'entity_id'), name='unique_library_counter')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0020_namesequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Última modificación'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_library_versions(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    LibraryVersion = apps.get_model('catalog', 'LibraryVersion')
+    now = timezone.now()
+    LibraryVersion.objects.bulk_create(
+        [LibraryVersion(user_id=user_id, last_modified=now) for user_id in User.objects.values_list('id', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0021_book_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='babel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='classification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='drawer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='gender',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='readingprogress',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='shelf',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.CreateModel(
+            name='LibraryVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_modified', models.DateTimeField(verbose_name='Última modificación')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='library_version', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(create_library_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+from catalog.identifiers import normalize_doi, normalize_isbn, title_fingerprint
+
+
+def fill_identifier_keys(apps, schema_editor):
+    Book = apps.get_model('catalog', 'Book')
+    batch = []
+    for book in Book.objects.select_related('author').only(
+        'id', 'isbn', 'doi', 'title', 'author__last_name'
+    ).iterator(chunk_size=1000):
+        book.isbn_key = normalize_isbn(book.isbn)
+        book.doi_key = normalize_doi(book.doi)
+        book.title_key = title_fingerprint(book.title, book.author.last_name if book.author_id else '')
+        batch.append(book)
+        if len(batch) >= 1000:
+            Book.objects.bulk_update(batch, ['isbn_key', 'doi_key', 'title_key'])
+            batch = []
+    if batch:
+        Book.objects.bulk_update(batch, ['isbn_key', 'doi_key', 'title_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0022_updated_at_libraryversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='doi_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='isbn_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=13),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['user', 'isbn_key'], name='book_user_isbn_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['user', 'doi_key'], name='book_user_doi_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['user', 'title_key'], name='book_user_title_key_idx'),
+        ),
+        migrations.RunPython(fill_identifier_keys, migrations.RunPython.noop),
+    ]
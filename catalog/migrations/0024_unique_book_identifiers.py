@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:32
+
+import catalog.identifiers
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def clear_conflicting_keys(apps, schema_editor):
+    # Antes de la restricción única: cada (usuario, clave) se queda solo en su
+    # libro más antiguo. `manage.py backfill_identifiers` informa de los demás.
+    Book = apps.get_model('catalog', 'Book')
+    for field in ('isbn_key', 'doi_key'):
+        conflicts = (
+            Book.objects.exclude(**{field: ''})
+            .values('user_id', field)
+            .annotate(total=Count('id'), keep=Min('id'))
+            .filter(total__gt=1)
+        )
+        for row in conflicts:
+            Book.objects.filter(user_id=row['user_id'], **{field: row[field]}).exclude(
+                pk=row['keep']
+            ).update(**{field: ''})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0023_book_identifier_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='book',
+            name='book_user_isbn_key_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='book',
+            name='book_user_doi_key_idx',
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='doi',
+            field=models.CharField(blank=True, max_length=100, null=True, validators=[catalog.identifiers.validate_doi], verbose_name='DOI'),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='isbn',
+            field=models.CharField(blank=True, max_length=20, null=True, validators=[catalog.identifiers.validate_isbn], verbose_name='ISBN'),
+        ),
+        migrations.RunPython(clear_conflicting_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(condition=models.Q(('isbn_key', ''), _negated=True), fields=('user', 'isbn_key'), name='unique_book_isbn_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(condition=models.Q(('doi_key', ''), _negated=True), fields=('user', 'doi_key'), name='unique_book_doi_per_user'),
+        ),
+    ]
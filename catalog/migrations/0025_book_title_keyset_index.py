@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0024_unique_book_identifiers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['user', 'title', 'id'], name='book_user_title_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:38
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0025_book_title_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('pdf', 'PDF'), ('image', 'Imagen')], max_length=10)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nombre original')),
+                ('size', models.BigIntegerField(verbose_name='Tamaño total')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='Bytes recibidos')),
+                ('file_name', models.CharField(blank=True, default='', max_length=255, verbose_name='Archivo final')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última modificación')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 09:10
+
+from django.db import migrations
+
+
+def clear_default_covers(apps, schema_editor):
+    # Las portadas por defecto ahora se generan bajo demanda (catalog/covers.py);
+    # los PNG guardados por Book.save() dejan de estar referenciados.
+    Book = apps.get_model('catalog', 'Book')
+    Book.objects.filter(image__startswith='books_images/default_').update(image='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0026_upload'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_default_covers, migrations.RunPython.noop),
+    ]
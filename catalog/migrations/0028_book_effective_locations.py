@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_effective_locations(apps, schema_editor):
+    Book = apps.get_model('catalog', 'Book')
+    Drawer = apps.get_model('catalog', 'Drawer')
+    Gender = apps.get_model('catalog', 'Gender')
+    Book.objects.update(
+        effective_shelf=Coalesce(
+            Subquery(Drawer.objects.filter(pk=OuterRef('drawer_id')).values('shelf_id')[:1]), F('shelf')
+        ),
+        effective_classification=Coalesce(
+            Subquery(Gender.objects.filter(pk=OuterRef('genre_id')).values('classification_id')[:1]), F('classification')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0027_clear_default_cover_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='effective_classification',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.classification'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='effective_shelf',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.shelf'),
+        ),
+        migrations.RunPython(fill_effective_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:01
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_reading_status(apps, schema_editor):
+    ReadingProgress = apps.get_model('catalog', 'ReadingProgress')
+    ReadingProgress.objects.filter(last_page=0).update(status='unread')
+    ReadingProgress.objects.filter(
+        book__page_count__gt=0, last_page__gte=F('book__page_count')
+    ).update(status='finished')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0029_similar_books'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='readingprogress',
+            name='status',
+            field=models.CharField(choices=[('unread', 'Sin empezar'), ('reading', 'Leyendo'), ('finished', 'Terminado')], default='reading', editable=False, max_length=10),
+        ),
+        migrations.RunPython(fill_reading_status, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='readingprogress',
+            index=models.Index(condition=models.Q(('status', 'reading')), fields=['user', '-updated_at'], name='progress_reading_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='readingprogress',
+            index=models.Index(condition=models.Q(('status', 'finished')), fields=['user', '-updated_at'], name='progress_finished_idx'),
+        ),
+    ]
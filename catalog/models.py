@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
 from datetime import date
-from .utils import generate_default_book_image  
+import uuid
+from .covers import cover_url
+from .identifiers import normalize_doi, normalize_isbn, title_fingerprint, validate_doi, validate_isbn
 
 # -------------------
 # Estante
@@ -9,6 +11,7 @@ from .utils import generate_default_book_image
 class Shelf(models.Model):
     name = models.CharField(max_length=100, verbose_name="Nombre del estante")
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     def __str__(self):
         return self.name
@@ -29,6 +32,7 @@ class Drawer(models.Model):
     name = models.CharField(max_length=100, verbose_name="Nombre del cajón")
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     shelf = models.ForeignKey(Shelf, on_delete=models.CASCADE, verbose_name="Estante")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     def __str__(self):
         return f"{self.shelf} - {self.name}"
@@ -43,6 +47,7 @@ class Drawer(models.Model):
 class Classification(models.Model):
     name = models.CharField(max_length=100, verbose_name="Nombre de la clasificación")
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     def __str__(self):
         return self.name
@@ -65,6 +70,7 @@ class Gender(models.Model):
     start_date = models.DateField(blank=True, null=True, verbose_name="¿Cuándo inicia?")
     end_date = models.DateField(blank=True, null=True, verbose_name="¿Cuándo termina?")
     classification = models.ForeignKey(Classification, on_delete=models.CASCADE, verbose_name="Clasificación")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     def __str__(self):
         return self.name
@@ -92,6 +98,8 @@ class Author(models.Model):
         null=True,
         verbose_name="Imagen",
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -109,7 +117,6 @@ class Author(models.Model):
 from django.db import models
 from django.contrib.auth.models import User
 from datetime import date
-from .utils import generate_default_book_image  # Importar desde utils
 
 class Book(models.Model):
     COVERS = [
@@ -132,8 +139,8 @@ class Book(models.Model):
     page_count = models.PositiveIntegerField(blank=True, null=True, default=0, verbose_name="Número de páginas")
 
     # Identificadores
-    isbn = models.CharField(max_length=20, blank=True, null=True, verbose_name="ISBN")
-    doi = models.CharField(max_length=100, blank=True, null=True, verbose_name="DOI")
+    isbn = models.CharField(max_length=20, blank=True, null=True, validators=[validate_isbn], verbose_name="ISBN")
+    doi = models.CharField(max_length=100, blank=True, null=True, validators=[validate_doi], verbose_name="DOI")
 
     # Otros colaboradores
     translator = models.CharField(max_length=100, blank=True, null=True, verbose_name="Traductor")
@@ -145,6 +152,16 @@ class Book(models.Model):
     drawer = models.ForeignKey("Drawer", on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Cajón")
     classification = models.ForeignKey("Classification", on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Clasificación")
 
+    # Ubicación y clasificación efectivas (se calculan en save y al mover cajones o géneros;
+    # ver catalog/taxonomy.py): estante del cajón o estante directo, clasificación del
+    # género o clasificación directa. Todos los filtros son una igualdad indexada.
+    effective_shelf = models.ForeignKey(
+        "Shelf", on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="+"
+    )
+    effective_classification = models.ForeignKey(
+        "Classification", on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="+"
+    )
+
     # Digital y recursos online
     cover = models.CharField(max_length=10, choices=COVERS, default="soft", blank=True, verbose_name="Tipo de portada")
     pdf_file = models.FileField(blank=True, null=True, upload_to="books/pdfs/", verbose_name="Archivo PDF")
@@ -157,9 +174,43 @@ class Book(models.Model):
     series = models.CharField(max_length=100, blank=True, null=True, verbose_name="Serie/Colección")
     synopsis = models.TextField(blank=True, null=True, verbose_name="Sinopsis")
 
+    # Control de cambios (invalida fragmentos en caché)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
+
+    # Claves normalizadas (se calculan en save): ISBN-13 y DOI canónicos, vacíos si el
+    # identificador no es válido, y huella título/autor para detectar duplicados
+    isbn_key = models.CharField(max_length=13, blank=True, default="", editable=False)
+    doi_key = models.CharField(max_length=100, blank=True, default="", editable=False)
+    title_key = models.CharField(max_length=255, blank=True, default="", editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "title_key"], name="book_user_title_key_idx"),
+            # Paginación por clave (title, id) del selector de libros de Babels
+            models.Index(fields=["user", "title", "id"], name="book_user_title_id_idx"),
+        ]
+        constraints = [
+            # También sirven de índice para la búsqueda exacta por código de barras
+            models.UniqueConstraint(
+                fields=["user", "isbn_key"],
+                condition=~models.Q(isbn_key=""),
+                name="unique_book_isbn_per_user",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "doi_key"],
+                condition=~models.Q(doi_key=""),
+                name="unique_book_doi_per_user",
+            ),
+        ]
+
     def __str__(self):
         return self.display_name
 
+    @property
+    def image_url(self):
+        """Imagen subida o, si no hay, la portada por defecto generada bajo demanda."""
+        return self.image.url if self.image else cover_url(self.title)
+
     @property
     def display_name(self):
         pub_year = self.publication_date.year if self.publication_date else "Año desconocido"
@@ -167,39 +218,125 @@ class Book(models.Model):
         virtual_text = " - Virtual" if self.pdf_file else ""
         return f"{self.title} ({self.author}) - {pub_year} - {cover_display}{virtual_text}"
 
+    @property
+    def apa_citation(self):
+        """Referencia del libro en formato APA (usada en listados y tarjetas)."""
+        apa_author = (
+            f"{self.author.last_name.split(' ')[0].capitalize()}, {self.author.first_name[0].upper()}."
+            if self.author else "Autor desconocido"
+        )
+        apa_year = self.publication_date.year if self.publication_date else "¿?"
+        apa_title = self.title if self.title else "Título desconocido"
+        apa_subtitle = f": {self.subtitle}" if self.subtitle else ""
+        apa_editorial = self.editorial or ""
+        apa_volume = f"(Vol. {self.volume})" if self.volume else ""
+        apa_edition = f"({self.edition} ed.)" if self.edition else ""
+        apa_place = self.place_of_publication or ""
+        apa_series = f"{self.series}" if self.series else ""
+        apa_translator = f"(Trad. {self.translator})" if self.translator else ""
+        apa_editor = f"(Ed. {self.editor})" if self.editor else ""
+        apa_pages = f"{self.page_count} pp." if self.page_count else ""
+        apa_doi = f"https://doi.org/{self.doi}" if self.doi else ""
+        apa_url = self.url if self.url else ""
+
+        extra_info = ", ".join(filter(None, [
+            apa_volume, apa_edition, apa_place, apa_series, apa_translator, apa_editor, apa_pages
+        ]))
+        extra_info = f" ({extra_info})" if extra_info else ""
+
+        apa_citation = f"{apa_author} ({apa_year}). {apa_title}{apa_subtitle}. {apa_editorial}{extra_info}."
+        if apa_doi:
+            apa_citation += f" {apa_doi}"
+        elif apa_url:
+            apa_citation += f" {apa_url}"
+        return apa_citation
+
     def save(self, *args, **kwargs):
-        # Generar imagen por defecto si no existe
-        if not self.image and self.title:
-            try:
-                image_file = generate_default_book_image(
-                    self.title, 
-                    width=400, 
-                    height=600, 
-                    bg_color="#1F2937", 
-                    text_color="#FFD700"
-                )
-                if image_file:
-                    self.image.save(
-                        f"default_{self.title[:10]}.png",
-                        image_file,
-                        save=False
-                    )
-            except Exception as e:
-                print(f"Error generando imagen por defecto: {e}")
-                # Continuar sin imagen por defecto si hay error
-        
+        # Los guardados parciales (update_fields) no tocan título/autor/identificadores
+        if kwargs.get("update_fields") is None:
+            self.refresh_identifier_keys()
+            self.drop_conflicting_keys()
+            self.refresh_effective_keys()
         super().save(*args, **kwargs)
 
+    def refresh_effective_keys(self):
+        """Recalcula el estante y la clasificación efectivos a partir de cajón y género."""
+        self.effective_shelf_id = self.drawer.shelf_id if self.drawer_id else self.shelf_id
+        self.effective_classification_id = self.genre.classification_id if self.genre_id else self.classification_id
+
+    def refresh_identifier_keys(self):
+        """Recalcula las claves de duplicados a partir de ISBN, DOI, título y autor."""
+        self.isbn_key = normalize_isbn(self.isbn)
+        self.doi_key = normalize_doi(self.doi)
+        last_name = self.author.last_name if self.author_id else ""
+        self.title_key = title_fingerprint(self.title, last_name)
+
+    def drop_conflicting_keys(self):
+        """
+        Deja vacía la clave ISBN/DOI que ya tiene otro libro del usuario.
+
+        Las vistas rechazan un identificador repetido al escribirlo; esto cubre los
+        duplicados anteriores a la restricción única (y el admin), que así se pueden
+        seguir editando. `manage.py backfill_identifiers` los informa.
+        """
+        for field in ("isbn_key", "doi_key"):
+            value = getattr(self, field)
+            if value and Book.objects.filter(user_id=self.user_id, **{field: value}).exclude(pk=self.pk).exists():
+                setattr(self, field, "")
+
 class ReadingProgress(models.Model):
+    UNREAD = "unread"
+    READING = "reading"
+    FINISHED = "finished"
+    STATUSES = [
+        (UNREAD, "Sin empezar"),
+        (READING, "Leyendo"),
+        (FINISHED, "Terminado"),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
     last_page = models.PositiveIntegerField(default=1)  # empieza en página 1
+    # Estado derivado de last_page y del total de páginas del libro (se calcula en save;
+    # si cambia el total del libro lo recalcula la señal, ver catalog/reading.py)
+    status = models.CharField(max_length=10, choices=STATUSES, default=READING, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     class Meta:
         unique_together = ('user', 'book')  # un registro por usuario y libro
+        indexes = [
+            # Índices parciales del panel de inicio: solo contienen las filas de cada sección
+            models.Index(
+                fields=["user", "-updated_at"],
+                condition=models.Q(status="reading"),
+                name="progress_reading_idx",
+            ),
+            models.Index(
+                fields=["user", "-updated_at"],
+                condition=models.Q(status="finished"),
+                name="progress_finished_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.book.title} página {self.last_page}"
+
+    def save(self, *args, **kwargs):
+        self.refresh_status()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "last_page" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "status"}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def status_for(cls, last_page, page_count):
+        if page_count and last_page >= page_count:
+            return cls.FINISHED
+        return cls.READING if last_page > 0 else cls.UNREAD
+
+    def refresh_status(self):
+        """Recalcula el estado a partir de la página actual y el total de páginas del libro."""
+        self.status = self.status_for(self.last_page, self.book.page_count)
     
 
 class Babel(models.Model):
@@ -208,6 +345,260 @@ class Babel(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)  
     books = models.ManyToManyField("Book", blank=True, related_name="babels")  
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
+
+    def __str__(self):
+        return self.name
+
+# -------------------
+# Contadores de biblioteca
+# -------------------
+class LibraryCounter(models.Model):
+    """
+    Contadores desnormalizados por usuario y entidad (estante, cajón, género,
+    clasificación, autor, babel o la biblioteca completa).
+
+    Se mantienen de forma incremental desde `catalog.signals` y se reparan con
+    `manage.py recompute_counters`.
+    """
+    LIBRARY = "library"
+    SHELF = "shelf"
+    DRAWER = "drawer"
+    GENRE = "genre"
+    CLASSIFICATION = "classification"
+    AUTHOR = "author"
+    BABEL = "babel"
+
+    ENTITY_TYPES = [
+        (LIBRARY, "Biblioteca"),
+        (SHELF, "Estante"),
+        (DRAWER, "Cajón"),
+        (GENRE, "Género"),
+        (CLASSIFICATION, "Clasificación"),
+        (AUTHOR, "Autor"),
+        (BABEL, "Babel"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    entity_type = models.CharField(max_length=20, choices=ENTITY_TYPES)
+    entity_id = models.BigIntegerField(default=0)  # 0 para la biblioteca completa
+    book_count = models.IntegerField(default=0, verbose_name="Libros")
+    pages_read = models.BigIntegerField(default=0, verbose_name="Páginas leídas")
+    finished_count = models.IntegerField(default=0, verbose_name="Libros terminados")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "entity_type", "entity_id"],
+                name="unique_library_counter",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.entity_type}:{self.entity_id} ({self.book_count} libros)"
+
+
+# -------------------
+# Secuencias de nombres automáticos
+# -------------------
+class NameSequence(models.Model):
+    """
+    Contador por usuario (estantes) o por estante (cajones) para asignar
+    nombres automáticos (E1, E2... / C1, C2...) en tiempo constante.
+
+    La fila se bloquea con `select_for_update` al asignar, de modo que dos
+    peticiones concurrentes nunca reciben el mismo número.
+    """
+    SHELF = "shelf"
+    DRAWER = "drawer"
+
+    SCOPES = [
+        (SHELF, "Estante"),
+        (DRAWER, "Cajón"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    scope = models.CharField(max_length=20, choices=SCOPES)
+    scope_id = models.BigIntegerField(default=0)  # id del estante para cajones, 0 para estantes
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "scope", "scope_id"],
+                name="unique_name_sequence",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.scope}:{self.scope_id} = {self.last_value}"
+
+    @classmethod
+    def next_value(cls, user, scope, scope_id=0, seed=None):
+        """
+        Reserva y devuelve el siguiente número de la secuencia.
+
+        `seed` es un callable que da el valor inicial la primera vez que se usa
+        la secuencia (p. ej. cuántos estantes tenía ya el usuario).
+        """
+        lookup = {"user": user, "scope": scope, "scope_id": scope_id}
+        with transaction.atomic():
+            sequence = cls.objects.select_for_update().filter(**lookup).first()
+            if sequence is None:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(last_value=seed() if seed else 0, **lookup)
+                except IntegrityError:
+                    pass  # otra petición la creó primero
+                sequence = cls.objects.select_for_update().get(**lookup)
+
+            sequence.last_value += 1
+            sequence.save(update_fields=["last_value"])
+            return sequence.last_value
+
+    @classmethod
+    def next_shelf_name(cls, user):
+        value = cls.next_value(
+            user, cls.SHELF,
+            seed=lambda: Shelf.objects.filter(user=user).count(),
+        )
+        return f"E{value}"
+
+    @classmethod
+    def next_drawer_name(cls, user, shelf):
+        value = cls.next_value(
+            user, cls.DRAWER, shelf.pk,
+            seed=lambda: Drawer.objects.filter(user=user, shelf=shelf).count(),
+        )
+        return f"C{value}"
+
+
+# -------------------
+# Versión de la biblioteca
+# -------------------
+class LibraryVersion(models.Model):
+    """
+    Marca de "última modificación" de la biblioteca de cada usuario.
+
+    Se actualiza desde `catalog.signals` con cualquier cambio del catálogo y se
+    usa para responder 304 en listados y detalles (ver `catalog.conditional`).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="library_version")
+    last_modified = models.DateTimeField(verbose_name="Última modificación")
+
+    def __str__(self):
+        return f"{self.user_id} - {self.last_modified.isoformat()}"
+
+
+# -------------------
+# Subidas por partes
+# -------------------
+class Upload(models.Model):
+    """
+    Subida reanudable de un archivo grande (PDF o imagen) enviada por partes.
+
+    Las partes se escriben directamente en `MEDIA_ROOT/uploads/<id>.part`; al
+    completarse el archivo se mueve a su carpeta definitiva y un libro puede
+    referenciarlo por su id (ver `catalog.uploads`).
+    """
+    PDF = "pdf"
+    IMAGE = "image"
+
+    KINDS = [
+        (PDF, "PDF"),
+        (IMAGE, "Imagen"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KINDS)
+    filename = models.CharField(max_length=255, verbose_name="Nombre original")
+    size = models.BigIntegerField(verbose_name="Tamaño total")
+    offset = models.BigIntegerField(default=0, verbose_name="Bytes recibidos")
+    file_name = models.CharField(max_length=255, blank=True, default="", verbose_name="Archivo final")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def is_complete(self):
+        return bool(self.file_name)
+
+
+# -------------------
+# Libros similares
+# -------------------
+class BookTerms(models.Model):
+    """
+    Términos de un libro (frecuencias sin IDF) para las recomendaciones.
+
+    `source_hash` identifica el texto del que salieron: solo se vuelven a
+    calcular los libros cuyo título, sinopsis, género o autor cambió
+    (ver `catalog.recommendations`).
+    """
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, primary_key=True, related_name="terms")
+    source_hash = models.CharField(max_length=40)
+    terms = models.JSONField(default=dict)
+
+
+class BookNeighbor(models.Model):
+    """Vecino precalculado de un libro (top-N por similitud coseno TF-IDF)."""
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            # También es el índice de la lectura ordenada de detail_book
+            models.UniqueConstraint(fields=["book", "rank"], name="unique_book_neighbor_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} -> {self.neighbor_id} ({self.score:.2f})"
+
+
+# -------------------
+# Cola de tareas en segundo plano
+# -------------------
+class Job(models.Model):
+    """
+    Tarea diferida: una función importable (`task`) con argumentos JSON.
+
+    La atienden los procesos de `manage.py run_worker` (ver `catalog.jobs`). Las
+    tareas completadas se eliminan; las que agotan sus intentos quedan como
+    fallidas con el último error.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+
+    STATUSES = [
+        (PENDING, "Pendiente"),
+        (RUNNING, "En curso"),
+        (FAILED, "Fallida"),
+    ]
+
+    task = models.CharField(max_length=200, verbose_name="Función")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(verbose_name="Ejecutar a partir de")
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
+
+    class Meta:
+        indexes = [
+            # Solo las pendientes: el worker busca la siguiente sin recorrer fallidas
+            models.Index(fields=["run_at", "id"], condition=models.Q(status="pending"), name="job_pending_idx"),
+        ]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.task} ({self.get_status_display()}, intento {self.attempts}/{self.max_attempts})"
@@ -0,0 +1,184 @@
+###########################################################################################
+#                                                                                        #
+#                          ARCHIVOS HUÉRFANOS EN MEDIA_ROOT                              #
+#                                                                                        #
+#   Recolector marcar-y-barrer para `manage.py gc_media`:                                #
+#                                                                                        #
+#   1. Marcar: los nombres referenciados (`Book.pdf_file`, `Book.image`, `Author.image`  #
+#      y subidas en curso) se leen por streaming y se guardan como huellas de 8 bytes    #
+#      en un `array` ordenado (~8 MB por millón de archivos, búsqueda binaria).          #
+#   2. Barrer: se recorren con `os.scandir` las carpetas de subida y cada archivo no     #
+#      referenciado y más antiguo que el periodo de gracia se borra (o se informa).      #
+#                                                                                        #
+#   Una colisión de huellas solo puede hacer que un huérfano se conserve, nunca que se   #
+#   borre un archivo en uso. El periodo de gracia protege los archivos recién subidos    #
+#   cuya fila aún no se ha guardado.                                                     #
+#                                                                                        #
+###########################################################################################
+
+import hashlib
+import heapq
+import os
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import uploads
+from .models import Author, Book, Upload
+
+# Carpetas (relativas a MEDIA_ROOT) que se barren: las de los campos de archivo y las subidas
+SWEEP_DIRS = (
+    Book._meta.get_field("pdf_file").upload_to,
+    Book._meta.get_field("image").upload_to,
+    Author._meta.get_field("image").upload_to,
+    "uploads/",
+)
+
+STREAM_CHUNK_SIZE = 5000
+RUN_SIZE = 100_000
+
+
+def _fingerprint(name):
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ReferenceSet:
+    """
+    Conjunto compacto de nombres de archivo (huellas de 64 bits ordenadas).
+
+    Las huellas se ordenan por tramos de `RUN_SIZE` y se mezclan con
+    `heapq.merge`: nunca hay más de un tramo como lista de enteros de Python.
+    """
+
+    def __init__(self, names):
+        runs = []
+        run = []
+        for name in names:
+            if not name:
+                continue
+            run.append(_fingerprint(name))
+            if len(run) >= RUN_SIZE:
+                runs.append(array("Q", sorted(run)))
+                run = []
+        runs.append(array("Q", sorted(run)))
+
+        self.fingerprints = array("Q")
+        last = None
+        for fingerprint in heapq.merge(*runs):
+            if fingerprint != last:
+                self.fingerprints.append(fingerprint)
+                last = fingerprint
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def __contains__(self, name):
+        fingerprint = _fingerprint(name)
+        position = bisect_left(self.fingerprints, fingerprint)
+        return position < len(self.fingerprints) and self.fingerprints[position] == fingerprint
+
+
+# -------------------
+# Marcar
+# -------------------
+
+def expire_uploads(grace):
+    """
+    Cancela las subidas abandonadas más antiguas que `grace`.
+
+    Las incompletas se abortan (se borra su `.part`); las completadas que ningún
+    libro reclamó se olvidan y su archivo queda huérfano para el barrido.
+    Devuelve el número de subidas eliminadas.
+    """
+    stale = Upload.objects.filter(updated_at__lt=timezone.now() - grace)
+    expired = 0
+    for upload in stale.iterator():
+        if upload.is_complete:
+            upload.delete()
+        else:
+            uploads.abort(upload)
+        expired += 1
+    return expired
+
+
+def referenced_names():
+    """Itera por streaming todos los nombres de archivo en uso (relativos a MEDIA_ROOT)."""
+    for pdf_name, image_name in Book.objects.values_list("pdf_file", "image").iterator(chunk_size=STREAM_CHUNK_SIZE):
+        yield pdf_name
+        yield image_name
+    yield from Author.objects.values_list("image", flat=True).iterator(chunk_size=STREAM_CHUNK_SIZE)
+    for upload in Upload.objects.only("id", "file_name").iterator(chunk_size=STREAM_CHUNK_SIZE):
+        yield upload.file_name or f"uploads/{upload.pk}.part"
+
+
+def mark():
+    """Huellas de todos los archivos referenciados."""
+    return ReferenceSet(referenced_names())
+
+
+# -------------------
+# Barrer
+# -------------------
+
+def iter_files(directory):
+    """Recorre `directory` con `os.scandir` (sin listas completas en memoria): (ruta, stat)."""
+    pending = [directory]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+
+
+def sweep(references, grace, dry_run=False, on_orphan=None):
+    """
+    Borra (o con `dry_run` solo cuenta) los archivos no referenciados más antiguos que `grace`.
+
+    `on_orphan(nombre, tamaño)` se llama por cada huérfano encontrado.
+    Devuelve (archivos revisados, huérfanos, bytes recuperables).
+    """
+    root = Path(settings.MEDIA_ROOT)
+    cutoff = time.time() - grace.total_seconds()
+    scanned = orphans = reclaimed = 0
+    for directory in SWEEP_DIRS:
+        for path, stat in iter_files(root / directory):
+            scanned += 1
+            name = Path(path).relative_to(root).as_posix()
+            if name in references or stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Error eliminando archivo {name}: {e}")
+                    continue
+            orphans += 1
+            reclaimed += stat.st_size
+            if on_orphan:
+                on_orphan(name, stat.st_size)
+    return scanned, orphans, reclaimed
+
+
+def collect(grace=timedelta(hours=24), dry_run=False, on_orphan=None):
+    """Expira subidas abandonadas, marca y barre. Devuelve el resumen como diccionario."""
+    expired = 0 if dry_run else expire_uploads(grace)
+    references = mark()
+    scanned, orphans, reclaimed = sweep(references, grace, dry_run=dry_run, on_orphan=on_orphan)
+    return {
+        "expired_uploads": expired,
+        "referenced": len(references),
+        "scanned": scanned,
+        "orphans": orphans,
+        "reclaimed": reclaimed,
+    }
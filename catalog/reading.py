@@ -0,0 +1,91 @@
+###########################################################################################
+#                                                                                        #
+#                                   PANEL DE LECTURA                                     #
+#                                                                                        #
+#   Secciones de la página de inicio a partir de `ReadingProgress.status`:               #
+#                                                                                        #
+#   - Leyendo ahora         -> progreso "reading" más reciente (índice parcial).         #
+#   - Terminados hace poco  -> progreso "finished" más reciente (índice parcial).        #
+#   - Sin empezar           -> últimos libros añadidos sin progreso del usuario.         #
+#                                                                                        #
+#   Cada sección es una sola consulta con LIMIT que une libro y autor: la página de      #
+#   inicio lee unas decenas de filas, no la biblioteca entera.                           #
+#                                                                                        #
+###########################################################################################
+
+from django.db.models import Case, CharField, Exists, OuterRef, Value, When
+
+from .models import Book, ReadingProgress
+
+# Libros por sección
+SECTION_SIZE = 6
+
+
+# -------------------
+# Estado de lectura
+# -------------------
+
+def refresh_book(book_id, page_count):
+    """
+    Recalcula el estado de todo el progreso de un libro cuyo total de páginas cambió.
+
+    Es un UPDATE sin pasar por `save()`: no cambia `updated_at`, así el libro no
+    sube en el panel por un cambio que no es de lectura.
+    """
+    finished = [When(last_page__gte=page_count, then=Value(ReadingProgress.FINISHED))] if page_count else []
+    return ReadingProgress.objects.filter(book_id=book_id).update(status=Case(
+        *finished,
+        When(last_page__gt=0, then=Value(ReadingProgress.READING)),
+        default=Value(ReadingProgress.UNREAD),
+        output_field=CharField(),
+    ))
+
+
+# -------------------
+# Secciones
+# -------------------
+
+def _progress_section(user, status, limit):
+    progress = (
+        ReadingProgress.objects.filter(user=user, status=status)
+        .select_related("book__author")
+        .order_by("-updated_at")[:limit]
+    )
+    items = []
+    for entry in progress:
+        page_count = entry.book.page_count
+        items.append({
+            "book": entry.book,
+            "last_page": entry.last_page,
+            "progress_percent": min(int(entry.last_page / page_count * 100), 100) if page_count else 0,
+            "updated_at": entry.updated_at,
+        })
+    return items
+
+
+def currently_reading(user, limit=SECTION_SIZE):
+    return _progress_section(user, ReadingProgress.READING, limit)
+
+
+def recently_finished(user, limit=SECTION_SIZE):
+    return _progress_section(user, ReadingProgress.FINISHED, limit)
+
+
+def not_started(user, limit=SECTION_SIZE):
+    """Últimos libros añadidos por el usuario que aún no ha abierto."""
+    started = ReadingProgress.objects.filter(user=user, book=OuterRef("pk")).exclude(status=ReadingProgress.UNREAD)
+    return list(
+        Book.objects.filter(user=user)
+        .filter(~Exists(started))
+        .select_related("author")
+        .order_by("-id")[:limit]
+    )
+
+
+def dashboard(user):
+    """Contexto del panel de inicio (tres consultas acotadas)."""
+    return {
+        "currently_reading": currently_reading(user),
+        "recently_finished": recently_finished(user),
+        "not_started": not_started(user),
+    }
@@ -0,0 +1,210 @@
+###########################################################################################
+#                                                                                        #
+#                                   LIBROS SIMILARES                                     #
+#                                                                                        #
+#   Relaciona los libros de cada usuario por similitud coseno de vectores TF-IDF         #
+#   construidos con título, sinopsis, género, clasificación y autor.                     #
+#                                                                                        #
+#   - `BookTerms` guarda los términos de cada libro y un hash del texto de origen:       #
+#     solo se tokenizan de nuevo los libros que cambiaron.                               #
+#   - Los vectores son diccionarios dispersos {término: peso} normalizados; los          #
+#     candidatos de cada libro salen de un índice invertido (sin comparar todos los      #
+#     pares) y se puntúan con el coseno exacto.                                          #
+#   - `BookNeighbor` guarda el top-N de cada libro: `detail_book` lo lee con una         #
+#     consulta indexada (`manage.py compute_similar_books` lo mantiene al día).          #
+#                                                                                        #
+###########################################################################################
+
+import hashlib
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .conditional import touch_library
+from .identifiers import STOP_WORDS, WORD_RE, strip_accents
+from .models import Book, BookNeighbor, BookTerms
+
+# Vecinos guardados por libro
+TOP_N = 8
+
+# Similitud mínima para considerar a un libro vecino
+MIN_SCORE = 0.05
+
+# Términos presentes en más libros que esto no generan candidatos (sí puntúan):
+# un autor con miles de libros no debe volver cuadrático el cálculo
+MAX_POSTINGS = 1000
+
+# Candidatos (por coincidencia parcial) que se puntúan con el coseno exacto
+CANDIDATES = 50
+
+# Peso de cada parte del libro (repeticiones del término)
+TITLE_WEIGHT = 2
+METADATA_WEIGHT = 3
+
+SOURCE_FIELDS = ("pk", "title", "synopsis", "genre_id", "effective_classification_id", "author_id")
+
+
+# -------------------
+# Términos
+# -------------------
+
+def _words(text):
+    return [word for word in WORD_RE.findall(strip_accents(text)) if len(word) > 2 and word not in STOP_WORDS]
+
+
+def source_hash(title, synopsis, genre_id, classification_id, author_id):
+    raw = "\x1f".join(str(value or "") for value in (title, synopsis, genre_id, classification_id, author_id))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def book_terms(title, synopsis, genre_id, classification_id, author_id):
+    """Frecuencia de cada término (palabras + marcas de género, clasificación y autor)."""
+    terms = Counter(_words(synopsis or ""))
+    for word in _words(title or ""):
+        terms[word] += TITLE_WEIGHT
+    for prefix, value in (("g", genre_id), ("c", classification_id), ("a", author_id)):
+        if value:
+            terms[f"{prefix}:{value}"] += METADATA_WEIGHT
+    return dict(terms)
+
+
+def _vectors(terms_by_book):
+    """Vectores TF-IDF (1 + log tf, idf suavizado) normalizados a longitud 1."""
+    total = len(terms_by_book)
+    document_frequency = Counter(term for terms in terms_by_book.values() for term in terms)
+    idf = {term: math.log((total + 1) / (count + 1)) + 1 for term, count in document_frequency.items()}
+
+    vectors = {}
+    for book_id, terms in terms_by_book.items():
+        weights = {term: (1 + math.log(count)) * idf[term] for term, count in terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        vectors[book_id] = {term: weight / norm for term, weight in weights.items()} if norm else {}
+    return vectors
+
+
+def _inverted_index(vectors):
+    postings = defaultdict(list)
+    for book_id, vector in vectors.items():
+        for term, weight in vector.items():
+            postings[term].append((book_id, weight))
+    return postings
+
+
+def _cosine(first, second):
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(weight * second.get(term, 0.0) for term, weight in first.items())
+
+
+def _neighbors(book_id, vectors, postings):
+    """Top-N (score, vecino) de un libro."""
+    vector = vectors[book_id]
+    partial = defaultdict(float)
+    for term, weight in vector.items():
+        posting = postings[term]
+        if len(posting) > MAX_POSTINGS:
+            continue
+        for other_id, other_weight in posting:
+            if other_id != book_id:
+                partial[other_id] += weight * other_weight
+
+    candidates = heapq.nlargest(CANDIDATES, partial, key=partial.get)
+    scored = ((_cosine(vector, vectors[other_id]), other_id) for other_id in candidates)
+    return heapq.nlargest(TOP_N, (item for item in scored if item[0] >= MIN_SCORE))
+
+
+# -------------------
+# Cálculo por usuario
+# -------------------
+
+def update_user(user_id, full=False):
+    """
+    Actualiza términos y vecinos de los libros de un usuario.
+
+    Sin `full` solo se tokenizan los libros nuevos o modificados, y se
+    recalculan sus vecinos y los de los libros afectados por ellos (los que los
+    tenían como vecinos o a los que ahora superarían en su top-N). Con `full`
+    se recalcula todo (p. ej. tras muchos cambios: el IDF se desplaza).
+    Devuelve (libros retokenizados, libros con vecinos recalculados).
+    """
+    stored = dict(BookTerms.objects.filter(book__user_id=user_id).values_list("book_id", "source_hash"))
+    terms_by_book = {}
+    changed = {}
+
+    for book_id, title, synopsis, genre_id, classification_id, author_id in (
+        Book.objects.filter(user_id=user_id).values_list(*SOURCE_FIELDS).iterator()
+    ):
+        digest = source_hash(title, synopsis, genre_id, classification_id, author_id)
+        if full or stored.get(book_id) != digest:
+            changed[book_id] = BookTerms(
+                book_id=book_id,
+                source_hash=digest,
+                terms=book_terms(title, synopsis, genre_id, classification_id, author_id),
+            )
+
+    # Solo se leen de la base los términos de los libros que no cambiaron
+    unchanged_ids = [book_id for book_id in stored if book_id not in changed]
+    for book_id, terms in BookTerms.objects.filter(book_id__in=unchanged_ids).values_list("book_id", "terms").iterator():
+        terms_by_book[book_id] = terms
+    for book_id, row in changed.items():
+        terms_by_book[book_id] = row.terms
+
+    vectors = _vectors(terms_by_book)
+    postings = _inverted_index(vectors)
+
+    current = defaultdict(list)
+    for book_id, neighbor_id, score in BookNeighbor.objects.filter(book__user_id=user_id).values_list(
+        "book_id", "neighbor_id", "score"
+    ):
+        current[book_id].append((score, neighbor_id))
+
+    results = {}
+    if full:
+        targets = set(vectors)
+    else:
+        targets = set(changed)
+        # Libros que tenían como vecino a un libro modificado o con huecos (vecinos borrados)
+        for book_id, neighbors in current.items():
+            if len(neighbors) < TOP_N or any(neighbor_id in changed for _, neighbor_id in neighbors):
+                targets.add(book_id)
+        # Libros en los que un libro modificado entraría ahora en el top-N
+        for book_id in changed:
+            results[book_id] = _neighbors(book_id, vectors, postings)
+            for score, other_id in results[book_id]:
+                neighbors = current.get(other_id, [])
+                if len(neighbors) < TOP_N or score > min(neighbors)[0]:
+                    targets.add(other_id)
+        targets &= set(vectors)
+
+    for book_id in targets:
+        if book_id not in results:
+            results[book_id] = _neighbors(book_id, vectors, postings)
+
+    with transaction.atomic():
+        if changed:
+            BookTerms.objects.filter(book_id__in=list(changed)).delete()
+            BookTerms.objects.bulk_create(changed.values(), batch_size=500)
+        BookNeighbor.objects.filter(book_id__in=list(results)).delete()
+        BookNeighbor.objects.bulk_create(
+            [
+                BookNeighbor(book_id=book_id, neighbor_id=neighbor_id, rank=rank, score=score)
+                for book_id, neighbors in results.items()
+                for rank, (score, neighbor_id) in enumerate(neighbors, start=1)
+            ],
+            batch_size=1000,
+        )
+    if results:
+        touch_library(user_id)  # detail_book responde con ETag por versión de biblioteca
+    return len(changed), len(results)
+
+
+def similar_books(book, limit=TOP_N):
+    """Libros similares precalculados (una consulta por el índice (book, rank))."""
+    return [
+        relation.neighbor
+        for relation in BookNeighbor.objects.filter(book=book)
+        .select_related("neighbor__author")
+        .order_by("rank")[:limit]
+    ]
@@ -0,0 +1,318 @@
+###########################################################################################
+#                                                                                        #
+#                                        SIGNALS                                         #
+#                                                                                        #
+#   Receptores que mantienen al día la información desnormalizada del catálogo.          #
+#   Se registran en `CatalogConfig.ready()`.                                             #
+#                                                                                        #
+#   1. Libros          -> deltas de contadores al crear, mover o eliminar.               #
+#   2. Progreso        -> páginas leídas, libros terminados y estado de lectura.         #
+#   3. Babels          -> altas y bajas de libros en un Babel.                           #
+#   4. Taxonomía       -> cambios poco frecuentes (mover cajón/género, eliminar          #
+#                         entidades) que reconstruyen los contadores del usuario y       #
+#                         las columnas efectivas de sus libros (catalog/taxonomy.py).    #
+#   5. Versión         -> marca de última modificación para GET condicional (304).       #
+#   6. Texto completo  -> indexado en segundo plano de PDFs nuevos o reemplazados.       #
+#   7. Imágenes        -> normalización en segundo plano de portadas y fotos subidas.    #
+#   8. Autocompletado  -> índice de prefijos en memoria de títulos, autores y series.    #
+#                                                                                        #
+###########################################################################################
+
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import autocomplete, counters, fulltext, images, reading, taxonomy
+from .background import run_in_background
+from .conditional import touch_library
+from .models import Author, Babel, Book, Classification, Drawer, Gender, LibraryCounter, ReadingProgress, Shelf
+
+
+# -------------------
+# Libros
+# -------------------
+
+@receiver(pre_save, sender=Book)
+def book_pre_save(sender, instance, **kwargs):
+    instance._counter_before = counters.book_snapshot(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Book)
+def book_post_save(sender, instance, **kwargs):
+    deltas = counters.new_deltas()
+    counters.add_snapshot(deltas, getattr(instance, "_counter_before", None), sign=-1)
+    counters.add_snapshot(deltas, counters.book_snapshot(instance.pk), sign=1)
+    counters.apply_deltas(deltas)
+
+
+@receiver(pre_delete, sender=Book)
+def book_pre_delete(sender, instance, **kwargs):
+    instance._counter_before = counters.book_snapshot(instance.pk)
+
+
+@receiver(post_delete, sender=Book)
+def book_post_delete(sender, instance, **kwargs):
+    before = getattr(instance, "_counter_before", None)
+    if before:
+        # Las páginas leídas las descuenta el borrado en cascada de ReadingProgress
+        counters.apply_deltas(counters.add_snapshot(
+            counters.new_deltas(), dict(before, last_page=0), sign=-1
+        ))
+
+
+# -------------------
+# Progreso de lectura
+# -------------------
+
+def _owner_snapshot(progress):
+    """Snapshot del libro solo si el progreso pertenece a su dueño."""
+    snapshot = counters.book_snapshot(progress.book_id)
+    if snapshot and snapshot["user_id"] == progress.user_id:
+        return snapshot
+    return None
+
+
+@receiver(pre_save, sender=ReadingProgress)
+def progress_pre_save(sender, instance, **kwargs):
+    instance._counter_before_page = (
+        ReadingProgress.objects.filter(pk=instance.pk).values_list("last_page", flat=True).first()
+        if instance.pk else None
+    ) or 0
+
+
+@receiver(post_save, sender=ReadingProgress)
+def progress_post_save(sender, instance, **kwargs):
+    snapshot = _owner_snapshot(instance)
+    if not snapshot:
+        return
+    deltas = counters.new_deltas()
+    before_page = getattr(instance, "_counter_before_page", 0)
+    counters.add_snapshot(deltas, dict(snapshot, last_page=before_page), sign=-1, books=0)
+    counters.add_snapshot(deltas, snapshot, sign=1, books=0)
+    counters.apply_deltas(deltas)
+
+
+@receiver(post_save, sender=Book)
+def book_reading_status(sender, instance, created, **kwargs):
+    # El estado guardado depende del total de páginas (p. ej. read_pdf lo calcula al abrir)
+    before = getattr(instance, "_counter_before", None)
+    if not created and before and before["page_count"] != instance.page_count:
+        reading.refresh_book(instance.pk, instance.page_count)
+
+
+@receiver(pre_delete, sender=ReadingProgress)
+def progress_pre_delete(sender, instance, **kwargs):
+    instance._counter_before = _owner_snapshot(instance)
+
+
+@receiver(post_delete, sender=ReadingProgress)
+def progress_post_delete(sender, instance, **kwargs):
+    counters.apply_deltas(counters.add_snapshot(
+        counters.new_deltas(), getattr(instance, "_counter_before", None), sign=-1, books=0
+    ))
+
+
+# -------------------
+# Babels
+# -------------------
+
+def _babel_book_pairs(instance, reverse, pk_set):
+    """Pares (babel_id, book_id) afectados, sin importar desde qué lado se editó."""
+    if reverse:
+        return [(babel_id, instance.pk) for babel_id in pk_set]
+    return [(instance.pk, book_id) for book_id in pk_set]
+
+
+@receiver(m2m_changed, sender=Babel.books.through)
+def babel_books_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        related = instance.babels if reverse else instance.books
+        instance._counter_cleared = set(related.values_list("pk", flat=True))
+        return
+
+    if action == "post_clear":
+        pk_set, sign = getattr(instance, "_counter_cleared", set()), -1
+    elif action == "post_add":
+        sign = 1
+    elif action == "post_remove":
+        sign = -1
+    else:
+        return
+
+    deltas = counters.new_deltas()
+    for babel_id, book_id in _babel_book_pairs(instance, reverse, pk_set or ()):
+        counters.add_snapshot(
+            deltas, counters.book_snapshot(book_id), sign=sign,
+            keys=[(LibraryCounter.BABEL, babel_id)],
+        )
+    counters.apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Babel)
+def babel_post_delete(sender, instance, **kwargs):
+    LibraryCounter.objects.filter(entity_type=LibraryCounter.BABEL, entity_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Author)
+def author_post_delete(sender, instance, **kwargs):
+    LibraryCounter.objects.filter(entity_type=LibraryCounter.AUTHOR, entity_id=instance.pk).delete()
+
+
+# -------------------
+# Taxonomía y ubicación
+# -------------------
+
+@receiver(pre_save, sender=Drawer)
+def drawer_pre_save(sender, instance, **kwargs):
+    instance._previous_shelf_id = (
+        Drawer.objects.filter(pk=instance.pk).values_list("shelf_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Drawer)
+def drawer_post_save(sender, instance, created, **kwargs):
+    if not created and instance._previous_shelf_id != instance.shelf_id:
+        taxonomy.drawer_moved(instance)
+        counters.schedule_recompute(instance.user_id)
+
+
+@receiver(pre_save, sender=Gender)
+def gender_pre_save(sender, instance, **kwargs):
+    instance._previous_classification_id = (
+        Gender.objects.filter(pk=instance.pk).values_list("classification_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Gender)
+def gender_post_save(sender, instance, created, **kwargs):
+    if not created and instance._previous_classification_id != instance.classification_id:
+        taxonomy.genre_moved(instance)
+        counters.schedule_recompute(instance.user_id)
+
+
+@receiver(post_delete, sender=Shelf)
+@receiver(post_delete, sender=Drawer)
+@receiver(post_delete, sender=Gender)
+@receiver(post_delete, sender=Classification)
+def taxonomy_post_delete(sender, instance, **kwargs):
+    # Los libros quedan en NULL vía SET_NULL (sin señales): se reconstruye el usuario
+    if sender in (Drawer, Gender):
+        taxonomy.refresh_user(instance.user_id)
+    counters.schedule_recompute(instance.user_id)
+
+
+# -------------------
+# Versión de la biblioteca (GET condicional)
+# -------------------
+
+VERSIONED_MODELS = (Shelf, Drawer, Classification, Gender, Author, Book, ReadingProgress, Babel)
+
+
+def library_changed(sender, instance, **kwargs):
+    touch_library(instance.user_id)
+
+
+for versioned_model in VERSIONED_MODELS:
+    post_save.connect(library_changed, sender=versioned_model, dispatch_uid=f"touch_{versioned_model.__name__}_save")
+    post_delete.connect(library_changed, sender=versioned_model, dispatch_uid=f"touch_{versioned_model.__name__}_delete")
+
+
+@receiver(m2m_changed, sender=Babel.books.through)
+def babel_books_touched(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        touch_library(instance.user_id)
+
+
+# -------------------
+# Texto completo de PDFs
+# -------------------
+
+@receiver(pre_save, sender=Book)
+def book_pdf_pre_save(sender, instance, **kwargs):
+    instance._previous_pdf_name = (
+        Book.objects.filter(pk=instance.pk).values_list("pdf_file", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Book)
+def book_pdf_post_save(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_pdf_name", None) or None
+    current = instance.pdf_file.name if instance.pdf_file else None
+    if previous == current:
+        return
+    if current and settings.FULLTEXT_AUTO_INDEX:
+        run_in_background(fulltext.index_book, instance.pk)
+    elif not current and instance.user_id:
+        fulltext.remove_book(instance.user_id, instance.pk)
+
+
+@receiver(post_delete, sender=Book)
+def book_pdf_post_delete(sender, instance, **kwargs):
+    if instance.user_id:
+        fulltext.remove_book(instance.user_id, instance.pk)
+
+
+# -------------------
+# Imágenes
+# -------------------
+
+def image_pre_save(sender, instance, **kwargs):
+    instance._previous_image_name = (
+        sender.objects.filter(pk=instance.pk).values_list("image", flat=True).first()
+        if instance.pk else None
+    )
+
+
+def image_post_save(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_image_name", None) or None
+    current = instance.image.name if instance.image else None
+    if current and current != previous and settings.IMAGE_AUTO_NORMALIZE:
+        run_in_background(images.normalize_image, sender._meta.label, instance.pk)
+
+
+for image_model in (Book, Author):
+    pre_save.connect(image_pre_save, sender=image_model, dispatch_uid=f"image_{image_model.__name__}_pre_save")
+    post_save.connect(image_post_save, sender=image_model, dispatch_uid=f"image_{image_model.__name__}_post_save")
+
+
+# -------------------
+# Autocompletado
+# -------------------
+# Se conectan después de `library_changed`: el índice adopta la versión ya actualizada
+# solo si estaba al día con la anterior (leída en pre_save/pre_delete).
+
+@receiver(pre_save, sender=Book)
+@receiver(pre_save, sender=Author)
+@receiver(pre_delete, sender=Book)
+@receiver(pre_delete, sender=Author)
+def autocomplete_version_before(sender, instance, **kwargs):
+    instance._autocomplete_version = autocomplete.version_before_change(instance.user_id)
+
+
+@receiver(post_save, sender=Book)
+def book_autocomplete_saved(sender, instance, **kwargs):
+    if instance.user_id:
+        autocomplete.book_saved(instance, getattr(instance, "_autocomplete_version", None))
+
+
+@receiver(post_save, sender=Author)
+def author_autocomplete_saved(sender, instance, **kwargs):
+    if instance.user_id:
+        autocomplete.author_saved(instance, getattr(instance, "_autocomplete_version", None))
+
+
+@receiver(post_delete, sender=Book)
+def book_autocomplete_removed(sender, instance, **kwargs):
+    autocomplete.removed(
+        autocomplete.BOOK, instance.user_id, instance.pk, getattr(instance, "_autocomplete_version", None)
+    )
+
+
+@receiver(post_delete, sender=Author)
+def author_autocomplete_removed(sender, instance, **kwargs):
+    autocomplete.removed(
+        autocomplete.AUTHOR, instance.user_id, instance.pk, getattr(instance, "_autocomplete_version", None)
+    )
@@ -0,0 +1,46 @@
+###########################################################################################
+#                                                                                        #
+#                          UBICACIÓN Y CLASIFICACIÓN EFECTIVAS                           #
+#                                                                                        #
+#   Un libro puede estar en un estante directamente o a través de un cajón, y puede      #
+#   tener una clasificación directa o heredarla de su género. Las columnas               #
+#   `Book.effective_shelf` y `Book.effective_classification` guardan el valor canónico:  #
+#                                                                                        #
+#     - estante efectivo        = estante del cajón si hay cajón, si no el estante.      #
+#     - clasificación efectiva  = la del género si hay género, si no la directa.         #
+#                                                                                        #
+#   `Book.save()` las calcula para un libro; `refresh_books(...)` las recalcula en       #
+#   bloque con un solo UPDATE (mover un cajón o un género, eliminar entidades,           #
+#   `manage.py backfill_effective_locations`).                                           #
+#                                                                                        #
+###########################################################################################
+
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Book, Drawer, Gender
+
+
+def refresh_books(books):
+    """Recalcula las columnas efectivas de un queryset de libros; devuelve las filas tocadas."""
+    drawer_shelf = Drawer.objects.filter(pk=OuterRef("drawer_id")).values("shelf_id")[:1]
+    genre_classification = Gender.objects.filter(pk=OuterRef("genre_id")).values("classification_id")[:1]
+    return books.update(
+        effective_shelf=Coalesce(Subquery(drawer_shelf), F("shelf")),
+        effective_classification=Coalesce(Subquery(genre_classification), F("classification")),
+    )
+
+
+def drawer_moved(drawer):
+    """El cajón cambió de estante: sus libros pasan al estante nuevo."""
+    return Book.objects.filter(drawer=drawer).update(effective_shelf=drawer.shelf_id)
+
+
+def genre_moved(genre):
+    """El género cambió de clasificación: sus libros pasan a la clasificación nueva."""
+    return Book.objects.filter(genre=genre).update(effective_classification=genre.classification_id)
+
+
+def refresh_user(user_id):
+    """Recalcula todos los libros de un usuario (p. ej. tras eliminar un cajón o un género)."""
+    return refresh_books(Book.objects.filter(user_id=user_id))
@@ -0,0 +1,192 @@
+###########################################################################################
+#                                                                                        #
+#                                 SUBIDAS REANUDABLES                                    #
+#                                                                                        #
+#   Protocolo tipo tus (solo local) para subir PDFs e imágenes grandes por partes:       #
+#                                                                                        #
+#     1. POST   /subidas/            -> crea la subida (nombre, tamaño, tipo).           #
+#     2. PATCH  /subidas/<id>/       -> envía una parte desde `Upload-Offset`; la        #
+#                                       cabecera `X-Chunk-SHA256` se verifica antes de   #
+#                                       aceptarla.                                       #
+#     3. HEAD/GET /subidas/<id>/     -> offset actual (para reanudar tras un corte).     #
+#                                                                                        #
+#   Cada parte se escribe directamente en `MEDIA_ROOT/uploads/<id>.part`, sin pasar      #
+#   por memoria ni por archivos temporales de Django. Al recibir el último byte el       #
+#   archivo se mueve (rename) a su carpeta definitiva y el libro lo referencia por id.   #
+#                                                                                        #
+###########################################################################################
+
+import hashlib
+import os
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.text import get_valid_filename
+
+from .models import Book, Upload
+
+# Carpeta definitiva de cada tipo (la misma que `upload_to` del campo del libro)
+UPLOAD_TO = {
+    Upload.PDF: Book._meta.get_field("pdf_file").upload_to,
+    Upload.IMAGE: Book._meta.get_field("image").upload_to,
+}
+ALLOWED_EXTENSIONS = {
+    Upload.PDF: {".pdf"},
+    Upload.IMAGE: {".jpg", ".jpeg", ".png", ".gif", ".webp"},
+}
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Error de protocolo; `status` es el código HTTP a devolver."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def part_path(upload):
+    return Path(settings.MEDIA_ROOT) / "uploads" / f"{upload.pk}.part"
+
+
+# -------------------
+# Creación
+# -------------------
+
+def create_upload(user, filename, size, kind):
+    """Valida y registra una nueva subida (aún sin datos)."""
+    if kind not in UPLOAD_TO:
+        raise UploadError("Tipo de archivo no válido")
+    filename = get_valid_filename(os.path.basename(filename or ""))
+    if Path(filename).suffix.lower() not in ALLOWED_EXTENSIONS[kind]:
+        raise UploadError("Extensión de archivo no permitida")
+    if not isinstance(size, int) or size <= 0:
+        raise UploadError("Tamaño no válido")
+    if size > settings.UPLOAD_MAX_SIZE:
+        raise UploadError("El archivo supera el tamaño máximo permitido", status=413)
+
+    upload = Upload.objects.create(user=user, kind=kind, filename=filename, size=size)
+    path = part_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+# -------------------
+# Partes
+# -------------------
+
+def append_chunk(upload_id, user, offset, stream, length, checksum):
+    """
+    Escribe una parte de la subida leyendo `stream` por bloques.
+
+    - `offset` debe coincidir con lo ya recibido (409 si no: el cliente debe
+      consultar el offset y reanudar desde ahí).
+    - El SHA-256 de la parte se calcula al vuelo; si no coincide con
+      `checksum` la parte se descarta (460, como en tus).
+    - La fila se bloquea durante la escritura: dos envíos simultáneos de la
+      misma subida no pueden intercalarse.
+
+    Devuelve la subida actualizada (completada si llegó el último byte).
+    """
+    if length <= 0 or length > settings.UPLOAD_CHUNK_MAX_SIZE:
+        raise UploadError("Tamaño de parte no válido", status=413)
+
+    with transaction.atomic():
+        upload = Upload.objects.select_for_update().filter(pk=upload_id, user=user).first()
+        if upload is None:
+            raise UploadError("Subida no encontrada", status=404)
+        if upload.is_complete:
+            raise UploadError("La subida ya está completa", status=409)
+        if offset != upload.offset:
+            raise UploadError("Offset incorrecto", status=409)
+        if offset + length > upload.size:
+            raise UploadError("La parte excede el tamaño declarado", status=413)
+
+        digest = hashlib.sha256()
+        received = 0
+        path = part_path(upload)
+        with open(path, "r+b") as handle:
+            handle.seek(offset)
+            while received < length:
+                block = stream.read(min(READ_BLOCK_SIZE, length - received))
+                if not block:
+                    break
+                digest.update(block)
+                handle.write(block)
+                received += len(block)
+
+            if received != length or digest.hexdigest() != (checksum or "").lower():
+                # Parte incompleta o corrupta: se descarta lo escrito
+                handle.truncate(offset)
+                if received != length:
+                    raise UploadError("Parte incompleta")
+                raise UploadError("Checksum incorrecto", status=460)
+
+        upload.offset = offset + length
+        if upload.offset == upload.size:
+            finalize(upload)
+        upload.save()
+    return upload
+
+
+def finalize(upload):
+    """Mueve el archivo completo a su carpeta definitiva (mismo disco: un rename)."""
+    name = default_storage.get_available_name(UPLOAD_TO[upload.kind] + upload.filename)
+    target = Path(default_storage.path(name))
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(part_path(upload), target)
+    upload.file_name = name
+
+
+# -------------------
+# Uso desde los libros
+# -------------------
+
+def completed_file(user, upload_id, kind):
+    """
+    Nombre del archivo (relativo a MEDIA_ROOT) de una subida completada del usuario.
+
+    Se llama dentro de la transacción que guarda el libro: la fila queda bloqueada
+    (`select_for_update`) hasta que `consume()` la borra, así dos peticiones no
+    pueden quedarse con la misma subida. Lanza `UploadError` si el id no
+    corresponde a una subida completa del usuario.
+    """
+    try:
+        upload_id = uuid.UUID(str(upload_id))
+    except ValueError:
+        raise UploadError("Identificador de subida no válido")
+    upload = (
+        Upload.objects.select_for_update()
+        .filter(pk=upload_id, user=user, kind=kind)
+        .exclude(file_name="")
+        .first()
+    )
+    if upload is None:
+        raise UploadError("La subida no existe o no se completó; vuelve a adjuntar el archivo", status=404)
+    return upload.file_name
+
+
+def consume(user, upload_id):
+    """
+    Olvida la subida: el libro recién guardado pasa a ser el dueño del archivo.
+
+    Si no queda nada que borrar otro libro ya la reclamó y se lanza `UploadError`
+    para deshacer el guardado.
+    """
+    deleted, _ = Upload.objects.filter(pk=upload_id, user=user).delete()
+    if not deleted:
+        raise UploadError("La subida ya se usó en otro libro; vuelve a adjuntar el archivo", status=409)
+
+
+def abort(upload):
+    """Cancela una subida incompleta y borra lo recibido."""
+    try:
+        part_path(upload).unlink()
+    except FileNotFoundError:
+        pass
+    upload.delete()
@@ -5,6 +5,12 @@ urlpatterns = [
     # Encadenados
     path("ajax/load-drawers/", views.load_drawers, name="ajax_load_drawers"),
     path("ajax/load-genres/", views.load_genres, name="ajax_load_genres"),
+    path("ajax/babel-books/", views.babel_book_picker, name="ajax_babel_book_picker"),
+    path("ajax/check-duplicates/", views.check_duplicates, name="ajax_check_duplicates"),
+    path("ajax/book-metadata/", views.book_metadata, name="ajax_book_metadata"),
+    path("ajax/autocomplete/", views.autocomplete_search, name="ajax_autocomplete"),
+    path("subidas/", views.upload_create, name="upload_create"),
+    path("subidas/<uuid:upload_id>/", views.upload_detail, name="upload_detail"),
     # Create
     path('crear_estante/', views.create_shelf, name='create_shelf'),
     path('crear_cajon/', views.create_drawer, name='create_drawer'),
@@ -17,6 +23,7 @@ urlpatterns = [
 
     # Read
     path('libros/', views.read_books, name='read_books'),
+    path('libros/lote/', views.bulk_books, name='bulk_books'),
     path('autores/', views.read_authors, name='read_authors'),
     path('clasificaciones/', views.read_classifications, name='read_classifications'),
     path('generos/', views.read_genders, name='read_genders'),
@@ -24,11 +31,18 @@ urlpatterns = [
     path('cajones/', views.read_drawers, name='read_drawers'),
     path('save_last_page/', views.save_last_page, name='save_last_page'),
     path('book/<int:pk>/read/', views.read_pdf, name='read_pdf'),
+    path('book/<int:pk>/pdf/', views.stream_pdf, name='stream_pdf'),
+    path('portadas/<str:theme>/<int:width>x<int:height>/', views.default_cover, name='default_cover'),
     path('book/<int:pk>/read_physical/', views.read_physical, name='read_physical'),
     path("babels/", views.read_babels, name="read_babels"),
+    path('buscar_en_pdfs/', views.search_pdfs, name='search_pdfs'),
+    path('buscar_por_codigo/', views.lookup_identifier, name='lookup_identifier'),
+    path('book/<int:pk>/texto/', views.book_text, name='book_text'),
+    path('book/<int:pk>/buscar/', views.search_in_book, name='search_in_book'),
 
     # Update
     path('editar_libro/<int:pk>/', views.update_book, name='update_book'),
+    path('libro/<int:pk>/fusionar/<int:duplicate_pk>/', views.merge_book, name='merge_book'),
     path('editar_autor/<int:pk>/', views.update_author, name='update_author'),
     path('editar_clasificacion/<int:pk>/', views.update_classification, name='update_classification'),
     path('editar_genero/<int:pk>/', views.update_gender, name='update_gender'),
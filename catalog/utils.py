@@ -1,7 +1,25 @@
+from functools import lru_cache
 from io import BytesIO
 from django.core.files.base import ContentFile
 from PIL import Image, ImageDraw, ImageFont
 
+@lru_cache(maxsize=8)
+def load_cover_font(font_size):
+    """Carga la fuente de las portadas (con fallbacks); se reutiliza en cada portada."""
+    try:
+        # Intentar con fuentes comunes
+        return ImageFont.truetype("arial.ttf", font_size)
+    except IOError:
+        try:
+            return ImageFont.truetype("DejaVuSans.ttf", font_size)
+        except IOError:
+            try:
+                return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", font_size)
+            except IOError:
+                # Fallback a fuente básica
+                return ImageFont.load_default()
+
+
 def generate_default_book_image(title, width=400, height=600, bg_color="#1F2937", text_color="#FFD700"):
     """
     Genera una imagen de portada por defecto para un libro.
@@ -21,20 +39,8 @@ def generate_default_book_image(title, width=400, height=600, bg_color="#1F2937"
         image = Image.new("RGB", (width, height), color=bg_color)
         draw = ImageDraw.Draw(image)
 
-        # Intentar cargar fuentes (con fallbacks)
-        font_size = 30
-        try:
-            # Intentar con fuentes comunes
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except IOError:
-            try:
-                font = ImageFont.truetype("DejaVuSans.ttf", font_size)
-            except IOError:
-                try:
-                    font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", font_size)
-                except IOError:
-                    # Fallback a fuente básica
-                    font = ImageFont.load_default()
+        # Fuente (cargada una sola vez por proceso)
+        font = load_cover_font(30)
 
         # Dividir título en líneas que quepan en el ancho
         lines = []
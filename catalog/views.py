@@ -32,23 +32,38 @@
 # =========================================================================================
 
 # Django utils
-from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.urls import reverse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, Http404, QueryDict
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.utils.translation import gettext as _
+from django.db import transaction
 from django.db.models import Q
+from asgiref.sync import sync_to_async
 
 # Python utils
 from datetime import date
+import gzip
 import json
-from PyPDF2 import PdfReader
+import os
+import re
 
 # Project modules
+from babelius import metrics
 from .forms import *
 from .models import *
 from .utils import LANGUAGES_ES
+from .counters import counter_for, counters_for
+from . import autocomplete, bulk, covers, dedup, facets, fulltext, metadata, recommendations, uploads
+from .background import run_in_background
+from .conditional import library_conditions, owner_conditions
+from .identifiers import normalize_doi, normalize_isbn
+from .fragments import attach_card_html, BOOK_CARD_TEMPLATE, BABEL_BOOK_CARD_TEMPLATE
 
 # =========================================================================================
 #                                          CREATE
@@ -62,7 +77,7 @@ def create_babel(request):
 
     - Muestra formulario para creación.
     - Permite asociar libros existentes al babel.
-    - Aplica filtros de búsqueda, clasificación y género en los libros mostrados.
+    - El selector de libros filtra y pagina en el servidor (`babel_book_picker`).
     """
     if request.method == "POST":
         form = BabelForm(request.POST, user=request.user)
@@ -85,48 +100,15 @@ def create_babel(request):
     else:
         form = BabelForm(user=request.user)
 
-    # --- Filtros de búsqueda ---
-    search_query = request.GET.get("search", "")
-    selected_classification = request.GET.get("classification")
-    selected_genre = request.GET.get("genre")
-
-    books = Book.objects.filter(user=request.user)
-
-    # Búsqueda por título o autor
-    if search_query:
-        books = books.filter(
-            Q(title__icontains=search_query) |
-            Q(author__first_name__icontains=search_query) |
-            Q(author__last_name__icontains=search_query)
-        )
-
-    # Filtrar por clasificación
-    if selected_classification:
-        books = books.filter(classification_id=selected_classification)
-
-    # Filtrar por género
-    if selected_genre:
-        books = books.filter(genre_id=selected_genre)
-
-    books = books.order_by("title")
-
-    # Géneros disponibles (filtrados por clasificación si aplica)
-    user_genres = Gender.objects.filter(user=request.user)
-    if selected_classification:
-        user_genres = user_genres.filter(classification_id=selected_classification)
-
-    # IDs de libros seleccionados (vacío en creación)
-    selected_books_ids = []
-
+    # Los libros disponibles se cargan por páginas vía AJAX (ver babel_book_picker)
     return render(request, "create_update/create_babel.html", {
         "form": form,
-        "books": books,
-        "search_query": search_query,
-        "selected_classification_id": selected_classification,
-        "selected_genre_id": selected_genre,
+        "search_query": request.GET.get("search", ""),
+        "selected_classification_id": request.GET.get("classification", ""),
+        "selected_genre_id": request.GET.get("genre", ""),
         "user_classifications": Classification.objects.filter(user=request.user),
-        "user_genres": user_genres,
-        "selected_books_ids": selected_books_ids,
+        "user_genres": Gender.objects.filter(user=request.user),
+        "selected_books": [],
     })
 
 
@@ -145,7 +127,7 @@ def create_shelf(request):
 
         # Autoasignar nombre si corresponde
         if form.cleaned_data.get('auto_name') == 'True' or not shelf.name:
-            shelf.name = f"E{Shelf.objects.count() + 1}"
+            shelf.name = NameSequence.next_shelf_name(request.user)
 
         shelf.save()
         return redirect('read_shelfs')
@@ -161,8 +143,8 @@ def create_drawer(request):
     """
     Vista para crear un nuevo 'Cajón'.
 
-    - Se asigna automáticamente un nombre secuencial basado en la cantidad
-      de cajones en el estante seleccionado.
+    - Se asigna automáticamente un nombre secuencial por estante
+      (ver `NameSequence`).
     """
     form = DrawerForm(request.POST or None)
     if request.method == 'POST' and form.is_valid():
@@ -171,9 +153,8 @@ def create_drawer(request):
         selected_shelf = form.cleaned_data['shelf']
         drawer.shelf = selected_shelf
 
-        # Asignar nombre en base a la cantidad de cajones existentes en ese estante
-        count_in_shelf = Drawer.objects.filter(user=request.user, shelf=selected_shelf).count()
-        drawer.name = f"C{count_in_shelf + 1}"
+        # Asignar el siguiente nombre de la secuencia del estante
+        drawer.name = NameSequence.next_drawer_name(request.user, selected_shelf)
 
         drawer.save()
         return redirect('read_drawers')
@@ -265,7 +246,6 @@ def create_book(request):
     user_drawers = Drawer.objects.filter(user=request.user)
     user_classifications = Classification.objects.filter(user=request.user)
     user_genres = Gender.objects.filter(classification__user=request.user)
-    user_authors = Author.objects.filter(user=request.user)
 
     if request.method == "POST":
         print("=== INICIANDO CREACIÓN DE LIBROS ===")
@@ -288,6 +268,8 @@ def create_book(request):
                 "cover": request.POST.get(f"{idx}_cover") or None,
                 "pdf_file": request.FILES.get(f"{idx}_pdf_file") or None,
                 "image": request.FILES.get(f"{idx}_image") or None,
+                "pdf_upload": request.POST.get(f"{idx}_pdf_upload") or None,
+                "image_upload": request.POST.get(f"{idx}_image_upload") or None,
                 "language": request.POST.get(f"{idx}_language") or None,
                 "isbn": request.POST.get(f"{idx}_isbn") or None,
                 "page_count": request.POST.get(f"{idx}_pages") or 0,
@@ -301,52 +283,106 @@ def create_book(request):
             })
             idx += 1
 
-        # Procesar cada libro y guardarlo
+        # Validar todos los libros antes de guardar ninguno: si alguno tiene errores no se
+        # crea nada y el formulario los muestra (los datos siguen en el navegador)
+        errors = []
+        books = []
+        batch_keys = set()
+        batch_uploads = set()
         for i, data in enumerate(books_data):
+            # Datos del volcado bibliográfico local a partir del ISBN (sin red)
+            record = metadata.lookup(data["isbn"]) if data["isbn"] else None
+            if record:
+                data["title"] = data["title"] or record["title"]
+                data["editorial"] = data["editorial"] or record["editorial"]
+
+            label = f"Libro {i + 1}" + (f" «{data['title']}»" if data["title"] else "")
             if not data["title"] or not data["editorial"]:
-                continue  # saltar si faltan datos obligatorios
+                errors.append(f"{label}: el título y la editorial son obligatorios.")
+                continue
 
-            try:
-                book = Book(
-                    title=data["title"],
-                    subtitle=data["subtitle"],
-                    editorial=data["editorial"],
-                    shelf_id=data["shelf_id"],
-                    drawer_id=data["drawer_id"],
-                    author_id=data["author_id"],
-                    classification_id=data["classification_id"],
-                    genre_id=data["genre_id"],
-                    volume=int(data["volume"]) if data["volume"] and data["volume"].isdigit() else None,
-                    cover=data["cover"],
-                    user=request.user,
-                    language=data["language"],
-                    isbn=data["isbn"],
-                    page_count=int(data["page_count"]) if data["page_count"] and data["page_count"].isdigit() else 0,
-                    synopsis=data["synopsis"] or "",
-                    doi=data["doi"],
-                    series=data["series"],
-                    translator=data["translator"],
-                    editor=data["editor_compiler"],
-                    url=data["url"],
-                )
+            # ISBN y DOI: válidos, no usados por otro libro ni repetidos en este envío
+            book_errors = dedup.identifier_errors(request.user, data["isbn"], data["doi"])
+            keys = {("ISBN", normalize_isbn(data["isbn"])), ("DOI", normalize_doi(data["doi"]))}
+            for kind, key in keys:
+                if key and (kind, key) in batch_keys:
+                    book_errors.append(f"{kind} repetido en otro libro del formulario.")
+                batch_keys.add((kind, key))
+            if book_errors:
+                errors.extend(f"{label}: {error}" for error in book_errors)
+                continue
+
+            book = Book(
+                title=data["title"],
+                subtitle=data["subtitle"],
+                editorial=data["editorial"],
+                shelf_id=data["shelf_id"],
+                drawer_id=data["drawer_id"],
+                author_id=data["author_id"],
+                classification_id=data["classification_id"],
+                genre_id=data["genre_id"],
+                volume=int(data["volume"]) if data["volume"] and data["volume"].isdigit() else None,
+                cover=data["cover"],
+                user=request.user,
+                language=data["language"],
+                isbn=(data["isbn"] or "").strip() or None,
+                page_count=int(data["page_count"]) if data["page_count"] and data["page_count"].isdigit() else 0,
+                synopsis=data["synopsis"] or "",
+                doi=(data["doi"] or "").strip() or None,
+                series=data["series"],
+                translator=data["translator"],
+                editor=data["editor_compiler"],
+                url=data["url"],
+            )
 
-                # Año de publicación
-                if data["publication_year"] and data["publication_year"].isdigit():
-                    try:
-                        book.publication_date = date(int(data["publication_year"]), 1, 1)
-                    except ValueError as e:
-                        print(f"Error en fecha publicación libro {i}: {e}")
+            # Año de publicación
+            if data["publication_year"] and data["publication_year"].isdigit():
+                try:
+                    book.publication_date = date(int(data["publication_year"]), 1, 1)
+                except ValueError as e:
+                    print(f"Error en fecha publicación libro {i}: {e}")
+
+            # Archivos (PDF e imagen): subida directa o subida por partes ya completada
+            # (la subida se reclama y se consume al guardar el libro)
+            pending_uploads = []
+            if data["pdf_file"]:
+                book.pdf_file = data["pdf_file"]
+            elif data["pdf_upload"]:
+                pending_uploads.append(("pdf_file", data["pdf_upload"].strip(), Upload.PDF))
+            if data["image"]:
+                book.image = data["image"]
+            elif data["image_upload"]:
+                pending_uploads.append(("image", data["image_upload"].strip(), Upload.IMAGE))
+
+            # Una subida solo puede acabar en un libro
+            upload_ids = {upload_id for _, upload_id, _ in pending_uploads}
+            if len(upload_ids) < len(pending_uploads) or upload_ids & batch_uploads:
+                errors.append(f"{label}: el archivo subido ya se usa en otro libro del formulario.")
+                continue
+            batch_uploads |= upload_ids
 
-                # Archivos (PDF e imagen)
-                if data["pdf_file"]:
-                    book.pdf_file = data["pdf_file"]
-                if data["image"]:
-                    book.image = data["image"]
+            # Completar lo que no se capturó (lugar, páginas, idioma...)
+            if record:
+                metadata.enrich_book(book, record)
+            books.append((label, book, pending_uploads))
 
-                book.save()
+        if not errors:
+            try:
+                with transaction.atomic():
+                    for label, book, pending_uploads in books:
+                        for field, upload_id, kind in pending_uploads:
+                            getattr(book, field).name = uploads.completed_file(request.user, upload_id, kind)
+                        book.save()
+                        for _, upload_id, _ in pending_uploads:
+                            uploads.consume(request.user, upload_id)
+            except uploads.UploadError as e:
+                errors.append(f"{label}: {e}")
             except Exception as e:
-                print(f"Error guardando libro {i}: {e}")
-                continue
+                print(f"Error guardando libros: {e}")
+                errors.append(f"No se pudieron guardar los libros: {e}")
+
+        if errors:
+            return JsonResponse({"errors": errors}, status=400)
 
         print("=== FINALIZADA CREACIÓN DE LIBROS ===")
         return redirect("read_books")
@@ -358,7 +394,6 @@ def create_book(request):
         "user_drawers": user_drawers,
         "user_classifications": user_classifications,
         "user_genres": user_genres,
-        "user_authors": user_authors,
         "COVERS": Book.COVERS,
         "languages": languages,
     })
@@ -369,12 +404,17 @@ def create_book(request):
 # =========================================================================================
 
 @login_required
+@condition(**library_conditions())
 def read_babels(request):
     """
     Vista para listar los 'Babels' del usuario autenticado.
     """
     babels = Babel.objects.filter(user=request.user)
-    objects = [{"instance": b} for b in babels]
+    counts = counters_for(request.user, LibraryCounter.BABEL)
+    objects = [
+        {"instance": b, "book_count": counts[b.pk].book_count if b.pk in counts else 0}
+        for b in babels
+    ]
 
     context = {
         "title": "Mis Babels",
@@ -389,11 +429,16 @@ def read_babels(request):
 
 
 @login_required
+@condition(**library_conditions())
 def read_shelfs(request):
     """
     Vista para listar los 'Estantes' del usuario.
     """
-    objects = [{"instance": shelf} for shelf in Shelf.objects.filter(user=request.user)]
+    counts = counters_for(request.user, LibraryCounter.SHELF)
+    objects = [
+        {"instance": shelf, "book_count": counts[shelf.pk].book_count if shelf.pk in counts else 0}
+        for shelf in Shelf.objects.filter(user=request.user)
+    ]
     context = {
         "objects": objects,
         "title": "Estantes",
@@ -407,11 +452,16 @@ def read_shelfs(request):
 
 
 @login_required
+@condition(**library_conditions())
 def read_drawers(request):
     """
     Vista para listar los 'Cajones' del usuario.
     """
-    objects = [{"instance": drawer} for drawer in Drawer.objects.filter(user=request.user)]
+    counts = counters_for(request.user, LibraryCounter.DRAWER)
+    objects = [
+        {"instance": drawer, "book_count": counts[drawer.pk].book_count if drawer.pk in counts else 0}
+        for drawer in Drawer.objects.filter(user=request.user)
+    ]
     context = {
         "objects": objects,
         "title": "Cajones",
@@ -425,11 +475,16 @@ def read_drawers(request):
 
 
 @login_required
+@condition(**library_conditions())
 def read_classifications(request):
     """
     Vista para listar las 'Clasificaciones' del usuario.
     """
-    objects = [{"instance": c} for c in Classification.objects.filter(user=request.user)]
+    counts = counters_for(request.user, LibraryCounter.CLASSIFICATION)
+    objects = [
+        {"instance": c, "book_count": counts[c.pk].book_count if c.pk in counts else 0}
+        for c in Classification.objects.filter(user=request.user)
+    ]
     context = {
         "objects": objects,
         "title": "Clasificaciones",
@@ -443,11 +498,16 @@ def read_classifications(request):
 
 
 @login_required
+@condition(**library_conditions())
 def read_genders(request):
     """
     Vista para listar los 'Géneros' del usuario.
     """
-    objects = [{"instance": g} for g in Gender.objects.filter(user=request.user)]
+    counts = counters_for(request.user, LibraryCounter.GENRE)
+    objects = [
+        {"instance": g, "book_count": counts[g.pk].book_count if g.pk in counts else 0}
+        for g in Gender.objects.filter(user=request.user)
+    ]
     context = {
         "objects": objects,
         "title": "Géneros",
@@ -461,12 +521,17 @@ def read_genders(request):
 
 
 @login_required
+@condition(**library_conditions())
 def read_authors(request):
     """
     Vista para listar los 'Autores' del usuario.
     """
     user_authors = Author.objects.filter(user=request.user)
-    objects = [{"instance": author} for author in user_authors]
+    counts = counters_for(request.user, LibraryCounter.AUTHOR)
+    objects = [
+        {"instance": author, "book_count": counts[author.pk].book_count if author.pk in counts else 0}
+        for author in user_authors
+    ]
 
     context = {
         'title': "Autores",
@@ -480,106 +545,72 @@ def read_authors(request):
     return render(request, "read/read_authors.html", context)
 
 
+def _filtered_books(user, params):
+    """
+    Libros del usuario según la búsqueda y las facetas de `params` (GET del listado).
+
+    Devuelve (filtros, búsqueda, consulta base, consulta filtrada); la base solo
+    aplica la búsqueda y es sobre la que se calculan las facetas.
+    """
+    filters = facets.parse_filters(params)
+    search_query = params.get('search', '')
+
+    base_books = Book.objects.filter(user=user)
+    if search_query:
+        base_books = base_books.filter(
+            Q(title__icontains=search_query) |
+            Q(subtitle__icontains=search_query) |
+            Q(author__first_name__icontains=search_query) |
+            Q(author__last_name__icontains=search_query)
+        )
+
+    # Aplicar filtros (el estado de lectura es una anotación)
+    books = base_books
+    if "status" in filters:
+        books = facets.with_reading_status(books, user)
+    return filters, search_query, base_books, facets.apply_filters(books, filters)
+
+
 @login_required
+@condition(**library_conditions())
 def read_books(request):
     """
     Vista para listar los 'Libros' del usuario con filtros:
 
-    - Filtro por clasificación.
-    - Filtro por género.
+    - Facetas: clasificación, género, idioma, portada, autor, estante y estado
+      de lectura, cada una con el número de libros de cada opción.
     - Búsqueda por título, subtítulo o autor.
     - Cálculo de progreso de lectura y generación de referencia en formato APA.
     """
     # --- Filtros de la URL ---
-    selected_classification_id = request.GET.get('classification', '')
-    selected_genre_id = request.GET.get('genre', '')
-    search_query = request.GET.get('search', '')
-
-    # --- Consulta base ---
-    user_books_queryset = Book.objects.filter(user=request.user).select_related(
+    filters, search_query, base_books, user_books_queryset = _filtered_books(request.user, request.GET)
+    user_books_queryset = user_books_queryset.select_related(
         'author', 'genre__classification', 'drawer__shelf', 'shelf'
     )
 
-    # Aplicar filtros
-    if selected_classification_id:
-        user_books_queryset = user_books_queryset.filter(
-            Q(classification_id=selected_classification_id) | 
-            Q(genre__classification_id=selected_classification_id)
-        )
-    
-    if selected_genre_id:
-        user_books_queryset = user_books_queryset.filter(genre_id=selected_genre_id)
-
-    if search_query:
-        user_books_queryset = user_books_queryset.filter(
-            Q(title__icontains=search_query) |
-            Q(subtitle__icontains=search_query) |
-            Q(author__first_name__icontains=search_query) |
-            Q(author__last_name__icontains=search_query)
-        )
-
     # --- Preparar datos para la plantilla ---
+    # Progreso de lectura de todos los libros en una sola consulta
+    progress_by_book = dict(
+        ReadingProgress.objects.filter(user=request.user).values_list("book_id", "last_page")
+    )
+
     objects = []
     for book in user_books_queryset:
-        # Progreso de lectura
-        progress = ReadingProgress.objects.filter(user=request.user, book=book).first()
-        last_page = progress.last_page if progress else 0
+        last_page = progress_by_book.get(book.pk, 0)
         progress_percent = int((last_page / book.page_count) * 100) if book.page_count else 0
         progress_percent = min(progress_percent, 100)
 
-        # Construcción de referencia APA
-        apa_author = (
-            f"{book.author.last_name.split(' ')[0].capitalize()}, {book.author.first_name[0].upper()}."
-            if book.author else "Autor desconocido"
-        )
-        apa_year = book.publication_date.year if book.publication_date else "¿?"
-        apa_title = book.title if book.title else "Título desconocido"
-        apa_subtitle = f": {book.subtitle}" if book.subtitle else ""
-        apa_editorial = book.editorial or ""
-        apa_volume = f"(Vol. {book.volume})" if book.volume else ""
-        apa_edition = f"({book.edition} ed.)" if book.edition else ""
-        apa_place = book.place_of_publication or ""
-        apa_series = f"{book.series}" if getattr(book, "series", None) else ""
-        apa_translator = f"(Trad. {book.translator})" if getattr(book, "translator", None) else ""
-        apa_editor = f"(Ed. {book.editor})" if getattr(book, "editor", None) else ""
-        apa_pages = f"{book.page_count} pp." if book.page_count else ""
-        apa_doi = f"https://doi.org/{book.doi}" if book.doi else ""
-        apa_url = book.url if getattr(book, "url", None) else ""
-
-        extra_info = ", ".join(filter(None, [
-            apa_volume, apa_edition, apa_place, apa_series, apa_translator, apa_editor, apa_pages
-        ]))
-        extra_info = f" ({extra_info})" if extra_info else ""
-
-        apa_citation = f"{apa_author} ({apa_year}). {apa_title}{apa_subtitle}. {apa_editorial}{extra_info}."
-        if apa_doi:
-            apa_citation += f" {apa_doi}"
-        elif apa_url:
-            apa_citation += f" {apa_url}"
-
         objects.append({
             'instance': book,
             'progress_percent': progress_percent,
             'last_page': last_page,
-            'apa_citation': apa_citation,
         })
 
-    # Opciones para los filtros dinámicos
-    user_classifications = Classification.objects.filter(user=request.user).order_by('name')
-    if selected_classification_id:
-        user_genres = Gender.objects.filter(
-            user=request.user,
-            classification_id=selected_classification_id
-        ).order_by('name')
-
-        # fallback en caso de que no existan géneros vinculados
-        if not user_genres.exists():
-            user_genres = Gender.objects.filter(
-                user=request.user,
-                classification__id=selected_classification_id
-            ).order_by('name')
-    else:
-        user_genres = Gender.objects.none()
+    # Tarjetas desde la caché de fragmentos (solo se renderizan las que faltan)
+    attach_card_html(objects, BOOK_CARD_TEMPLATE)
+
+    # Opciones de los filtros con sus conteos (una consulta agrupada, en caché)
+    facet_list = facets.facet_counts(request.user, base_books, filters, {"search": search_query})
 
     context = {
         'title': "Libros",
@@ -589,42 +620,174 @@ def read_books(request):
         'edit_url_name': 'update_book',
         'delete_url_name': 'delete_book',
         'create_url_name': 'create_book',
-        'user_classifications': user_classifications,
-        'user_genres': user_genres,
-        'selected_classification_id': selected_classification_id,
-        'selected_genre_id': selected_genre_id,
+        'facets': facet_list,
         'search_query': search_query,
+        'filter_query': request.GET.urlencode(),
+        'bulk_actions': bulk.ACTION_LABELS,
+        'bulk_targets': {
+            bulk.MOVE_SHELF: Shelf.objects.filter(user=request.user).order_by('name'),
+            bulk.MOVE_DRAWER: Drawer.objects.filter(user=request.user).select_related('shelf').order_by('shelf__name', 'name'),
+            bulk.SET_CLASSIFICATION: Classification.objects.filter(user=request.user).order_by('name'),
+            bulk.SET_GENRE: Gender.objects.filter(user=request.user).order_by('name'),
+            bulk.ADD_TO_BABEL: Babel.objects.filter(user=request.user).order_by('name'),
+        },
     }
     return render(request, 'read/read_books.html', context)
 
 
+@login_required
+def bulk_books(request):
+    """
+    Aplica una acción en lote a varios 'Libros' (ver catalog/bulk.py).
+
+    - `books`: ids marcados en el listado, o `alcance=filtro` para todo el
+      resultado de los filtros actuales (`filtros`, la query string del listado).
+    - `accion` y `destino`: mover a estante o cajón, asignar clasificación o
+      género, añadir a un Babel o eliminar.
+    """
+    if request.method != "POST":
+        return redirect("read_books")
+
+    filter_query = request.POST.get("filtros", "")
+    if request.POST.get("alcance") == "filtro":
+        _, _, _, books = _filtered_books(request.user, QueryDict(filter_query))
+    else:
+        ids = [int(pk) for pk in request.POST.getlist("books") if pk.isdigit()]
+        books = Book.objects.filter(pk__in=ids)
+
+    action = request.POST.get("accion", "")
+    try:
+        target = bulk.resolve_target(request.user, action, request.POST.get("destino", ""))
+        affected = bulk.apply(request.user, books, action, target)
+    except bulk.BulkActionError as e:
+        print("Error en acción en lote:", e)
+        messages.error(request, f"No se aplicó la acción en lote: {e}.")
+    else:
+        if affected:
+            label = bulk.ACTION_LABELS[action] + (f" «{target}»" if target else "")
+            messages.success(request, f"{label}: {affected} libro(s).")
+        else:
+            messages.warning(request, "No había libros seleccionados: no se cambió nada.")
+
+    return redirect(f"{reverse('read_books')}?{filter_query}" if filter_query else "read_books")
+
+
 @login_required
 def read_pdf(request, pk):
     """
     Vista para leer un 'Libro' en formato PDF.
 
     - Obtiene o crea el progreso de lectura.
-    - Si el PDF no tiene page_count registrado, lo calcula con PyPDF2.
+    - Si el PDF no tiene page_count registrado, encola su cálculo.
+    - `?page=N` abre directamente en una página (resultados de búsqueda).
     """
     book = get_object_or_404(Book, pk=pk)
     progress, _ = ReadingProgress.objects.get_or_create(user=request.user, book=book)
 
-    # Calcular número de páginas si no está seteado
-    if book.pdf_file and book.page_count == 0:
-        try:
-            reader = PdfReader(book.pdf_file.path)
-            book.page_count = len(reader.pages)
-            book.save(update_fields=['page_count'])
-        except Exception as e:
-            print("Error leyendo PDF:", e)
+    # Calcular número de páginas si no está seteado (en segundo plano: el visor
+    # de PDF ya conoce el total al cargar el documento)
+    if book.pdf_file and not book.page_count:
+        run_in_background(fulltext.count_pages, book.pk)
 
+    requested_page = request.GET.get("page", "")
     context = {
         "book": book,
-        "last_page": progress.last_page,
+        "last_page": int(requested_page) if requested_page.isdigit() else progress.last_page,
     }
     return render(request, "read/read_pdf.html", context)
 
 
+PDF_CHUNK_SIZE = 256 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _iter_file_range(path, offset, length, chunk_size=PDF_CHUNK_SIZE):
+    """
+    Itera un rango de bytes de un archivo (servidor WSGI).
+
+    Cada trozo se cuenta en las métricas cuando el servidor pide el siguiente,
+    es decir, cuando ya lo envió.
+    """
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+            metrics.PDF_BYTES_SENT.inc(len(chunk))
+
+
+async def _aiter_file_range(path, offset, length, chunk_size=PDF_CHUNK_SIZE):
+    """
+    Itera un rango de bytes de un archivo sin bloquear el event loop
+    (servidor ASGI; cada lectura se hace en un hilo aparte).
+    """
+    handle = await sync_to_async(open, thread_sensitive=False)(path, "rb")
+    try:
+        await sync_to_async(handle.seek, thread_sensitive=False)(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = await sync_to_async(handle.read, thread_sensitive=False)(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+            metrics.PDF_BYTES_SENT.inc(len(chunk))
+    finally:
+        await sync_to_async(handle.close, thread_sensitive=False)()
+
+
+@login_required
+async def stream_pdf(request, pk):
+    """
+    Sirve el PDF de un 'Libro' por trozos de forma asíncrona.
+
+    - Soporta peticiones Range, así pdf.js descarga solo lo que va mostrando.
+    - Bajo ASGI la lectura del archivo no bloquea el worker ante clientes lentos;
+      bajo WSGI se sirve por trozos con un iterador síncrono.
+    """
+    book = await aget_object_or_404(Book, pk=pk, user=await request.auser())
+    if not book.pdf_file:
+        raise Http404("El libro no tiene PDF")
+
+    path = book.pdf_file.path
+    try:
+        size = await sync_to_async(os.path.getsize, thread_sensitive=False)(path)
+    except OSError:
+        raise Http404("Archivo PDF no encontrado")
+
+    start, end, status = 0, size - 1, 200
+    match = RANGE_RE.match(request.headers.get("Range", "").strip())
+    if match and any(match.groups()):
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)  # rango sufijo: últimos N bytes
+        if start > end:
+            return HttpResponse(status=416, headers={"Content-Range": f"bytes */{size}"})
+        status = 206
+
+    # Bajo WSGI Django consume entero un iterador asíncrono antes de enviar nada
+    # (todo el PDF en memoria): ahí se usa el iterador síncrono
+    length = end - start + 1
+    iter_range = _aiter_file_range if isinstance(request, ASGIRequest) else _iter_file_range
+    response = StreamingHttpResponse(
+        iter_range(path, start, length),
+        status=status,
+        content_type="application/pdf",
+    )
+    response["Content-Length"] = str(length)
+    response["Accept-Ranges"] = "bytes"
+    if status == 206:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
 @login_required
 def read_physical(request, pk):
     """
@@ -674,6 +837,29 @@ def read_physical(request, pk):
     return render(request, "read/read_physical.html", context)
 
 
+@login_required
+def default_cover(request, theme, width, height):
+    """
+    Portada por defecto de un libro sin imagen, dibujada a partir del título.
+
+    - La URL determina la imagen (ver catalog/covers.py): se cachea como inmutable.
+    - Se sirve desde la caché LRU en disco; solo se dibuja en el primer acceso.
+    """
+    try:
+        key, data = covers.render_cover(request.GET.get("titulo", ""), width, height, theme)
+    except ValueError:
+        raise Http404("Portada no disponible")
+
+    etag = f'"cover-{key}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(data, content_type="image/png")
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
+
+
 # =========================================================================================
 #                                         UPDATE
 # =========================================================================================
@@ -708,16 +894,12 @@ def update_babel(request, pk):
     else:
         form = BabelForm(instance=babel, user=request.user)
 
-    selected_books = babel.books.all()
-    user_genres = Gender.objects.filter(user=request.user)
-
     return render(request, "create_update/create_babel.html", {
         "form": form,
         "babel": babel,
-        "books": Book.objects.filter(user=request.user).order_by("title"),
         "user_classifications": Classification.objects.filter(user=request.user),
-        "user_genres": user_genres,
-        "selected_books": selected_books,
+        "user_genres": Gender.objects.filter(user=request.user),
+        "selected_books": babel.books.select_related("author").order_by("title"),
         "search_query": "",
         "selected_classification_id": "",
         "selected_genre_id": "",
@@ -763,7 +945,22 @@ def update_book(request, pk):
             # Otros campos
             book.cover = request.POST.get("cover", book.cover)
             book.language = request.POST.get("language", book.language)
-            book.isbn = request.POST.get("isbn", book.isbn)
+            isbn = request.POST.get("isbn", book.isbn or "")
+            doi = request.POST.get("doi", book.doi or "")
+
+            # ISBN y DOI: válidos y no usados por otro libro (son únicos por usuario). Solo se
+            # validan si cambian: un identificador heredado no válido o repetido no debe
+            # impedir editar el resto del libro
+            errors = dedup.identifier_errors(
+                request.user,
+                isbn if isbn.strip() != (book.isbn or "").strip() else "",
+                doi if doi.strip() != (book.doi or "").strip() else "",
+                exclude_pk=book.pk,
+            )
+            if errors:
+                return JsonResponse({"errors": errors}, status=400)
+            book.isbn = isbn.strip() or None
+            book.doi = doi.strip() or None
 
             # Páginas
             pages_str = request.POST.get("pages", "")
@@ -786,17 +983,32 @@ def update_book(request, pk):
                 except ValueError:
                     pass  # ignorar errores en año inválido
 
-            # Archivos
+            # Archivos: subida directa o subida por partes ya completada
+            # (la subida se reclama y se consume al guardar el libro)
+            pending_uploads = []
             if request.FILES.get("pdf_file"):
                 book.pdf_file = request.FILES["pdf_file"]
+            elif request.POST.get("pdf_upload"):
+                pending_uploads.append(("pdf_file", request.POST["pdf_upload"].strip(), Upload.PDF))
             if request.FILES.get("image"):
                 book.image = request.FILES["image"]
+            elif request.POST.get("image_upload"):
+                pending_uploads.append(("image", request.POST["image_upload"].strip(), Upload.IMAGE))
 
-            book.save()
+            try:
+                with transaction.atomic():
+                    for field, upload_id, kind in pending_uploads:
+                        getattr(book, field).name = uploads.completed_file(request.user, upload_id, kind)
+                    book.save()
+                    for _, upload_id, _ in pending_uploads:
+                        uploads.consume(request.user, upload_id)
+            except uploads.UploadError as e:
+                return JsonResponse({"errors": [str(e)]}, status=400)
             return redirect("read_books")
 
         except Exception as e:
             print(f"Error actualizando libro: {e}")
+            return JsonResponse({"errors": [f"No se pudo guardar el libro: {e}"]}, status=400)
 
     languages = LANGUAGES_ES
     return render(request, "create_update/create_book_form.html", {
@@ -805,7 +1017,6 @@ def update_book(request, pk):
         "user_drawers": Drawer.objects.filter(user=request.user),
         "user_classifications": Classification.objects.filter(user=request.user),
         "user_genres": Gender.objects.filter(user=request.user),
-        "user_authors": Author.objects.filter(user=request.user),
         "COVERS": Book.COVERS,
         "languages": languages,
     })
@@ -903,6 +1114,25 @@ def update_shelf(request, pk):
     })
 
 
+@login_required
+def merge_book(request, pk, duplicate_pk):
+    """
+    Fusiona el 'Libro' duplicado (`duplicate_pk`) en el libro `pk`.
+
+    - Solo por POST y entre libros del usuario.
+    - Mueve progreso de lectura y Babels al libro conservado (ver catalog/dedup.py).
+    """
+    keep = get_object_or_404(Book, pk=pk, user=request.user)
+    duplicate = get_object_or_404(Book, pk=duplicate_pk, user=request.user)
+
+    if request.method == "POST" and keep.pk != duplicate.pk:
+        try:
+            dedup.merge_books(keep, duplicate)
+        except Exception as e:
+            print(f"Error fusionando libro {duplicate.pk} en {keep.pk}: {e}")
+    return redirect("detail_book", pk=keep.pk)
+
+
 # =========================================================================================
 #                                         DELETE
 # =========================================================================================
@@ -982,6 +1212,7 @@ def delete_drawer(request, pk):
 # =========================================================================================
 
 @login_required
+@condition(**owner_conditions(Babel))
 def detail_babel(request, pk):
     """
     Vista de detalle de un 'Babel'.
@@ -990,8 +1221,8 @@ def detail_babel(request, pk):
     - Incluye enlaces a detalle, edición y eliminación de los libros.
     """
     babel = get_object_or_404(Babel, pk=pk, user=request.user)
-    books = babel.books.all()
-    objects = [{"instance": b} for b in books]
+    books = babel.books.select_related("author", "drawer__shelf", "shelf")
+    objects = attach_card_html([{"instance": b} for b in books], BABEL_BOOK_CARD_TEMPLATE)
 
     context = {
         "title": f"Babel {babel.name}",
@@ -1007,28 +1238,31 @@ def detail_babel(request, pk):
 
 
 @login_required
+@condition(**owner_conditions(Shelf))
 def detail_shelf(request, pk):
     """
     Vista de detalle de un 'Estante'.
 
     - Muestra nombre del estante.
-    - Lista los libros asociados a través de los cajones.
+    - Lista los libros del estante (directos o a través de sus cajones).
     """
     shelf = get_object_or_404(Shelf, pk=pk)
     fields = [
         ('Nombre', shelf.name, 'name'),
     ]
-    related_books = Book.objects.filter(drawer__shelf=shelf)
+    related_books = Book.objects.filter(effective_shelf=shelf)
 
-    return render(request, 'read/detail.html', {
+    return render(request, 'read/detail_shelf.html', {
         'title': shelf.name,
         'fields': fields,
+        'drawers': shelf.drawer_set.all(),
         'related_books': related_books,
         'list_url_name': 'read_shelfs',
     })
 
 
 @login_required
+@condition(**owner_conditions(Drawer))
 def detail_drawer(request, pk):
     """
     Vista de detalle de un 'Cajón'.
@@ -1052,18 +1286,19 @@ def detail_drawer(request, pk):
 
 
 @login_required
+@condition(**owner_conditions(Classification))
 def detail_classification(request, pk):
     """
     Vista de detalle de una 'Clasificación'.
 
     - Muestra nombre de la clasificación.
     - Lista géneros relacionados.
-    - Lista libros vinculados a esos géneros.
+    - Lista libros de la clasificación (directos o a través de sus géneros).
     """
     classification = get_object_or_404(Classification, pk=pk)
     fields = [('Nombre', classification.name, 'name')]
     related_genders = classification.gender_set.all()
-    related_books = Book.objects.filter(genre__classification=classification)
+    related_books = Book.objects.filter(effective_classification=classification)
 
     return render(request, 'read/detail_classification.html', {
         'title': classification.name,
@@ -1075,6 +1310,7 @@ def detail_classification(request, pk):
 
 
 @login_required
+@condition(**owner_conditions(Gender))
 def detail_gender(request, pk):
     """
     Vista de detalle de un 'Género'.
@@ -1101,6 +1337,7 @@ def detail_gender(request, pk):
 
 
 @login_required
+@condition(**owner_conditions(Author))
 def detail_author(request, pk):
     """
     Vista de detalle de un 'Autor'.
@@ -1126,7 +1363,7 @@ def detail_author(request, pk):
         ("Nacimiento - Fallecimiento", life, "life"),
         ("Biografía", author.biography, "biography"),
         ("Semblanza", author.semblance, "semblance"),
-        ("Cantidad de libros", author.book_set.count(), "books_count"),
+        ("Cantidad de libros", counter_for(author.user, LibraryCounter.AUTHOR, author.pk).book_count, "books_count"),
     ]
 
     return render(request, "read/detail_author.html", {
@@ -1138,12 +1375,14 @@ def detail_author(request, pk):
 
 
 @login_required
+@condition(**owner_conditions(Book))
 def detail_book(request, pk):
     """
     Vista de detalle de un 'Libro'.
 
     - Muestra todos los campos del libro.
     - Construye una cita en formato APA.
+    - Lista libros similares (precalculados por `manage.py compute_similar_books`).
     """
     book = get_object_or_404(Book, pk=pk)
 
@@ -1207,11 +1446,21 @@ def detail_book(request, pk):
     elif apa_url:
         apa_citation += f" {apa_url}"
 
+    # Posibles duplicados (solo para el dueño, que es quien puede fusionarlos)
+    duplicates = []
+    if book.user_id == request.user.pk:
+        duplicates = dedup.find_duplicates(
+            request.user, book.isbn_key, book.doi_key, book.title_key, exclude_pk=book.pk
+        )
+
     return render(request, 'read/detail_book.html', {
         'title': book.title,
+        'book': book,
         'fields': fields,
         'list_url_name': 'read_books',
         'apa_citation': apa_citation,
+        'duplicates': duplicates,
+        'similar_books': recommendations.similar_books(book),
     })
 
 # =========================================================================================
@@ -1221,26 +1470,87 @@ def detail_book(request, pk):
 # -------------------
 # AJAX encadenados
 # -------------------
+#
+# Los endpoints AJAX son asíncronos: bajo ASGI (gunicorn + uvicorn worker, ver
+# gunicorn.conf.py) no ocupan un worker mientras esperan a la base de datos o
+# a un cliente lento. Bajo WSGI Django los sigue ejecutando sin cambios.
 
 @login_required
-def load_drawers(request):
+async def load_drawers(request):
     """
     Devuelve los cajones pertenecientes a un estante específico (para selects encadenados).
     """
+    user = await request.auser()
     shelf_id = request.GET.get("shelf_id")
-    drawers = Drawer.objects.filter(shelf_id=shelf_id, user=request.user).values("id", "name")
-    return JsonResponse(list(drawers), safe=False)
+    drawers = Drawer.objects.filter(shelf_id=shelf_id, user=user).values("id", "name")
+    return JsonResponse([d async for d in drawers], safe=False)
 
 
 @login_required
-def load_genres(request):
+async def load_genres(request):
     """
     Devuelve los géneros pertenecientes a una clasificación específica (para selects encadenados).
     """
+    user = await request.auser()
     classification_id = request.GET.get("classification_id")
-    genres = Gender.objects.filter(classification_id=classification_id, user=request.user).values("id", "name")
-    return JsonResponse(list(genres), safe=False)
+    genres = Gender.objects.filter(classification_id=classification_id, user=user).values("id", "name")
+    return JsonResponse([g async for g in genres], safe=False)
+
+
+
+BABEL_PICKER_PAGE_SIZE = 50
+BABEL_PICKER_FIELDS = ("id", "title", "author__last_name", "genre_id", "classification_id")
+
+
+@login_required
+async def babel_book_picker(request):
+    """
+    Página de libros para el selector de Babels (scroll infinito).
+
+    - Filtra en el servidor por búsqueda, clasificación y género.
+    - Pagina por clave (title, id) en lugar de OFFSET: cada página es un
+      recorrido corto del índice (user, title, id).
+    - `exclude` lista ids ya seleccionados que no deben devolverse.
+    """
+    user = await request.auser()
+    search_query = request.GET.get("search", "").strip()
+    classification_id = request.GET.get("classification", "")
+    genre_id = request.GET.get("genre", "")
+    after_title = request.GET.get("after_title")
+    after_id = request.GET.get("after_id", "")
+    try:
+        limit = max(1, min(int(request.GET.get("limit", BABEL_PICKER_PAGE_SIZE)), 200))
+    except ValueError:
+        limit = BABEL_PICKER_PAGE_SIZE
+
+    books = Book.objects.filter(user=user)
+    if search_query:
+        books = books.filter(
+            Q(title__icontains=search_query) |
+            Q(author__first_name__icontains=search_query) |
+            Q(author__last_name__icontains=search_query)
+        )
+    if classification_id.isdigit():
+        books = books.filter(effective_classification_id=classification_id)
+    if genre_id.isdigit():
+        books = books.filter(genre_id=genre_id)
+
+    exclude_ids = [int(pk) for pk in request.GET.get("exclude", "").split(",") if pk.isdigit()]
+    if exclude_ids:
+        books = books.exclude(id__in=exclude_ids)
+
+    if after_title is not None and after_id.isdigit():
+        books = books.filter(Q(title__gt=after_title) | Q(title=after_title, id__gt=int(after_id)))
+
+    page = [
+        book async for book in books.order_by("title", "id").values(*BABEL_PICKER_FIELDS)[:limit + 1]
+    ]
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = {"after_title": page[-1]["title"], "after_id": page[-1]["id"]}
 
+    return JsonResponse({"books": page, "next": next_cursor})
 
 # -------------------
 # AJAX modales
@@ -1248,18 +1558,19 @@ def load_genres(request):
 
 @csrf_exempt
 @login_required
-def create_shelf_modal(request):
+async def create_shelf_modal(request):
     """
     Crea un 'Estante' desde un modal vía AJAX.
     """
     if request.method == "POST":
+        user = await request.auser()
         name = request.POST.get("name", "").strip()
         auto = request.POST.get("auto") in ["true", "True", True]
 
         if auto or not name:
-            name = f"E{Shelf.objects.count() + 1}"
+            name = await sync_to_async(NameSequence.next_shelf_name)(user)
 
-        shelf = Shelf.objects.create(user=request.user, name=name)
+        shelf = await Shelf.objects.acreate(user=user, name=name)
         return JsonResponse({"success": True, "id": shelf.id, "name": shelf.name})
 
     return JsonResponse({"success": False, "error": "Método no permitido."})
@@ -1267,7 +1578,7 @@ def create_shelf_modal(request):
 
 @csrf_exempt
 @login_required
-def create_drawer_modal(request):
+async def create_drawer_modal(request):
     """
     Crea un 'Cajón' desde un modal vía AJAX, asignado a un estante.
     """
@@ -1281,17 +1592,17 @@ def create_drawer_modal(request):
         if not shelf_id:
             return JsonResponse({"success": False, "error": "Debes seleccionar un estante."})
 
+        user = await request.auser()
         try:
-            shelf = Shelf.objects.get(id=shelf_id, user=request.user)
+            shelf = await Shelf.objects.aget(id=shelf_id, user=user)
         except Shelf.DoesNotExist:
             return JsonResponse({"success": False, "error": "Estante no encontrado."})
 
-        # Asignar nombre automático en función de la cantidad existente
-        count_in_shelf = Drawer.objects.filter(user=request.user, shelf=shelf).count()
-        drawer = Drawer.objects.create(
-            user=request.user,
+        # Asignar el siguiente nombre de la secuencia del estante
+        drawer = await Drawer.objects.acreate(
+            user=user,
             shelf=shelf,
-            name=f"C{count_in_shelf + 1}"
+            name=await sync_to_async(NameSequence.next_drawer_name)(user, shelf)
         )
         return JsonResponse({"success": True, "id": drawer.id, "name": drawer.name})
 
@@ -1300,20 +1611,21 @@ def create_drawer_modal(request):
 
 @csrf_exempt
 @login_required
-def create_classification_modal(request):
+async def create_classification_modal(request):
     """
     Crea una 'Clasificación' desde un modal vía AJAX.
     """
     if request.method == "POST":
+        user = await request.auser()
         data = json.loads(request.body)
         name = data.get("name", "").strip()
 
         if not name:
             return JsonResponse({"success": False, "error": "El nombre es obligatorio"})
-        if Classification.objects.filter(user=request.user, name=name).exists():
+        if await Classification.objects.filter(user=user, name=name).aexists():
             return JsonResponse({"success": False, "error": "Ya existe una clasificación con ese nombre"})
 
-        classification = Classification.objects.create(user=request.user, name=name)
+        classification = await Classification.objects.acreate(user=user, name=name)
         return JsonResponse({"success": True, "id": classification.id, "name": classification.name})
 
     return JsonResponse({"success": False, "error": "Método inválido"})
@@ -1321,11 +1633,12 @@ def create_classification_modal(request):
 
 @csrf_exempt
 @login_required
-def create_gender_modal(request):
+async def create_gender_modal(request):
     """
     Crea un 'Género' desde un modal vía AJAX, vinculado a una clasificación.
     """
     if request.method == "POST":
+        user = await request.auser()
         data = json.loads(request.body)
         name = data.get("name", "").strip()
         classification_id = data.get("classification_id")
@@ -1334,14 +1647,14 @@ def create_gender_modal(request):
             return JsonResponse({"success": False, "error": "Debes seleccionar una clasificación"})
 
         try:
-            classification = Classification.objects.get(id=classification_id, user=request.user)
+            classification = await Classification.objects.aget(id=classification_id, user=user)
         except Classification.DoesNotExist:
             return JsonResponse({"success": False, "error": "Clasificación inválida"})
 
-        if Gender.objects.filter(user=request.user, classification=classification, name=name).exists():
+        if await Gender.objects.filter(user=user, classification=classification, name=name).aexists():
             return JsonResponse({"success": False, "error": "Ese género ya existe en esta clasificación"})
 
-        genre = Gender.objects.create(user=request.user, classification=classification, name=name)
+        genre = await Gender.objects.acreate(user=user, classification=classification, name=name)
         return JsonResponse({"success": True, "id": genre.id, "name": genre.name})
 
     return JsonResponse({"success": False, "error": "Método inválido"})
@@ -1349,11 +1662,12 @@ def create_gender_modal(request):
 
 @csrf_exempt
 @login_required
-def create_author_modal(request):
+async def create_author_modal(request):
     """
     Crea un 'Autor' desde un modal vía AJAX.
     """
     if request.method == "POST":
+        user = await request.auser()
         first_name = request.POST.get("first_name", "").strip()
         last_name = request.POST.get("last_name", "").strip()
         birth_year = request.POST.get("birth_year")
@@ -1365,8 +1679,8 @@ def create_author_modal(request):
         if not first_name or not last_name:
             return JsonResponse({"success": False, "error": "Debe ingresar nombre y apellido."})
 
-        author = Author.objects.create(
-            user=request.user,
+        author = await Author.objects.acreate(
+            user=user,
             first_name=first_name,
             last_name=last_name,
             birth_year=birth_year or None,
@@ -1381,6 +1695,278 @@ def create_author_modal(request):
     return JsonResponse({"success": False, "error": "Método no permitido."})
 
 
+# -------------------
+# AJAX búsqueda
+# -------------------
+
+@login_required
+def search_pdfs(request):
+    """
+    Busca texto dentro de los PDFs del usuario usando el índice de texto completo.
+
+    - Devuelve libro, página y fragmento resaltado de cada acierto.
+    - No abre ningún PDF: solo consulta el índice (ver catalog/fulltext.py).
+    """
+    query = request.GET.get("q", "").strip()
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 50)), 200))
+    except ValueError:
+        limit = 50
+
+    hits = fulltext.search(request.user.pk, query, limit=limit)
+    titles = dict(
+        Book.objects.filter(user=request.user, pk__in={hit["book_id"] for hit in hits})
+        .values_list("id", "title")
+    )
+
+    results = [
+        {
+            **hit,
+            "title": titles[hit["book_id"]],
+            "url": f"{reverse('read_pdf', args=[hit['book_id']])}?page={hit['page']}",
+        }
+        for hit in hits
+        if hit["book_id"] in titles
+    ]
+    return JsonResponse({"query": query, "results": results})
+
+
+def _book_text_pending(book):
+    """Respuesta para un libro aún sin indexar; lanza el indexado si tiene PDF."""
+    if book.pdf_file and settings.FULLTEXT_AUTO_INDEX:
+        run_in_background(fulltext.index_book, book.pk)
+    return JsonResponse({"indexed": False, "pages": {}, "results": []})
+
+
+@login_required
+def book_text(request, pk):
+    """
+    Capa de texto por página de un 'Libro' (lector de PDF).
+
+    - Sale del índice de texto completo: no abre el PDF.
+    - Se sirve comprimida con gzip desde la caché y con ETag, así el lector la
+      descarga una sola vez por versión del PDF.
+    - `?page=N` devuelve solo el texto de esa página.
+    """
+    book = get_object_or_404(Book, pk=pk, user=request.user)
+
+    requested_page = request.GET.get("page", "")
+    if requested_page.isdigit():
+        pages = fulltext.page_texts(book.user_id, book.pk, page=int(requested_page))
+        return JsonResponse({"indexed": True, "pages": pages})
+
+    payload, info = fulltext.text_layer(book.user_id, book.pk)
+    if payload is None:
+        return _book_text_pending(book)
+
+    etag = f'"text-{book.pk}-{info["indexed_at"]:.6f}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponse(status=304)
+    elif "gzip" in request.headers.get("Accept-Encoding", ""):
+        response = HttpResponse(payload, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(gzip.decompress(payload), content_type="application/json")
+
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = "private, max-age=3600"
+    return response
+
+
+@login_required
+def search_in_book(request, pk):
+    """
+    Busca texto dentro de un solo 'Libro' ("buscar en este libro" del lector).
+
+    - Devuelve página y fragmento resaltado de cada acierto, en orden de página,
+      para que el lector salte directamente a la página elegida.
+    """
+    book = get_object_or_404(Book, pk=pk, user=request.user)
+    query = request.GET.get("q", "").strip()
+
+    if fulltext.book_index_info(book.user_id, book.pk) is None:
+        return _book_text_pending(book)
+
+    hits = fulltext.search(book.user_id, query, limit=200, book_id=book.pk)
+    results = sorted(
+        ({"page": hit["page"], "snippet": hit["snippet"]} for hit in hits),
+        key=lambda hit: hit["page"],
+    )
+    return JsonResponse({"indexed": True, "query": query, "results": results})
+
+
+@login_required
+async def lookup_identifier(request):
+    """
+    Busca un libro del usuario por ISBN (10/13, con o sin guiones) o DOI exacto.
+
+    - Pensado para lectores de códigos de barras: una consulta sobre el índice
+      único (usuario, ISBN-13) / (usuario, DOI), sin búsquedas icontains.
+    - 400 si el código no es un ISBN/DOI válido, 404 si no está en la biblioteca.
+    """
+    user = await request.auser()
+    code = request.GET.get("code", "").strip()
+
+    isbn_key = normalize_isbn(code)
+    doi_key = "" if isbn_key else normalize_doi(code)
+    if not (isbn_key or doi_key):
+        return JsonResponse({"found": False, "error": "Código no válido"}, status=400)
+
+    lookup = {"isbn_key": isbn_key} if isbn_key else {"doi_key": doi_key}
+    book = await Book.objects.filter(user=user, **lookup).select_related("author").afirst()
+    if book is None:
+        return JsonResponse({"found": False, **lookup}, status=404)
+
+    return JsonResponse({
+        "found": True,
+        **lookup,
+        "book": {
+            "id": book.pk,
+            "title": book.title,
+            "author": str(book.author) if book.author else "",
+            "url": reverse("detail_book", args=[book.pk]),
+            "read_url": reverse("read_pdf" if book.pdf_file else "read_physical", args=[book.pk]),
+        },
+    })
+
+
+@login_required
+async def book_metadata(request):
+    """
+    Metadatos de un ISBN desde el volcado bibliográfico local (autocompletar formularios).
+
+    - Búsqueda por clave en un archivo local (microsegundos): no usa la red
+      ni la base de datos, por eso se llama directamente sin hilos.
+    """
+    record = metadata.lookup(request.GET.get("isbn", ""))
+    if record is None:
+        return JsonResponse({"found": False})
+    return JsonResponse({"found": True, "record": record})
+
+
+@login_required
+def check_duplicates(request):
+    """
+    Comprueba si un libro que se está capturando ya existe en la biblioteca.
+
+    - Recibe title, author, isbn y doi (y `exclude` al editar).
+    - Compara claves normalizadas con una consulta indexada.
+    - `blocking`: coincide el ISBN o el DOI (únicos por usuario), no se podrá guardar;
+      si solo coincide el título es un aviso.
+    """
+    keys = dedup.keys_for(
+        title=request.GET.get("title", ""),
+        author_id=request.GET.get("author") if request.GET.get("author", "").isdigit() else None,
+        isbn=request.GET.get("isbn", ""),
+        doi=request.GET.get("doi", ""),
+    )
+    exclude = request.GET.get("exclude", "")
+    matches = dedup.find_duplicates(
+        request.user, exclude_pk=int(exclude) if exclude.isdigit() else None, **keys
+    )
+    duplicates = [
+        {
+            "id": book.pk,
+            "title": book.title,
+            "author": str(book.author) if book.author else "",
+            "reasons": reasons,
+            "blocking": "isbn" in reasons or "doi" in reasons,
+            "url": reverse("detail_book", args=[book.pk]),
+        }
+        for book, reasons in matches
+    ]
+    return JsonResponse({"duplicates": duplicates})
+
+
+@login_required
+def autocomplete_search(request):
+    """
+    Sugerencias mientras se escribe (títulos, series y autores) desde el índice en memoria.
+
+    Parámetros: `q`, `tipo` (libro/autor, opcional) y `limit`.
+    """
+    kinds = {"libro": [autocomplete.BOOK], "autor": [autocomplete.AUTHOR]}.get(
+        request.GET.get("tipo", ""), [autocomplete.BOOK, autocomplete.AUTHOR]
+    )
+    try:
+        limit = max(1, int(request.GET.get("limit", autocomplete.DEFAULT_LIMIT)))
+    except ValueError:
+        limit = autocomplete.DEFAULT_LIMIT
+    results = autocomplete.suggest(request.user.pk, request.GET.get("q", ""), kinds, limit)
+    return JsonResponse({"results": results})
+
+
+# -------------------
+# AJAX subidas por partes
+# -------------------
+#
+# Protocolo descrito en catalog/uploads.py. Las respuestas llevan las cabeceras
+# `Upload-Offset` / `Upload-Length` además del JSON.
+
+def _upload_response(upload, status=200):
+    response = JsonResponse({
+        "id": str(upload.pk),
+        "offset": upload.offset,
+        "size": upload.size,
+        "complete": upload.is_complete,
+    }, status=status)
+    response["Upload-Offset"] = str(upload.offset)
+    response["Upload-Length"] = str(upload.size)
+    return response
+
+
+@login_required
+def upload_create(request):
+    """
+    Crea una subida reanudable (POST JSON: filename, size, kind).
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Método no permitido"}, status=405)
+    try:
+        data = json.loads(request.body)
+        upload = uploads.create_upload(request.user, data.get("filename"), data.get("size"), data.get("kind"))
+    except (ValueError, AttributeError):
+        return JsonResponse({"error": "Datos no válidos"}, status=400)
+    except uploads.UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+    return _upload_response(upload, status=201)
+
+
+@login_required
+def upload_detail(request, upload_id):
+    """
+    Estado y partes de una subida.
+
+    - GET/HEAD: offset actual (para reanudar).
+    - PATCH: añade una parte (cabeceras Upload-Offset y X-Chunk-SHA256).
+    - DELETE: cancela la subida.
+    """
+    if request.method == "PATCH":
+        try:
+            upload = uploads.append_chunk(
+                upload_id,
+                request.user,
+                offset=int(request.headers.get("Upload-Offset", "")),
+                stream=request,
+                length=int(request.headers.get("Content-Length", "")),
+                checksum=request.headers.get("X-Chunk-SHA256", ""),
+            )
+        except ValueError:
+            return JsonResponse({"error": "Cabeceras no válidas"}, status=400)
+        except uploads.UploadError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        return _upload_response(upload)
+
+    upload = get_object_or_404(Upload, pk=upload_id, user=request.user)
+    if request.method == "DELETE":
+        if upload.is_complete:
+            return JsonResponse({"error": "La subida ya está completa"}, status=409)
+        uploads.abort(upload)
+        return JsonResponse({"deleted": True})
+    return _upload_response(upload)
+
+
 # -------------------
 # AJAX progreso de lectura
 # -------------------
@@ -1406,7 +1992,7 @@ def save_progress(request, pk):
 
 @csrf_exempt
 @login_required
-def save_last_page(request):
+async def save_last_page(request):
     """
     Actualiza la última página leída de un 'Libro' vía AJAX.
 
@@ -1415,6 +2001,7 @@ def save_last_page(request):
     """
     if request.method == "POST":
         try:
+            user = await request.auser()
             data = json.loads(request.body.decode("utf-8"))
             book_id = data.get("book_id")
             last_page = data.get("last_page", 1)
@@ -1426,7 +2013,7 @@ def save_last_page(request):
             except (ValueError, TypeError):
                 return JsonResponse({"status": "error", "message": "ID de libro o página inválidos"}, status=400)
 
-            book = get_object_or_404(Book, pk=book_id, user=request.user)
+            book = await aget_object_or_404(Book, pk=book_id, user=user)
 
             if book.page_count and last_page > book.page_count:
                 return JsonResponse({
@@ -1434,15 +2021,15 @@ def save_last_page(request):
                     "message": f"La página no puede ser mayor que {book.page_count}"
                 }, status=400)
 
-            progress, created = ReadingProgress.objects.get_or_create(
-                user=request.user,
+            progress, created = await ReadingProgress.objects.aget_or_create(
+                user=user,
                 book=book,
                 defaults={"last_page": last_page}
             )
 
             if not created:
                 progress.last_page = last_page
-                progress.save()
+                await progress.asave()
 
             return JsonResponse({"status": "ok"})
 
@@ -1,5 +1,14 @@
 from django.shortcuts import render
 
+from catalog import reading
+
 # Create your views here.
 def home(request):
-    return render(request, "home.html")
+    """
+    Página de inicio.
+
+    Con sesión iniciada muestra el panel de lectura (leyendo ahora, terminados
+    hace poco y sin empezar); cada sección es una consulta acotada.
+    """
+    context = reading.dashboard(request.user) if request.user.is_authenticated else {}
+    return render(request, "home.html", context)
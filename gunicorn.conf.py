@@ -0,0 +1,51 @@
+###########################################################################################
+#                                                                                        #
+#                                 CONFIGURACIÓN DE GUNICORN                              #
+#                                                                                        #
+#   Gunicorn carga este archivo automáticamente si se ejecuta desde la raíz del          #
+#   proyecto. Por defecto usa workers síncronos, compatibles con el comando de           #
+#   arranque actual:                                                                     #
+#                                                                                        #
+#       gunicorn babelius.wsgi:application                                               #
+#                                                                                        #
+#   Para usar el worker de uvicorn (ASGI) hay que cambiar a la vez la clase de           #
+#   worker y la aplicación; los endpoints AJAX asíncronos y el streaming de PDFs         #
+#   (`stream_pdf`) atienden entonces muchas conexiones lentas por proceso en lugar       #
+#   de una por worker:                                                                   #
+#                                                                                        #
+#       GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker \                             #
+#           gunicorn babelius.asgi:application                                           #
+#                                                                                        #
+#   En desarrollo también se puede usar uvicorn directamente:                            #
+#                                                                                        #
+#       uvicorn babelius.asgi:application --reload                                       #
+#                                                                                        #
+#   Variables de entorno:                                                                #
+#     - PORT                   -> puerto de escucha (Render lo define).                  #
+#     - WEB_CONCURRENCY        -> número de procesos (por defecto 2 * CPUs + 1).         #
+#     - GUNICORN_WORKER_CLASS  -> clase de worker (por defecto sync).                    #
+#     - GUNICORN_TIMEOUT       -> segundos antes de reiniciar un worker colgado.         #
+#                                                                                        #
+###########################################################################################
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Un worker ASGI (uvicorn) no puede cargar `babelius.wsgi`: el cambio es explícito
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+
+# Con uvicorn las peticiones asíncronas no bloquean al worker, pero las vistas
+# síncronas (formularios, listados) sí: el timeout protege frente a una vista colgada.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar workers periódicamente acota fugas de memoria (PIL, PyPDF2)
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
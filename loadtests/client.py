@@ -0,0 +1,186 @@
+"""
+Cliente HTTP/1.1 asíncrono mínimo para las pruebas de carga.
+
+Solo usa la biblioteca estándar (asyncio), de modo que las pruebas pueden
+correr en cualquier máquina con el mismo Python del proyecto. Cada petición
+abre su propia conexión (`Connection: close`) y permite leer la respuesta a
+una velocidad limitada para simular clientes lentos.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict
+    body: bytes
+    elapsed: float
+    set_cookies: list = field(default_factory=list)
+
+
+class HttpClient:
+    """Cliente con cookies propias (sesión de Django y CSRF)."""
+
+    def __init__(self, base_url, timeout=30.0):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.timeout = timeout
+        self.cookies = {}
+
+    # -------------------
+    # Peticiones
+    # -------------------
+
+    async def request(self, method, path, body=b"", headers=None, read_rate=None):
+        """
+        Ejecuta una petición y devuelve un `Response`.
+
+        `read_rate` (bytes/segundo) limita la lectura del cuerpo para simular
+        un cliente con mala conexión.
+        """
+        started = time.perf_counter()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.scheme == "https"),
+            self.timeout,
+        )
+        try:
+            all_headers = {
+                "Host": f"{self.host}:{self.port}",
+                "Connection": "close",
+                "User-Agent": "babelius-loadtest",
+                "Content-Length": str(len(body)),
+            }
+            if self.cookies:
+                all_headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+            if "csrftoken" in self.cookies and method != "GET":
+                all_headers["X-CSRFToken"] = self.cookies["csrftoken"]
+                all_headers["Referer"] = f"{self.scheme}://{self.host}:{self.port}{path}"
+            all_headers.update(headers or {})
+
+            head = f"{method} {path} HTTP/1.1\r\n" + "".join(
+                f"{k}: {v}\r\n" for k, v in all_headers.items()
+            ) + "\r\n"
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+
+            status, response_headers, set_cookies = await asyncio.wait_for(
+                self._read_head(reader), self.timeout
+            )
+            raw = await asyncio.wait_for(self._read_body(reader, read_rate), self.timeout)
+        finally:
+            writer.close()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            raw = _decode_chunked(raw)
+        for cookie in set_cookies:
+            for name, morsel in SimpleCookie(cookie).items():
+                self.cookies[name] = morsel.value
+
+        return Response(status, response_headers, raw, time.perf_counter() - started, set_cookies)
+
+    async def get(self, path, params=None, **kwargs):
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        return await self.request("GET", path, **kwargs)
+
+    async def post_form(self, path, data, files=None, **kwargs):
+        if files:
+            body, content_type = _encode_multipart(data, files)
+        else:
+            body, content_type = urlencode(data).encode(), "application/x-www-form-urlencoded"
+        return await self.request("POST", path, body=body, headers={"Content-Type": content_type}, **kwargs)
+
+    async def post_json(self, path, payload, **kwargs):
+        return await self.request(
+            "POST", path, body=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"}, **kwargs,
+        )
+
+    async def login(self, username, password, path="/auth/login/"):
+        """Inicia sesión con el formulario de `auth_users.views.user_login`."""
+        await self.get(path)  # obtiene la cookie csrftoken
+        response = await self.post_form(path, {
+            "username": username,
+            "password": password,
+            "csrfmiddlewaretoken": self.cookies.get("csrftoken", ""),
+        })
+        if "sessionid" not in self.cookies:
+            raise RuntimeError(f"Login fallido para {username!r} (HTTP {response.status})")
+        return response
+
+    # -------------------
+    # Lectura de la respuesta
+    # -------------------
+
+    @staticmethod
+    async def _read_head(reader):
+        raw = await reader.readuntil(b"\r\n\r\n")
+        lines = raw.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers, set_cookies = {}, []
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, _, value = line.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                set_cookies.append(value)
+            headers[name] = value
+        return status, headers, set_cookies
+
+    @staticmethod
+    async def _read_body(reader, read_rate):
+        chunks = []
+        piece = 16 * 1024
+        while True:
+            chunk = await reader.read(piece)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if read_rate:
+                await asyncio.sleep(len(chunk) / read_rate)
+        return b"".join(chunks)
+
+
+def _decode_chunked(raw):
+    body, position = [], 0
+    while True:
+        end = raw.index(b"\r\n", position)
+        size = int(raw[position:end].split(b";")[0], 16)
+        if size == 0:
+            return b"".join(body)
+        body.append(raw[end + 2:end + 2 + size])
+        position = end + 2 + size + 2
+
+
+def _encode_multipart(data, files):
+    boundary = "----babelius-loadtest"
+    parts = []
+    for name, value in data.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode() + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def percentile(values, pct):
+    """Percentil por el método del rango más cercano (valores en segundos)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
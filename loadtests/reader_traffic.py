@@ -0,0 +1,280 @@
+"""
+Prueba de carga: tráfico realista de lectores.
+
+Cada usuario virtual inicia sesión (`auth_users.views.user_login`) y repite
+acciones elegidas al azar según su peso, con una pausa entre ellas:
+
+- browse: listado `read_books` con búsqueda, facetas y paginación tomadas del
+  propio listado.
+- read: abre el lector (`read_pdf`) y pasa páginas; cada página pide un rango
+  del PDF (`stream_pdf`) y guarda el progreso (`save_last_page`).
+- create: crea un libro con PDF adjunto (`create_book`). Sus títulos empiezan
+  por `TITLE_PREFIX` para poder borrarlos después con la acción en lote.
+
+Al terminar imprime, por endpoint: peticiones, peticiones/s, p50/p95/p99 y
+tasa de error. Con `--save` guarda el resultado en JSON y con `--baseline`
+lo compara con uno anterior (p. ej. antes y después de una optimización, o
+con distinto número de workers).
+
+Uso:
+
+    gunicorn babelius.wsgi:application -b :8000 -w 4
+
+    python -m loadtests.reader_traffic --username demo --password demo \\
+        --users 20 --duration 60 --save antes.json
+    python -m loadtests.reader_traffic --username demo --password demo \\
+        --users 20 --duration 60 --baseline antes.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from collections import defaultdict
+
+from .client import HttpClient, percentile
+
+TITLE_PREFIX = "[loadtest]"
+
+# Bytes por petición de rango del lector
+RANGE_SIZE = 64 * 1024
+
+BOOK_LINK_RE = re.compile(r"/book/(\d+)/read/")
+FACET_SELECT_RE = re.compile(r'<select name="(\w+)"[^>]*>(.*?)</select>', re.S)
+OPTION_RE = re.compile(r'<option value="([^"]+)"')
+TOTAL_PAGES_RE = re.compile(r"const totalPages = (\d+);")
+
+SEARCH_TERMS = ["", "", "", "la", "de", "historia", "el"]
+
+
+class Stats:
+    """Latencias y errores por endpoint."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, response=None, elapsed=0.0):
+        if response is None or response.status >= 400:
+            self.errors[endpoint] += 1
+        self.latencies[endpoint].append(response.elapsed if response else elapsed)
+
+    def summary(self, elapsed):
+        rows = {}
+        for endpoint in sorted(self.latencies):
+            latencies = self.latencies[endpoint]
+            rows[endpoint] = {
+                "requests": len(latencies),
+                "rps": len(latencies) / elapsed,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "error_pct": self.errors[endpoint] / len(latencies) * 100,
+            }
+        return rows
+
+
+def minimal_pdf(pages=3):
+    """PDF válido de `pages` páginas en blanco (sin dependencias)."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(f"{3 + i} 0 R".encode() for i in range(pages))
+        + f"] /Count {pages} >>".encode(),
+    ]
+    objects += [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 400] >>"] * pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+# -------------------
+# Acciones
+# -------------------
+
+class VirtualUser:
+    def __init__(self, number, base_url, args, stats, catalog):
+        self.number = number
+        self.client = HttpClient(base_url, timeout=args.timeout)
+        self.args = args
+        self.stats = stats
+        self.catalog = catalog
+        self.created = 0
+
+    async def call(self, endpoint, coroutine):
+        started = time.perf_counter()
+        try:
+            response = await coroutine
+        except Exception:
+            self.stats.record(endpoint, elapsed=time.perf_counter() - started)
+            return None
+        self.stats.record(endpoint, response)
+        return response
+
+    async def login(self):
+        await self.call("login", self.client.login(self.args.username, self.args.password))
+        return "sessionid" in self.client.cookies
+
+    async def browse(self):
+        params = {}
+        search = random.choice(SEARCH_TERMS)
+        if search:
+            params["search"] = search
+        if self.catalog["facets"] and random.random() < 0.6:
+            facet, value = random.choice(sorted(self.catalog["facets"]))
+            params[facet] = value
+        if random.random() < 0.3:
+            params["page"] = random.randint(1, 3)
+
+        response = await self.call("read_books", self.client.get("/libros/", params))
+        if response and response.status == 200:
+            html = response.body.decode("utf-8", "replace")
+            self.catalog["books"].update(BOOK_LINK_RE.findall(html))
+            for facet, options in FACET_SELECT_RE.findall(html):
+                self.catalog["facets"].update((facet, value) for value in OPTION_RE.findall(options))
+
+    async def read(self):
+        if not self.catalog["books"]:
+            return await self.browse()
+        book_id = random.choice(sorted(self.catalog["books"]))
+        response = await self.call("read_pdf", self.client.get(f"/book/{book_id}/read/"))
+        if not response or response.status != 200:
+            return
+        match = TOTAL_PAGES_RE.search(response.body.decode("utf-8", "replace"))
+        total_pages = int(match.group(1)) if match else 0
+
+        # Sin total (PDF aún sin contar en segundo plano) el lector no pasa de la primera página
+        page = random.randint(1, max(1, total_pages - self.args.flips))
+        flips = random.randint(1, self.args.flips) if total_pages else 1
+        for _ in range(flips):
+            # pdf.js pide por Range solo los bytes de la página visible
+            size = self.catalog["sizes"].get(book_id, RANGE_SIZE)
+            start = random.randrange(0, size, RANGE_SIZE)
+            response = await self.call("stream_pdf", self.client.get(
+                f"/book/{book_id}/pdf/", headers={"Range": f"bytes={start}-{start + RANGE_SIZE - 1}"},
+            ))
+            if response and "content-range" in response.headers:
+                self.catalog["sizes"][book_id] = int(response.headers["content-range"].rpartition("/")[2])
+            await self.call("save_last_page", self.client.post_json(
+                "/save_last_page/", {"book_id": int(book_id), "last_page": page},
+            ))
+            if total_pages and page >= total_pages:
+                break
+            page += 1
+            await asyncio.sleep(random.uniform(0, self.args.page_time))
+
+    async def create(self):
+        # El autor es obligatorio: uno de los que ofrece la faceta del listado
+        authors = sorted(value for facet, value in self.catalog["facets"] if facet == "author")
+        if not authors:
+            return await self.browse()
+        self.created += 1
+        title = f"{TITLE_PREFIX} u{self.number}-{self.created}-{random.randrange(10**6)}"
+        await self.call("create_book", self.client.post_form(
+            "/crear_libro/",
+            {
+                "csrfmiddlewaretoken": self.client.cookies.get("csrftoken", ""),
+                "0_title": title,
+                "0_editorial": "Carga",
+                "0_author": random.choice(authors),
+                "0_cover": "virtual",
+            },
+            files={"0_pdf_file": (f"loadtest-{self.number}-{self.created}.pdf", minimal_pdf(), "application/pdf")},
+        ))
+
+    async def run(self, deadline):
+        if not await self.login():
+            return
+        actions = [self.browse, self.read, self.create]
+        weights = [self.args.browse_weight, self.args.read_weight, self.args.create_weight]
+        while time.perf_counter() < deadline:
+            await random.choices(actions, weights)[0]()
+            await asyncio.sleep(random.uniform(0, self.args.think_time))
+
+
+# -------------------
+# Escenario
+# -------------------
+
+async def run_scenario(base_url, args):
+    stats = Stats()
+    catalog = {"books": {str(book) for book in args.book or []}, "facets": set(), "sizes": {}}
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    async def start_user(number):
+        # Arranque escalonado para no medir solo la tormenta de logins
+        await asyncio.sleep(args.ramp_up * number / args.users)
+        await VirtualUser(number, base_url, args, stats, catalog).run(deadline)
+
+    await asyncio.gather(*(start_user(number) for number in range(args.users)))
+    return stats.summary(time.perf_counter() - started)
+
+
+def print_results(results, baseline=None):
+    columns = ["requests", "rps", "p50_ms", "p95_ms", "p99_ms", "error_pct"]
+    width = max([len(endpoint) for endpoint in results] + [8]) + 2
+    print(f"{'endpoint':<{width}}" + "".join(f"{column:>12}" for column in columns))
+    for endpoint, row in results.items():
+        line = f"{endpoint:<{width}}"
+        for column in columns:
+            value = row[column]
+            line += f"{value:>12.1f}" if isinstance(value, float) else f"{value:>12}"
+        print(line)
+
+        previous = (baseline or {}).get(endpoint)
+        if previous:
+            deltas = ""
+            for column in columns:
+                before, after = previous[column], row[column]
+                deltas += f"{(after - before) / before * 100:>+11.1f}%" if before else f"{'—':>12}"
+            print(f"{'  vs base':<{width}}" + deltas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--users", type=int, default=10, help="Usuarios virtuales simultáneos")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de prueba")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Segundos hasta tener todos los usuarios")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Pausa máxima entre acciones")
+    parser.add_argument("--page-time", type=float, default=1.0, help="Pausa máxima entre páginas")
+    parser.add_argument("--flips", type=int, default=10, help="Páginas máximas por sesión de lectura")
+    parser.add_argument("--browse-weight", type=float, default=5)
+    parser.add_argument("--read-weight", type=float, default=4)
+    parser.add_argument("--create-weight", type=float, default=1)
+    parser.add_argument("--book", type=int, action="append", help="ID de libro con PDF (se descubren más al navegar)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--save", help="Guarda el resultado en este JSON")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--seed", type=int, help="Semilla para repetir la misma secuencia de acciones")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = asyncio.run(run_scenario(args.base_url, args))
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"url": args.base_url, "users": args.users, "duration": args.duration, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
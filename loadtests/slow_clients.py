@@ -0,0 +1,117 @@
+"""
+Prueba de carga: concurrencia con clientes lentos.
+
+Lanza N clientes que descargan un PDF (`stream_pdf`) a velocidad limitada y,
+en paralelo, una sonda que consulta un endpoint AJAX rápido (`load_drawers`).
+Con workers síncronos cada cliente lento ocupa un worker completo y la
+latencia de la sonda se dispara; con el worker ASGI la sonda debería mantener
+latencias bajas.
+
+Uso (dos servidores con la misma base de datos, uno por modo):
+
+    gunicorn babelius.wsgi:application -b :8000 -w 4
+    GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker gunicorn babelius.asgi:application -b :8001 -w 4
+
+    python -m loadtests.slow_clients --username demo --password demo --book 1 \\
+        --base-url http://127.0.0.1:8000 --compare-url http://127.0.0.1:8001
+"""
+
+import argparse
+import asyncio
+import time
+
+from .client import HttpClient, percentile
+
+
+async def slow_reader(client, path, rate, deadline, stats):
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.get(path, read_rate=rate)
+            stats["bytes"] += len(response.body)
+            stats["downloads"] += 1
+        except Exception:
+            stats["errors"] += 1
+            await asyncio.sleep(0.5)
+
+
+async def probe(client, path, interval, deadline, latencies, stats):
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.get(path)
+            if response.status >= 400:
+                stats["probe_errors"] += 1
+            else:
+                latencies.append(response.elapsed)
+        except Exception:
+            stats["probe_errors"] += 1
+        await asyncio.sleep(interval)
+
+
+async def run_scenario(base_url, args):
+    session = HttpClient(base_url, timeout=args.timeout)
+    await session.login(args.username, args.password)
+
+    def clone():
+        client = HttpClient(base_url, timeout=args.timeout)
+        client.cookies = dict(session.cookies)
+        return client
+
+    stats = {"bytes": 0, "downloads": 0, "errors": 0, "probe_errors": 0}
+    latencies = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    tasks = [
+        slow_reader(clone(), f"/book/{args.book}/pdf/", args.rate, deadline, stats)
+        for _ in range(args.slow_clients)
+    ]
+    tasks.append(probe(clone(), "/ajax/load-drawers/?shelf_id=0", args.probe_interval, deadline, latencies, stats))
+    await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "url": base_url,
+        "probe_requests": len(latencies),
+        "probe_p50_ms": percentile(latencies, 50) * 1000,
+        "probe_p95_ms": percentile(latencies, 95) * 1000,
+        "probe_p99_ms": percentile(latencies, 99) * 1000,
+        "probe_errors": stats["probe_errors"],
+        "slow_downloads": stats["downloads"],
+        "slow_errors": stats["errors"],
+        "slow_kib_per_s": stats["bytes"] / 1024 / elapsed,
+    }
+
+
+def print_results(results):
+    keys = list(results[0])
+    width = max(len(k) for k in keys) + 2
+    for key in keys:
+        row = []
+        for result in results:
+            value = result[key]
+            row.append(f"{value:>14.1f}" if isinstance(value, float) else f"{value!s:>14}")
+        print(f"{key:<{width}}" + " ".join(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--compare-url", help="Segundo servidor a medir con el mismo escenario")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--book", type=int, required=True, help="ID de un libro con PDF")
+    parser.add_argument("--slow-clients", type=int, default=50)
+    parser.add_argument("--rate", type=int, default=32 * 1024, help="Bytes/s por cliente lento")
+    parser.add_argument("--duration", type=float, default=20.0, help="Segundos por escenario")
+    parser.add_argument("--probe-interval", type=float, default=0.2)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    results = [asyncio.run(run_scenario(args.base_url, args))]
+    if args.compare_url:
+        results.append(asyncio.run(run_scenario(args.compare_url, args)))
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()